@@ -0,0 +1,106 @@
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from accounts.models import AvatarVariant, Profile
+from jobs.queue import enqueue
+
+# Avatars render at up to 68px; the larger size covers them on 2x screens.
+AVATAR_SIZES = (72, 144)
+AVATAR_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+def render_variant(image, size, fmt):
+    """Return ``image`` center-cropped to a ``size`` square and encoded as ``fmt``."""
+    square = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    square.save(buffer, **AVATAR_FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def _open(field_file):
+    with field_file.open("rb") as source:
+        image = Image.open(source)
+        image.draft("RGB", (max(AVATAR_SIZES) * 2, max(AVATAR_SIZES) * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            # JPEG has no alpha; flatten onto white for both formats so they match.
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        image.load()
+        return image
+
+
+def generate_avatar_variants(profile_id):
+    """
+    Build every ``AVATAR_SIZES`` x ``AVATAR_FORMATS`` variant of the profile's
+    current picture and replace the old ones. Runs on the job queue; a job for
+    a picture that has since been replaced does nothing.
+    """
+    profile = Profile.objects.filter(pk=profile_id).first()
+    if profile is None:
+        return
+    source = profile.profile_picture.name if profile.profile_picture else ""
+    if not source:
+        AvatarVariant.objects.filter(profile=profile).delete()
+        return
+
+    try:
+        image = _open(profile.profile_picture)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Nothing usable to resize; templates keep showing the fallback.
+        return
+    stem = hashlib.sha256(source.encode()).hexdigest()[:12]
+    variants = []
+    for size in AVATAR_SIZES:
+        for fmt in AVATAR_FORMATS:
+            variant = AvatarVariant(profile=profile, source=source, size=size, format=fmt)
+            variant.file.save(
+                f"{profile.pk}-{stem}-{size}.{fmt}",
+                ContentFile(render_variant(image, size, fmt)),
+                save=False,
+            )
+            variants.append(variant)
+
+    with transaction.atomic():
+        current = Profile.objects.select_for_update().filter(pk=profile_id).values_list("profile_picture", flat=True)
+        if list(current) != [source]:
+            for variant in variants:
+                variant.file.delete(save=False)
+            return
+        for old in AvatarVariant.objects.filter(profile=profile):
+            # Deleting one by one fires post_delete, which removes the file.
+            old.delete()
+        AvatarVariant.objects.bulk_create(variants)
+
+
+def schedule_avatar_variants(profile):
+    """Queue ``generate_avatar_variants`` for ``profile``; repeated uploads share one pending job."""
+    return enqueue(generate_avatar_variants, key=f"avatars:{profile.pk}", profile_id=profile.pk)
+
+
+def avatar_sources(user, size):
+    """
+    The ready variants of ``user``'s current picture for a ``size`` px avatar,
+    as ``{format: (url_1x, url_2x)}``, or ``{}`` while they are pending.
+    """
+    variants = {}
+    rows = AvatarVariant.objects.filter(profile__user=user, source=F("profile__profile_picture")).order_by("size")
+    for variant in rows:
+        variants.setdefault(variant.format, []).append(variant)
+
+    sources = {}
+    for fmt, candidates in variants.items():
+        one_x = next((variant for variant in candidates if variant.size >= size), candidates[-1])
+        two_x = next((variant for variant in candidates if variant.size >= size * 2), candidates[-1])
+        sources[fmt] = (one_x.file.url, two_x.file.url)
+    return sources
@@ -0,0 +1,30 @@
+from allauth.account import auth_backends as allauth_backends
+from django.contrib.auth import backends as auth_backends
+from django.contrib.auth.models import User
+
+# Sessions created before these backends replaced the stock ones still name
+# the old paths; AuthenticationMiddleware rewrites them on the next request.
+LEGACY_BACKENDS = {
+    "django.contrib.auth.backends.ModelBackend": "accounts.backends.ModelBackend",
+    "allauth.account.auth_backends.AuthenticationBackend": "accounts.backends.AuthenticationBackend",
+}
+
+
+class ProfileUserMixin:
+    """Load the session user together with their profile in one query."""
+
+    def get_user(self, user_id):
+        user = User._default_manager.select_related("profile").filter(pk=user_id).first()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        user = await User._default_manager.select_related("profile").filter(pk=user_id).afirst()
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class ModelBackend(ProfileUserMixin, auth_backends.ModelBackend):
+    pass
+
+
+class AuthenticationBackend(ProfileUserMixin, allauth_backends.AuthenticationBackend):
+    pass
@@ -1,12 +1,5 @@
-from accounts.models import Profile
+from accounts.roles import get_role
 
 
 def user_role(request):
-    if not request.user.is_authenticated:
-        return {"current_user_role": ""}
-
-    profile, _ = Profile.objects.get_or_create(
-        user=request.user,
-        defaults={"role": "student"},
-    )
-    return {"current_user_role": (profile.role or "").strip().lower()}
+    return {"current_user_role": get_role(request)}
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from accounts.avatars import schedule_avatar_variants
+from accounts.models import AvatarVariant, Profile
+
+
+class Command(BaseCommand):
+    help = "Queue resized avatar variants for profile pictures that do not have them yet."
+
+    def handle(self, *args, **options):
+        current = AvatarVariant.objects.filter(profile=OuterRef("pk"), source=OuterRef("profile_picture"))
+        profiles = (
+            Profile.objects.exclude(profile_picture="")
+            .exclude(profile_picture=None)
+            .filter(~Exists(current))
+            .order_by("pk")
+        )
+        queued = 0
+        for profile in profiles.iterator():
+            schedule_avatar_variants(profile)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f"Queued avatar variants for {queued} profile(s)."))
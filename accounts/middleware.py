@@ -0,0 +1,30 @@
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth import middleware as auth_middleware
+
+from accounts.backends import LEGACY_BACKENDS
+from accounts.roles import get_role
+
+
+class AuthenticationMiddleware(auth_middleware.AuthenticationMiddleware):
+    """
+    Django's ``AuthenticationMiddleware`` for the ``accounts.backends``
+    backends: ``request.user`` is loaded lazily with its profile in the same
+    query and memoized for the rest of the request.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        backend = request.session.get(BACKEND_SESSION_KEY)
+        if backend in LEGACY_BACKENDS:
+            request.session[BACKEND_SESSION_KEY] = LEGACY_BACKENDS[backend]
+
+
+class RoleMiddleware:
+    """Resolve the user's role once per request and expose it as ``request.role``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = get_role(request)
+        return self.get_response(request)
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvatarVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('size', models.PositiveSmallIntegerField()),
+                ('format', models.CharField(choices=[('webp', 'WebP'), ('jpeg', 'JPEG')], max_length=4)),
+                ('file', models.FileField(max_length=255, upload_to='profiles/variants/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='avatar_variants', to='accounts.profile')),
+            ],
+            options={
+                'db_table': 'myapp_avatarvariant',
+                'constraints': [models.UniqueConstraint(fields=('profile', 'size', 'format'), name='myapp_avatarvariant_unique')],
+            },
+        ),
+    ]
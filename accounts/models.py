@@ -18,3 +18,29 @@ class Profile(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.role}"
+
+
+class AvatarVariant(models.Model):
+    """A resized copy of ``Profile.profile_picture``, made by ``accounts.avatars``."""
+
+    FORMAT_CHOICES = (
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    )
+
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='avatar_variants')
+    # The profile_picture name this variant was made from; a new upload makes it stale.
+    source = models.CharField(max_length=255)
+    size = models.PositiveSmallIntegerField()
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    file = models.FileField(upload_to='profiles/variants/', max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "myapp_avatarvariant"
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'size', 'format'], name='myapp_avatarvariant_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile.user.username} {self.size}px {self.format}"
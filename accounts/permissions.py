@@ -1,16 +1,13 @@
 from rest_framework.permissions import BasePermission
 
+from accounts.roles import get_role
+
 
 class IsRole(BasePermission):
     allowed_role = None
 
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        if not hasattr(request.user, "profile"):
-            return False
-        role = (request.user.profile.role or "").strip().lower()
-        return role == self.allowed_role
+        return get_role(request) == self.allowed_role
 
 
 class IsLecturer(IsRole):
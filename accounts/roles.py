@@ -0,0 +1,68 @@
+from accounts.models import Profile
+from dashboard.cache import bump_version, get_versions, is_shared
+
+SESSION_KEY = "_user_role"
+
+
+def load_profile(user):
+    """Return ``user.profile``, creating a student profile for accounts without one."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        profile, _ = Profile.objects.get_or_create(user=user, defaults={"role": "student"})
+        user.profile = profile
+        return profile
+
+
+def role_for_user(user):
+    if not user.is_authenticated:
+        return ""
+    return (load_profile(user).role or "").strip().lower()
+
+
+def invalidate_role(user_id):
+    bump_version("role", user_id)
+
+
+def remember_role(request, user, role):
+    """Store ``role`` in the session, tagged with the current profile version."""
+    session = getattr(getattr(request, "_request", request), "session", None)
+    if session is not None and is_shared():
+        (version,) = get_versions([("role", user.pk)])
+        session[SESSION_KEY] = {"user": user.pk, "version": version, "role": role}
+
+
+def get_role(request):
+    """
+    The request user's role: ``"student"``, ``"lecturer"`` or ``""``.
+
+    Resolved once per request (``RoleMiddleware`` does it up front) and kept
+    in the session next to a version token that changes whenever the user's
+    profile is saved, so later requests skip the profile query until then.
+    The version lives in the dashboard cache, so the session copy is only
+    used when that cache is shared between workers (DASHBOARD_CACHE_DIR);
+    with per-process memory a role change would not reach the other workers.
+    Works with DRF requests too; the role is re-resolved if DRF authenticated
+    a different user than the session did.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return ""
+    http_request = getattr(request, "_request", request)
+    resolved = getattr(http_request, "_resolved_role", None)
+    if resolved is not None and resolved[0] == user.pk:
+        return resolved[1]
+
+    session = getattr(http_request, "session", None)
+    cached = session.get(SESSION_KEY) if session is not None and is_shared() else None
+    if (
+        cached
+        and cached.get("user") == user.pk
+        and cached.get("version") == get_versions([("role", user.pk)])[0]
+    ):
+        role = cached["role"]
+    else:
+        role = role_for_user(user)
+        remember_role(http_request, user, role)
+    http_request._resolved_role = (user.pk, role)
+    return role
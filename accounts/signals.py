@@ -1,9 +1,12 @@
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from accounts.models import Profile
+from accounts.avatars import schedule_avatar_variants
+from accounts.models import AvatarVariant, Profile
+from accounts.roles import invalidate_role, remember_role
 
 
 @receiver(post_save, sender=User)
@@ -14,4 +17,32 @@ def create_user_profiles(sender, instance, created, **kwargs):
 
 @receiver(user_logged_in)
 def ensure_profile_on_login(sender, request, user, **kwargs):
-    Profile.objects.get_or_create(user=user, defaults={"role": "student"})
+    profile, _ = Profile.objects.get_or_create(user=user, defaults={"role": "student"})
+    if request is not None:
+        # The profile is already loaded, so seed the session's cached role.
+        remember_role(request, user, (profile.role or "").strip().lower())
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_role(sender, instance, created=False, update_fields=None, **kwargs):
+    # A new profile has no cached role yet.
+    if created or (update_fields is not None and "role" not in update_fields):
+        return
+    invalidate_role(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def queue_avatar_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "profile_picture" not in update_fields):
+        return
+    picture = instance.profile_picture
+    if picture and not instance.avatar_variants.filter(source=picture.name).exists():
+        schedule_avatar_variants(instance)
+
+
+@receiver(post_delete, sender=AvatarVariant)
+def remove_avatar_variant_file(sender, instance, **kwargs):
+    if instance.file:
+        storage, name = instance.file.storage, instance.file.name
+        transaction.on_commit(lambda: storage.delete(name))
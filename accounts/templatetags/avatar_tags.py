@@ -0,0 +1,22 @@
+from django import template
+
+from accounts.avatars import avatar_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag("accounts/avatar.html")
+def avatar(user, size=64, img_class="", fallback_class=""):
+    """
+    Render ``user``'s picture as a ``size`` px WebP/JPEG ``<picture>``. Until the
+    resized variants exist (or without a picture) the initial is shown instead.
+    """
+    sources = avatar_sources(user, size) if user.is_authenticated else {}
+    return {
+        "user": user,
+        "size": size,
+        "webp": sources.get("webp"),
+        "jpeg": sources.get("jpeg"),
+        "img_class": img_class,
+        "fallback_class": fallback_class,
+    }
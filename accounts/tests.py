@@ -0,0 +1,248 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from accounts.backends import LEGACY_BACKENDS
+from accounts.models import AvatarVariant, Profile
+from accounts.roles import SESSION_KEY, get_role
+from jobs.models import Job
+
+
+class RoleResolutionTests(TestCase):
+    def setUp(self):
+        # The session only caches the role when the version cache is shared.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        shared_cache = override_settings(
+            CACHES={
+                **settings.CACHES,
+                "dashboard": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+            }
+        )
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+
+        self.user = User.objects.create_user(username="role_user", password="pass1234")
+        Profile.objects.update_or_create(user=self.user, defaults={"role": "lecturer"})
+
+    def _profile_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query["sql"] for query in queries if 'FROM "myapp_profile"' in query["sql"]]
+
+    def test_role_comes_from_the_session_after_login(self):
+        self.client.login(username="role_user", password="pass1234")
+        self.assertEqual(self.client.session[SESSION_KEY]["role"], "lecturer")
+
+        response, profile_queries = self._profile_queries(reverse("home"))
+        self.assertEqual(response.context["role"], "lecturer")
+        self.assertEqual(response.context["current_user_role"], "lecturer")
+        self.assertEqual(profile_queries, [])
+
+    def test_saving_the_profile_invalidates_the_cached_role(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("home"))
+
+        profile = Profile.objects.get(user=self.user)
+        profile.role = "student"
+        profile.save()
+
+        # The profile comes joined to the session user, so re-reading the role
+        # costs no query of its own either.
+        response, profile_queries = self._profile_queries(reverse("home"))
+        self.assertEqual(response.context["role"], "student")
+        self.assertEqual(self.client.session[SESSION_KEY]["role"], "student")
+        self.assertEqual(profile_queries, [])
+
+    def test_role_is_not_cached_in_the_session_without_a_shared_cache(self):
+        local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        with override_settings(CACHES={**settings.CACHES, "dashboard": local}):
+            self.client.force_login(self.user)
+            self.client.get(reverse("home"))
+            self.assertNotIn(SESSION_KEY, self.client.session)
+
+            Profile.objects.filter(user=self.user).update(role="student")
+            response, _ = self._profile_queries(reverse("home"))
+            self.assertEqual(response.context["role"], "student")
+
+    def test_other_profile_updates_keep_the_cached_role(self):
+        self.client.force_login(self.user)
+        profile = Profile.objects.get(user=self.user)
+        profile.bio = "Hello"
+        profile.save(update_fields=["bio"])
+
+        _, profile_queries = self._profile_queries(reverse("home"))
+        self.assertEqual(profile_queries, [])
+
+    def test_resolved_once_per_request_and_for_missing_profiles(self):
+        Profile.objects.filter(user=self.user).delete()
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+
+        self.assertEqual(get_role(request), "student")
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(request), "student")
+        self.assertTrue(Profile.objects.filter(user=self.user, role="student").exists())
+
+
+STOCK_AUTH = {
+    "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+    "AUTHENTICATION_BACKENDS": list(LEGACY_BACKENDS),
+    "MIDDLEWARE": [
+        "django.contrib.auth.middleware.AuthenticationMiddleware"
+        if name == "accounts.middleware.AuthenticationMiddleware"
+        else name
+        for name in settings.MIDDLEWARE
+    ],
+}
+
+
+class RequestAuthBenchmarkTests(TestCase):
+    """Round-trips spent on the session, the user and the profile before any view code runs."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auth_user", password="pass1234")
+        Profile.objects.update_or_create(user=self.user, defaults={"role": "student"})
+
+    def _queries(self, url, client=None):
+        client = client or self.client
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries]
+
+    def _reading(self, queries, table):
+        return [sql for sql in queries if sql.startswith("SELECT") and f'FROM "{table}"' in sql]
+
+    def test_round_trips_per_request_before_and_after(self):
+        with override_settings(**STOCK_AUTH):
+            stock_client = self.client_class()
+            stock_client.login(username="auth_user", password="pass1234")
+            before = self._queries(reverse("profile"), stock_client)
+        with override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db"):
+            cached_client = self.client_class()
+            cached_client.login(username="auth_user", password="pass1234")
+            after = self._queries(reverse("profile"), cached_client)
+
+        # Before: the session row, the user and the profile, one round-trip each.
+        self.assertEqual(len(self._reading(before, "django_session")), 1)
+        self.assertEqual(len(self._reading(before, "auth_user")), 1)
+        self.assertEqual(len(self._reading(before, "myapp_profile")), 1)
+        # After: the session comes from the cache and the profile with the user.
+        self.assertEqual(self._reading(after, "django_session"), [])
+        self.assertEqual(self._reading(after, "myapp_profile"), [])
+        self.assertIn('JOIN "myapp_profile"', self._reading(after, "auth_user")[0])
+        self.assertEqual(len(before) - len(after), 2)
+
+    def test_signed_cookie_sessions(self):
+        with override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"):
+            self.client.login(username="auth_user", password="pass1234")
+            queries = self._queries(reverse("profile"))
+            self.assertEqual(self._reading(queries, "django_session"), [])
+            self.assertEqual(len(self._reading(queries, "auth_user")), 1)
+            self.client.logout()
+            self.assertEqual(self.client.get(reverse("profile")).status_code, 302)
+
+    def test_sessions_from_the_stock_backends_stay_logged_in(self):
+        with override_settings(**STOCK_AUTH):
+            self.client.login(username="auth_user", password="pass1234")
+        self.assertIn(self.client.session[BACKEND_SESSION_KEY], LEGACY_BACKENDS)
+
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.context["user"], self.user)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], "accounts.backends.ModelBackend")
+
+
+def _photo(width, height, fmt="JPEG", mode="RGB"):
+    # Noise compresses badly, like a real photo.
+    rng = random.Random(width * height)
+    image = Image.frombytes(mode, (width, height), rng.randbytes(width * height * len(mode)))
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=95)
+    return buffer.getvalue()
+
+
+class AvatarPipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = User.objects.create_user(username="avatar_user", password="pass1234")
+        Profile.objects.update_or_create(user=self.user, defaults={"role": "student"})
+        self.client.force_login(self.user)
+
+    def _upload(self, content, name="me.jpg"):
+        response = self.client.post(
+            reverse("upload_profile_picture"),
+            {"profile_picture": SimpleUploadedFile(name, content), "next": reverse("profile")},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def _run_jobs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("runworker", "--burst", stdout=StringIO())
+
+    def test_variants_are_built_off_the_request_and_served_instead_of_the_original(self):
+        original = _photo(1600, 1200)
+        self._upload(original)
+        profile = Profile.objects.get(user=self.user)
+
+        self.assertFalse(AvatarVariant.objects.exists())
+        page = self.client.get(reverse("profile")).content.decode()
+        self.assertNotIn(profile.profile_picture.url, page)
+        self.assertNotIn("<picture>", page)
+
+        self._run_jobs()
+        variants = {(variant.size, variant.format): variant for variant in AvatarVariant.objects.all()}
+        self.assertCountEqual(variants, [(72, "webp"), (72, "jpeg"), (144, "webp"), (144, "jpeg")])
+        for (size, fmt), variant in variants.items():
+            with Image.open(variant.file.path) as image:
+                self.assertEqual((image.size, image.format), ((size, size), fmt.upper()))
+
+        page = self.client.get(reverse("profile")).content.decode()
+        self.assertIn(f'srcset="{variants[72, "webp"].file.url} 1x, {variants[144, "webp"].file.url} 2x"', page)
+        self.assertNotIn(profile.profile_picture.url, page)
+        # The 2x WebP is what a modern browser fetches instead of the original.
+        self.assertLess(variants[144, "webp"].file.size * 100, len(original))
+
+    def test_replacing_the_picture_replaces_the_variants(self):
+        self._upload(_photo(400, 300))
+        self._run_jobs()
+        old_paths = [variant.file.path for variant in AvatarVariant.objects.all()]
+
+        self._upload(_photo(64, 64, fmt="PNG", mode="RGBA"), name="new.png")
+        self._upload(_photo(300, 400), name="newer.jpg")
+        self.assertEqual(Job.objects.filter(key__startswith="avatars:", status="queued").count(), 1)
+        self._run_jobs()
+
+        source = Profile.objects.get(user=self.user).profile_picture.name
+        self.assertEqual(set(AvatarVariant.objects.values_list("source", flat=True)), {source})
+        self.assertEqual(AvatarVariant.objects.count(), 4)
+        for path in old_paths:
+            self.assertFalse(os.path.exists(path))
+
+    def test_backfill_command_queues_missing_variants(self):
+        self._upload(_photo(200, 200))
+        Job.objects.all().delete()
+
+        call_command("generate_avatars", stdout=StringIO())
+        self._run_jobs()
+        self.assertEqual(AvatarVariant.objects.count(), 4)
@@ -6,10 +6,12 @@ from django.shortcuts import redirect, render
 from django.views.decorators.http import require_POST
 
 from accounts.forms import CustomUserCreationForm
-from accounts.models import Profile
-from assignments.models import Post, Submission
+from accounts.roles import get_role, load_profile
+from assignments.models import Post
 from config.mongodb import log_event
 from courses.models import Course
+from dashboard.reminders import recent_notifications
+from dashboard.views import instructor_submission_feed, student_assignment_pages
 from groups.models import Group
 
 
@@ -52,38 +54,22 @@ def logout_view(request):
 
 @login_required
 def profile_view(request):
-    profile, _ = Profile.objects.get_or_create(
-        user=request.user,
-        defaults={"role": "student"},
-    )
-    role = (profile.role or "").strip().lower()
+    profile = load_profile(request.user)
+    role = get_role(request)
     context = {"role": role, "profile": profile}
 
     if role == "student":
-        assignments = Post.objects.select_related("course", "author").order_by("deadline")
-        submissions = Submission.objects.filter(student=request.user).select_related("post")
-        joined_groups = Group.objects.filter(members=request.user).select_related("post")
-
-        submitted_post_ids = {s.post_id for s in submissions}
-        for assignment in assignments:
-            assignment.has_submitted = assignment.id in submitted_post_ids
-
-        upcoming_assignments = [a for a in assignments if not a.is_overdue]
-        overdue_assignments = [a for a in assignments if a.is_overdue]
-        notifications = [
-            f"Assignment '{a.title}' is due on {a.deadline:%Y-%m-%d %H:%M}"
-            for a in upcoming_assignments[:5]
-        ]
-
         context.update(
-            {
-                "joined_groups": joined_groups,
-                "upcoming_assignments": upcoming_assignments,
-                "overdue_assignments": overdue_assignments,
-                "notifications": notifications,
-            }
+            student_assignment_pages(
+                request.user,
+                upcoming_cursor=request.GET.get("upcoming_cursor"),
+                overdue_cursor=request.GET.get("overdue_cursor"),
+            )
         )
+        context["joined_groups"] = Group.objects.alive().filter(members=request.user).select_related("post")
+        context["notifications"] = recent_notifications(request.user)
     elif role == "lecturer":
+        context.update(instructor_submission_feed(request))
         context.update(
             {
                 "assignments": Post.objects.filter(author=request.user).select_related("course"),
@@ -91,8 +77,7 @@ def profile_view(request):
                     lecturer=request.user,
                     posts__author=request.user,
                 ).distinct().order_by("name"),
-                "submissions": Submission.objects.filter(post__author=request.user).select_related("post", "student"),
-                "groups": Group.objects.filter(post__author=request.user).select_related("post"),
+                "groups": Group.objects.alive().filter(post__author=request.user).select_related("post"),
             }
         )
 
@@ -102,10 +87,7 @@ def profile_view(request):
 @login_required
 @require_POST
 def upload_profile_picture_view(request):
-    profile, _ = Profile.objects.get_or_create(
-        user=request.user,
-        defaults={"role": "student"},
-    )
+    profile = load_profile(request.user)
     image = request.FILES.get("profile_picture")
     if image:
         profile.profile_picture = image
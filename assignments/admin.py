@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from assignments.models import Post, Submission
+from assignments.models import Post, PostStats, StoredBlob, Submission
 
 
 @admin.register(Post)
@@ -14,3 +14,15 @@ class AssignmentAdmin(admin.ModelAdmin):
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ("post", "student", "submitted_at")
     search_fields = ("post__title", "student__username")
+
+
+@admin.register(PostStats)
+class PostStatsAdmin(admin.ModelAdmin):
+    list_display = ("post", "submission_count", "member_count", "group_count", "last_submission_at")
+    readonly_fields = ("submission_count", "member_count", "group_count", "last_submission_at")
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ("digest", "size", "ref_count", "created_at")
+    readonly_fields = ("digest", "size", "ref_count", "created_at")
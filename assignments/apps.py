@@ -5,3 +5,6 @@ class AssignmentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "assignments"
 
+    def ready(self):
+        import assignments.signals  # noqa: F401
+
@@ -0,0 +1,121 @@
+import csv
+import io
+import posixpath
+import zipfile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.text import get_valid_filename
+
+from assignments.models import Submission
+
+READ_CHUNK_SIZE = 64 * 1024
+MANIFEST_FIELDS = ["group", "student", "submitted_at", "file", "submission_link", "supporting_link"]
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return b"".join(chunks)
+
+
+def _safe(name, fallback):
+    try:
+        return get_valid_filename(name)
+    except SuspiciousFileOperation:
+        return fallback
+
+
+def _member_path(submission):
+    group = _safe(submission.group.name, f"group-{submission.group_id}")
+    student = _safe(submission.student.username, f"student-{submission.student_id}")
+    filename = _safe(posixpath.basename(submission.file.name), "file")
+    # Cleaning can map different names to the same one ("Team A", "Team_A"),
+    # so the submission id keeps every entry unique.
+    return f"{group}/{student}/{submission.id}-{filename}"
+
+
+def _submissions(post):
+    return (
+        Submission.objects.filter(post=post)
+        .select_related("group", "student")
+        .order_by("group__name", "student__username", "id")
+    )
+
+
+def stream_submission_archive(post, include_manifest=False):
+    """
+    Yield a ZIP archive of every submission file for ``post`` piece by piece.
+
+    Files are copied in ``READ_CHUNK_SIZE`` blocks and each block is yielded
+    as soon as it is compressed, so neither the archive nor a whole file is
+    ever held in memory or written to disk.
+    """
+    sink = _ZipStream()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+    missing = set()
+
+    for submission in _submissions(post).iterator(chunk_size=200):
+        if not submission.file:
+            continue
+        try:
+            source = submission.file.open("rb")
+        except (FileNotFoundError, OSError):
+            missing.add(submission.id)
+            continue
+        with source:
+            info = zipfile.ZipInfo(_member_path(submission), date_time=submission.submitted_at.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            force_zip64 = (source.size or 0) >= zipfile.ZIP64_LIMIT
+            with archive.open(info, mode="w", force_zip64=force_zip64) as member:
+                for block in source.chunks(READ_CHUNK_SIZE):
+                    member.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+        data = sink.drain()
+        if data:
+            yield data
+
+    if include_manifest:
+        with archive.open("manifest.csv", mode="w") as member:
+            text = io.TextIOWrapper(member, encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            writer.writerow(MANIFEST_FIELDS + ["status"])
+            for submission in _submissions(post).iterator(chunk_size=200):
+                if not submission.file:
+                    path, status = "", "link only"
+                elif submission.id in missing:
+                    path, status = "", "file missing"
+                else:
+                    path, status = _member_path(submission), "included"
+                writer.writerow(
+                    [
+                        submission.group.name,
+                        submission.student.username,
+                        submission.submitted_at.isoformat(),
+                        path,
+                        submission.submission_link or "",
+                        submission.supporting_link or "",
+                        status,
+                    ]
+                )
+                text.flush()
+                data = sink.drain()
+                if data:
+                    yield data
+            text.detach()
+
+    archive.close()
+    yield sink.drain()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from assignments.models import Post, Submission
+from assignments.storage import content_storage
+
+
+class Command(BaseCommand):
+    help = "Move existing submission files and attachments into the content-addressed blob store."
+
+    def handle(self, *args, **options):
+        names = set(Submission.objects.exclude(file="").values_list("file", flat=True))
+        names.update(Post.objects.exclude(attachment="").exclude(attachment=None).values_list("attachment", flat=True))
+
+        shared = 0
+        for name in sorted(names):
+            if content_storage.adopt(name):
+                shared += 1
+        self.stdout.write(self.style.SUCCESS(f"Checked {len(names)} file(s); {shared} now share a stored blob."))
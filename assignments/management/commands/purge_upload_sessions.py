@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assignments import uploads
+from assignments.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = "Delete unfinished upload sessions and their temporary files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Purge sessions idle for this long.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = UploadSession.objects.exclude(status="completed").filter(updated_at__lt=cutoff)
+        purged = 0
+        for session in stale.iterator():
+            uploads.discard(session)
+            session.delete()
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} upload session(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from assignments.models import PostStats
+from assignments.stats import rebuild_post_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized PostStats counters from live submission and group data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("post_ids", nargs="*", type=int, help="Only rebuild these posts.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        post_ids = options["post_ids"] or None
+        with transaction.atomic():
+            if post_ids is None:
+                PostStats.objects.all().delete()
+            rebuilt = rebuild_post_stats(post_ids, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rebuilt} post(s)."))
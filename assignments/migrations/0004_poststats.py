@@ -0,0 +1,60 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_post_stats(apps, schema_editor):
+    Post = apps.get_model("assignments", "Post")
+    PostStats = apps.get_model("assignments", "PostStats")
+    Submission = apps.get_model("assignments", "Submission")
+    Group = apps.get_model("groups", "Group")
+
+    submissions = {
+        row["post_id"]: row
+        for row in Submission.objects.values("post_id").annotate(total=Count("id"), latest=Max("submitted_at"))
+    }
+    groups = {
+        row["post_id"]: row
+        for row in Group.objects.values("post_id").annotate(total=Count("id", distinct=True), members=Count("members"))
+    }
+    PostStats.objects.bulk_create(
+        [
+            PostStats(
+                post_id=post_id,
+                submission_count=submissions.get(post_id, {}).get("total", 0),
+                member_count=groups.get(post_id, {}).get("members", 0),
+                group_count=groups.get(post_id, {}).get("total", 0),
+                last_submission_at=submissions.get(post_id, {}).get("latest"),
+            )
+            for post_id in Post.objects.values_list("id", flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0003_submission_links'),
+        ('groups', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostStats',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='assignments.post')),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('group_count', models.PositiveIntegerField(default=0)),
+                ('last_submission_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'post stats',
+                'db_table': 'myapp_poststats',
+            },
+        ),
+        migrations.RunPython(backfill_post_stats, migrations.RunPython.noop),
+    ]
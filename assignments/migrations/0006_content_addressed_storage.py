@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+import assignments.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0005_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'myapp_storedblob',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=assignments.storage.ContentAddressedStorage(), upload_to='assignments/'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(storage=assignments.storage.ContentAddressedStorage(), upload_to='submissions/'),
+        ),
+    ]
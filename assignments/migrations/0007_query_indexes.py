@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0006_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['deadline', 'id'], name='myapp_post_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'deadline'], name='myapp_post_author_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['post', 'group'], name='myapp_sub_post_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'post'], name='myapp_sub_student_post_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0008_post_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredName',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='names', to='assignments.storedblob')),
+            ],
+            options={
+                'db_table': 'myapp_storedname',
+            },
+        ),
+    ]
@@ -1,7 +1,32 @@
+import uuid
+
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 
+from assignments.storage import content_storage
+
+
+class PostQuerySet(models.QuerySet):
+    def upcoming(self, now=None):
+        return self.filter(deadline__gte=now or timezone.now())
+
+    def overdue(self, now=None):
+        return self.filter(deadline__lt=now or timezone.now())
+
+    def with_submission_flag(self, user):
+        return self.annotate(
+            has_submitted=models.Exists(
+                Submission.objects.filter(post=models.OuterRef("pk"), student=user)
+            )
+        )
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    def get_queryset(self):
+        # Deleted posts wait for the ``delete_post`` job; nothing else sees them.
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Post(models.Model):
     GROUP_TYPE_CHOICES = (
@@ -14,7 +39,7 @@ class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     deadline = models.DateTimeField(help_text="Submission deadline")
-    attachment = models.FileField(upload_to="assignments/", blank=True, null=True)
+    attachment = models.FileField(upload_to="assignments/", storage=content_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     group_type = models.CharField(max_length=20, choices=GROUP_TYPE_CHOICES, default="individual")
     max_students_per_group = models.IntegerField(null=True, blank=True)
@@ -25,9 +50,17 @@ class Post(models.Model):
         blank=True,
         related_name="posts",
     )
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = PostManager()
+    all_objects = PostQuerySet.as_manager()
 
     class Meta:
         db_table = "myapp_post"
+        indexes = [
+            models.Index(fields=["deadline", "id"], name="myapp_post_deadline_idx"),
+            models.Index(fields=["author", "deadline"], name="myapp_post_author_deadline_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -48,18 +81,112 @@ class Post(models.Model):
         return "Pending"
 
 
+class SubmissionQuerySet(models.QuerySet):
+    def alive(self):
+        """Submissions whose post is not waiting for the ``delete_post`` job."""
+        return self.filter(post__deleted_at__isnull=True)
+
+
 class Submission(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="submissions")
     group = models.ForeignKey("groups.Group", on_delete=models.CASCADE)
     student = models.ForeignKey(User, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="submissions/")
+    file = models.FileField(upload_to="submissions/", storage=content_storage)
     submission_link = models.URLField(blank=True, null=True)
     supporting_link = models.URLField(blank=True, null=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    objects = SubmissionQuerySet.as_manager()
+
     class Meta:
         db_table = "myapp_submission"
         unique_together = ("post", "student")
+        indexes = [
+            models.Index(fields=["post", "group"], name="myapp_sub_post_group_idx"),
+            models.Index(fields=["student", "post"], name="myapp_sub_student_post_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.post.title}"
+
+
+class PostStats(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    submission_count = models.PositiveIntegerField(default=0)
+    member_count = models.PositiveIntegerField(default=0)
+    group_count = models.PositiveIntegerField(default=0)
+    last_submission_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "myapp_poststats"
+        verbose_name_plural = "post stats"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.submission_count}/{self.member_count}"
+
+    @property
+    def progress(self):
+        return f"{self.submission_count}/{self.member_count}" if self.member_count else "0/0"
+
+
+class UploadSession(models.Model):
+    STATUS_CHOICES = (
+        ("open", "Open"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    submission = models.OneToOneField(
+        Submission,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_session",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "myapp_uploadsession"
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def is_complete(self):
+        return self.received_bytes >= self.total_size
+
+
+class StoredBlob(models.Model):
+    digest = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "myapp_storedblob"
+
+    def __str__(self):
+        return f"{self.digest[:12]} x{self.ref_count}"
+
+
+class StoredName(models.Model):
+    """A file name linked to a blob, so deleting it needs no re-hash of the file."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    blob = models.ForeignKey(StoredBlob, on_delete=models.CASCADE, related_name="names")
+
+    class Meta:
+        db_table = "myapp_storedname"
+
+    def __str__(self):
+        return self.name
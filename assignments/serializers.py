@@ -1,11 +1,22 @@
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.utils import timezone
 from rest_framework import serializers
 
-from assignments.models import Post, Submission
+from accounts.roles import get_role
+from assignments.models import Post, PostStats, Submission, UploadSession
 from groups.models import Group
 
 
+class PostStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PostStats
+        fields = ["submission_count", "member_count", "group_count", "last_submission_at"]
+
+
 class AssignmentSerializer(serializers.ModelSerializer):
+    stats = PostStatsSerializer(read_only=True)
+
     class Meta:
         model = Post
         fields = "__all__"
@@ -16,11 +27,7 @@ class AssignmentSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             raise serializers.ValidationError("Authentication is required.")
 
-        role = (
-            (request.user.profile.role or "").strip().lower()
-            if hasattr(request.user, "profile")
-            else ""
-        )
+        role = get_role(request)
         if role != "lecturer":
             raise serializers.ValidationError("Only lecturers can create assignments.")
         return data
@@ -46,11 +53,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             raise serializers.ValidationError("Authentication is required.")
 
-        role = (
-            (request.user.profile.role or "").strip().lower()
-            if hasattr(request.user, "profile")
-            else ""
-        )
+        role = get_role(request)
         if role != "student":
             raise serializers.ValidationError("Only students can submit.")
 
@@ -72,3 +75,76 @@ class SubmissionSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("You must join your group before submitting.")
 
         return data
+
+
+class UploadSubmissionSerializer(SubmissionSerializer):
+    """Submission from a finished upload; the view supplies an individual post's group on save."""
+
+    class Meta(SubmissionSerializer.Meta):
+        extra_kwargs = {**SubmissionSerializer.Meta.extra_kwargs, "group": {"required": False}}
+
+
+class ReviewSubmissionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Submission
+        fields = ["id", "file", "submission_link", "supporting_link", "submitted_at"]
+
+
+class ReviewGridRowSerializer(serializers.ModelSerializer):
+    """One roster student; expects ``post_submissions`` to be prefetched."""
+
+    full_name = serializers.CharField(source="get_full_name", read_only=True)
+    submitted = serializers.SerializerMethodField()
+    submission = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "full_name", "email", "submitted", "submission"]
+
+    def get_submitted(self, obj):
+        return bool(obj.post_submissions)
+
+    def get_submission(self, obj):
+        if not obj.post_submissions:
+            return None
+        return ReviewSubmissionSerializer(obj.post_submissions[0], context=self.context).data
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "post",
+            "filename",
+            "total_size",
+            "chunk_size",
+            "sha256",
+            "received_bytes",
+            "status",
+            "submission",
+            "created_at",
+        ]
+        read_only_fields = ("chunk_size", "received_bytes", "status", "submission", "created_at")
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("File is empty.")
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("File is too large.")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.strip().lower()
+        if len(value) != 64 or any(ch not in "0123456789abcdef" for ch in value):
+            raise serializers.ValidationError("Provide the file's SHA-256 as 64 hex characters.")
+        return value
+
+    def validate(self, data):
+        request = self.context.get("request")
+        post = data["post"]
+        if timezone.now() > post.deadline:
+            raise serializers.ValidationError("Deadline has passed.")
+        if Submission.objects.filter(post=post, student=request.user).exists():
+            raise serializers.ValidationError("You already submitted this assignment.")
+        return data
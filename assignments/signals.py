@@ -0,0 +1,98 @@
+import threading
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from assignments import stats
+from assignments.models import Post, PostStats, Submission
+from groups.models import Group
+
+_state = threading.local()
+
+
+def _deleting_posts():
+    if not hasattr(_state, "posts"):
+        _state.posts = set()
+    return _state.posts
+
+
+@receiver(post_save, sender=Post)
+def create_post_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        PostStats.objects.get_or_create(post=instance)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    # Cascaded submission/group deletes must not recreate the stats row.
+    _deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.pk)
+
+
+def _release_file(field_file):
+    # Drops this name's reference to the shared blob once the row is gone.
+    if field_file:
+        storage, name = field_file.storage, field_file.name
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_delete, sender=Post)
+def release_post_attachment(sender, instance, **kwargs):
+    _release_file(instance.attachment)
+
+
+@receiver(post_save, sender=Submission)
+def count_submission(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.record_submission_added(instance.post_id, instance.submitted_at)
+
+
+@receiver(post_delete, sender=Submission)
+def uncount_submission(sender, instance, **kwargs):
+    _release_file(instance.file)
+    if instance.post_id not in _deleting_posts():
+        stats.record_submission_removed(instance.post_id)
+
+
+@receiver(post_save, sender=Group)
+def count_group(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.record_groups_changed(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=Group)
+def uncount_group(sender, instance, **kwargs):
+    if instance.post_id not in _deleting_posts():
+        # Membership rows vanish with the group without m2m_changed firing.
+        stats.record_groups_changed(instance.post_id, -1, member_delta=-instance.members.count())
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def count_group_members(sender, instance, action, reverse, pk_set, **kwargs):
+    through = Group.members.through
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set may name rows that do not exist, so measure the real change
+        # before it happens.
+        rows = through.objects.filter(user_id=instance.pk) if reverse else through.objects.filter(group_id=instance.pk)
+        if action == "pre_remove":
+            rows = rows.filter(**{"group_id__in" if reverse else "user_id__in": pk_set})
+        instance._post_stats_removed = Counter(rows.values_list("group__post_id", flat=True))
+        return
+
+    if action == "post_add":
+        if reverse:
+            changed = Counter(Group.objects.filter(id__in=pk_set).values_list("post_id", flat=True))
+        else:
+            changed = Counter({instance.post_id: len(pk_set)})
+        for post_id, delta in changed.items():
+            stats.record_members_changed(post_id, delta)
+    elif action in ("post_remove", "post_clear"):
+        for post_id, delta in getattr(instance, "_post_stats_removed", Counter()).items():
+            stats.record_members_changed(post_id, -delta)
+        instance._post_stats_removed = Counter()
@@ -0,0 +1,113 @@
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from assignments.models import Post, PostStats, Submission
+from groups.models import Group
+
+STATS_FIELDS = ["submission_count", "member_count", "group_count", "last_submission_at"]
+
+
+def _total(queryset, group_field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_field).annotate(total=Count("pk")).values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def annotate_live_totals(posts):
+    """Aggregate the counters live; used to rebuild ``PostStats`` rows."""
+    return posts.annotate(
+        submission_total=_total(Submission.objects.filter(post=OuterRef("pk")), "post"),
+        member_total=_total(Group.members.through.objects.filter(group__post=OuterRef("pk")), "group__post"),
+        group_total=_total(Group.objects.filter(post=OuterRef("pk")), "post"),
+        last_submission=Subquery(
+            Submission.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(latest=Max("submitted_at"))
+            .values("latest")
+        ),
+    )
+
+
+def rebuild_post_stats(post_ids=None, batch_size=500):
+    posts = Post.objects.order_by("pk")
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    rows = annotate_live_totals(posts).values_list(
+        "pk", "submission_total", "member_total", "group_total", "last_submission"
+    )
+
+    rebuilt = 0
+    batch = []
+    for post_id, submissions, members, groups, last_submission in rows.iterator(chunk_size=batch_size):
+        batch.append(
+            PostStats(
+                post_id=post_id,
+                submission_count=submissions,
+                member_count=members,
+                group_count=groups,
+                last_submission_at=last_submission,
+            )
+        )
+        if len(batch) >= batch_size:
+            rebuilt += _write(batch)
+            batch = []
+    if batch:
+        rebuilt += _write(batch)
+    return rebuilt
+
+
+def _write(batch):
+    PostStats.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["post"],
+        update_fields=STATS_FIELDS,
+    )
+    return len(batch)
+
+
+def _apply(post_id, **updates):
+    # A missing row is rebuilt from live data, which already includes this change.
+    if not PostStats.objects.filter(post_id=post_id).update(**updates):
+        rebuild_post_stats([post_id])
+
+
+def _shift(field, delta):
+    if delta >= 0:
+        return F(field) + delta
+    return Greatest(F(field) + delta, Value(0))
+
+
+def record_submission_added(post_id, submitted_at):
+    _apply(
+        post_id,
+        submission_count=_shift("submission_count", 1),
+        last_submission_at=Greatest(Coalesce(F("last_submission_at"), Value(submitted_at)), Value(submitted_at)),
+    )
+
+
+def record_submission_removed(post_id):
+    _apply(
+        post_id,
+        submission_count=_shift("submission_count", -1),
+        last_submission_at=Subquery(
+            Submission.objects.filter(post_id=post_id).order_by("-submitted_at").values("submitted_at")[:1]
+        ),
+    )
+
+
+def record_groups_changed(post_id, delta, member_delta=0):
+    updates = {"group_count": _shift("group_count", delta)}
+    if member_delta:
+        updates["member_count"] = _shift("member_count", member_delta)
+    _apply(post_id, **updates)
+
+
+def record_members_changed(post_id, delta):
+    if delta:
+        _apply(post_id, member_count=_shift("member_count", delta))
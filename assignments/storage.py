@@ -0,0 +1,174 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = ".blobs"
+READ_SIZE = 64 * 1024
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for piece in iter(lambda: source.read(READ_SIZE), b""):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once under ``.blobs/<aa>/<sha256>`` and hard-links
+    it to the usual ``upload_to`` name, so ``.url``, ``.path`` and media
+    serving are unchanged. ``StoredBlob.ref_count`` tracks the links; the blob
+    is removed when the last name pointing at it is deleted. ``StoredName``
+    maps each linked name to its blob so deletes never re-read the file.
+    """
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest)
+
+    def _stage(self, content):
+        staging_dir = os.path.join(self.location, BLOB_DIR, "tmp")
+        os.makedirs(staging_dir, exist_ok=True)
+        staged = os.path.join(staging_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, "seek"):
+            content.seek(0)
+        with open(staged, "wb") as target:
+            for chunk in content.chunks(READ_SIZE):
+                digest.update(chunk)
+                target.write(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size, staged
+
+    def _link(self, blob_path, name):
+        """Hard-link the blob to a free variant of ``name``; return ``(name, linked)``."""
+        while True:
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(blob_path, path)
+                linked = True
+            except FileExistsError:
+                name = self.get_available_name(name)
+                continue
+            except OSError:
+                # No hard links on this filesystem; store a plain copy instead.
+                if os.path.exists(path):
+                    name = self.get_available_name(name)
+                    continue
+                shutil.copyfile(blob_path, path)
+                linked = False
+            if self.file_permissions_mode is not None:
+                os.chmod(path, self.file_permissions_mode)
+            return name, linked
+
+    def _is_linked(self, path, digest):
+        blob_path = self.blob_path(digest)
+        return os.path.exists(blob_path) and os.path.samefile(path, blob_path)
+
+    def _digest_of(self, name, path):
+        """The blob digest behind ``name``; hashes only files saved before names were recorded."""
+        from assignments.models import StoredName
+
+        digest = StoredName.objects.filter(pk=name).values_list("blob_id", flat=True).first()
+        return digest or _hash_file(path)
+
+    def _release(self, digest):
+        from assignments.models import StoredBlob
+
+        blob = StoredBlob.objects.select_for_update().filter(pk=digest).first()
+        if blob is None:
+            return
+        if blob.ref_count > 1:
+            StoredBlob.objects.filter(pk=digest).update(ref_count=F("ref_count") - 1)
+            return
+        blob.delete()
+        try:
+            os.remove(self.blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _save(self, name, content):
+        from assignments.models import StoredBlob, StoredName
+
+        digest, size, staged = self._stage(content)
+        try:
+            with transaction.atomic():
+                # A concurrent delete may drop the row between the two queries.
+                while not StoredBlob.objects.filter(pk=digest).update(ref_count=F("ref_count") + 1):
+                    StoredBlob.objects.get_or_create(digest=digest, defaults={"size": size})
+                blob_path = self.blob_path(digest)
+                if not os.path.exists(blob_path):
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    os.replace(staged, blob_path)
+                name, linked = self._link(blob_path, name)
+                name = name.replace("\\", "/")
+                if linked:
+                    StoredName.objects.update_or_create(name=name, defaults={"blob_id": digest})
+                else:
+                    self._release(digest)
+        finally:
+            if os.path.exists(staged):
+                os.remove(staged)
+        return name
+
+    def delete(self, name):
+        from assignments.models import StoredName
+
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        path = self.path(name)
+        if not os.path.exists(path):
+            return
+        digest = self._digest_of(name, path)
+        linked = self._is_linked(path, digest)
+        super().delete(name)
+        with transaction.atomic():
+            StoredName.objects.filter(pk=name).delete()
+            if linked:
+                self._release(digest)
+
+    def adopt(self, name):
+        """
+        Move an existing plain file into the blob store, replacing it with a
+        link. Returns ``True`` if the file now shares a blob with another name.
+        """
+        from assignments.models import StoredBlob, StoredName
+
+        path = self.path(name)
+        if not os.path.isfile(path):
+            return False
+        digest = _hash_file(path)
+        if self._is_linked(path, digest):
+            return False
+        blob_path = self.blob_path(digest)
+        with transaction.atomic():
+            StoredBlob.objects.get_or_create(digest=digest, defaults={"size": os.path.getsize(path)})
+            blob = StoredBlob.objects.select_for_update().get(pk=digest)
+            shared = os.path.exists(blob_path)
+            try:
+                if shared:
+                    replacement = f"{path}.{uuid.uuid4().hex}"
+                    os.link(blob_path, replacement)
+                    os.replace(replacement, path)
+                else:
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    os.link(path, blob_path)
+            except OSError:
+                if not blob.ref_count:
+                    blob.delete()
+                return False
+            StoredBlob.objects.filter(pk=digest).update(ref_count=F("ref_count") + 1)
+            StoredName.objects.update_or_create(name=name, defaults={"blob_id": digest})
+        return shared
+
+
+content_storage = ContentAddressedStorage()
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.utils import timezone
+
+from assignments.models import Post
+from jobs.queue import PRIORITY_HIGH, enqueue
+
+
+def delete_post(post_id):
+    # Cascades to groups, memberships, submissions and their stored files.
+    Post.all_objects.filter(pk=post_id).delete()
+
+
+def schedule_post_delete(post):
+    """Hide ``post`` now and queue ``delete_post`` for once the change commits."""
+    with transaction.atomic():
+        post.deleted_at = timezone.now()
+        post.save(update_fields=["deleted_at"])
+        transaction.on_commit(
+            lambda: enqueue(delete_post, priority=PRIORITY_HIGH, key=f"assignments.delete:{post.pk}", post_id=post.pk)
+        )
@@ -1,14 +1,32 @@
+import csv
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import zipfile
 from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from accounts.models import Profile
-from assignments.models import Post, Submission
+from assignments.models import Post, PostStats, StoredBlob, StoredName, Submission, UploadSession
+from assignments.storage import content_storage
 from courses.models import Course
+from groups.allocation import sync_groups
 from groups.models import Group
+from jobs.models import Job
 
 
 class JoinGroupApiTests(TestCase):
@@ -124,6 +142,44 @@ class AssignmentDetailTests(TestCase):
         response = self.client.post(url, data={}, follow=False)
         self.assertEqual(response.status_code, 403)
 
+    def test_detail_page_is_read_only_within_query_budget(self):
+        Group.objects.create(post=self.post, name="Group B").members.add(self.lecturer)
+        self.group.members.add(self.student)
+        individual = Post.objects.create(
+            author=self.lecturer,
+            title="Solo",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="individual",
+        )
+        self.client.login(username="studentA", password="pass1234")
+
+        for post in (self.post, individual):
+            url = reverse("assignment_detail", kwargs={"post_id": post.id})
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(queries), 6, [query["sql"] for query in queries])
+            self.assertFalse(
+                [query for query in queries if not query["sql"].lstrip().upper().startswith("SELECT")]
+            )
+
+    def test_manual_post_without_groups_is_not_provisioned_on_view(self):
+        empty = Post.objects.create(
+            author=self.lecturer,
+            title="Empty",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+        )
+        self.client.login(username="studentA", password="pass1234")
+        self.client.get(reverse("assignment_detail", kwargs={"post_id": empty.id}))
+        self.assertFalse(Group.objects.filter(post=empty).exists())
+
+        call_command("provision_groups", stdout=StringIO())
+        call_command("provision_groups", stdout=StringIO())
+        self.assertEqual(list(Group.objects.filter(post=empty).values_list("name", flat=True)), ["Group 1"])
+
 
 class InstructorPostCrudAndGroupingTests(TestCase):
     def setUp(self):
@@ -150,6 +206,9 @@ class InstructorPostCrudAndGroupingTests(TestCase):
         )
         self.assertEqual(response.status_code, 201)
         post_id = response.json()["id"]
+        self.assertFalse(Group.objects.filter(post_id=post_id).exists())
+
+        call_command("runworker", "--burst", stdout=StringIO())
         self.assertEqual(Group.objects.filter(post_id=post_id).count(), 3)
 
     def test_instructor_can_only_update_own_post(self):
@@ -191,6 +250,75 @@ class InstructorPostCrudAndGroupingTests(TestCase):
         self.assertEqual(own_post.title, "Own Updated")
         self.assertEqual(other_post.title, "Other")
 
+    def test_api_delete_hides_the_post_and_queues_the_cascade(self):
+        post = Post.objects.create(
+            author=self.lecturer1,
+            title="Doomed",
+            content="X",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="individual",
+        )
+        self.client.login(username="lect1", password="pass1234")
+        url = reverse("assignment_api_detail", kwargs={"pk": post.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNotNone(Post.all_objects.get(pk=post.id).deleted_at)
+        self.assertFalse(Post.objects.filter(pk=post.id).exists())
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertTrue(Job.objects.filter(key=f"assignments.delete:{post.id}", status="queued").exists())
+
+        call_command("runworker", "--burst", stdout=StringIO())
+        self.assertFalse(Post.all_objects.filter(pk=post.id).exists())
+
+
+class GroupGenerationBenchmarkTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="bulk_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+
+    def _enrol(self, count, start=0):
+        users = User.objects.bulk_create(User(username=f"bulk_{i}") for i in range(start, start + count))
+        Profile.objects.bulk_create(Profile(user=user, role="student") for user in users)
+
+    def _generate(self, group_type="automatic"):
+        post = Post.objects.create(
+            author=self.lecturer,
+            title="Bulk",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type=group_type,
+            max_students_per_group=3,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            sync_groups(post)
+        return post, len(queries)
+
+    def test_ten_thousand_students_take_a_handful_of_statements(self):
+        self._enrol(100)
+        _, small = self._generate()
+        self._enrol(9900, start=100)
+        post, large = self._generate()
+
+        # SQLite caps variables per INSERT, so allow for its extra batches;
+        # the per-student query pattern would need ~30,000 here.
+        self.assertLessEqual(large, 40)
+        self.assertLess(large - small, 30)
+        self.assertEqual(Group.objects.filter(post=post).count(), 3334)
+        self.assertEqual(Group.members.through.objects.filter(group__post=post).count(), 10000)
+        self.assertFalse(Group.objects.filter(post=post).annotate(size=Count("members")).filter(size__gt=3).exists())
+
+        stats = PostStats.objects.get(post=post)
+        self.assertEqual((stats.group_count, stats.member_count), (3334, 10000))
+
+    def test_manual_mode_creates_empty_groups(self):
+        self._enrol(10)
+        post, _ = self._generate(group_type="manual")
+        self.assertEqual(Group.objects.filter(post=post).count(), 4)
+        self.assertFalse(Group.members.through.objects.filter(group__post=post).exists())
+        self.assertEqual(PostStats.objects.get(post=post).group_count, 4)
+
 
 class InstructorHtmlCrudTests(TestCase):
     def setUp(self):
@@ -234,3 +362,594 @@ class InstructorHtmlCrudTests(TestCase):
         self.assertEqual(edit_response.status_code, 403)
         self.assertEqual(delete_response.status_code, 403)
 
+    def test_deleted_assignment_is_hidden_before_the_worker_runs(self):
+        self.client.login(username="lect_html", password="pass1234")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("assignment_delete", kwargs={"post_id": self.post.id}))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.all_objects.filter(pk=self.post.id).exists())
+
+        self.client.login(username="stud_html", password="pass1234")
+        detail = self.client.get(reverse("assignment_detail", kwargs={"post_id": self.post.id}))
+        self.assertEqual(detail.status_code, 404)
+        dashboard = self.client.get(reverse("dashboard_assignments_api"))
+        self.assertNotIn(self.post.id, [item["id"] for item in dashboard.json()["results"]])
+        submit = self.client.post(
+            reverse("assignment_submit"),
+            data={"post": self.post.id, "file": SimpleUploadedFile("late.txt", b"late")},
+        )
+        self.assertEqual(submit.status_code, 400)
+        self.assertIn("post", submit.json())
+
+        call_command("runworker", "--burst", stdout=StringIO())
+        self.assertFalse(Post.all_objects.filter(pk=self.post.id).exists())
+
+
+
+class AssignmentListPaginationTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="lect_pages", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        deadline = timezone.now() + timedelta(days=1)
+        for i in range(5):
+            Post.objects.create(
+                author=self.lecturer,
+                title=f"Paged {i}",
+                content="Body",
+                deadline=deadline,
+                group_type="individual",
+            )
+
+    def test_list_is_cursor_paginated_on_deadline_and_id(self):
+        self.client.login(username="lect_pages", password="pass1234")
+        url = reverse("assignment_list_create")
+
+        ids = []
+        response = self.client.get(url, {"page_size": 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            ids.extend(item["id"] for item in body["results"])
+            if not body["next_cursor"]:
+                break
+            response = self.client.get(url, {"page_size": 2, "cursor": body["next_cursor"]})
+
+        self.assertEqual(ids, sorted(Post.objects.values_list("id", flat=True)))
+
+    def test_invalid_cursor_returns_404(self):
+        self.client.login(username="lect_pages", password="pass1234")
+        response = self.client.get(reverse("assignment_list_create"), {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostStatsTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="stats_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.students = [User.objects.create(username=f"stats_student_{i}") for i in range(4)]
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Stats",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=4,
+        )
+        self.group = Group.objects.create(post=self.post, name="Group 1")
+
+    def _stats(self):
+        return PostStats.objects.get(post=self.post)
+
+    def test_counters_follow_membership_and_submissions(self):
+        self.group.members.add(*self.students[:3])
+        self.group.members.add(self.students[0])
+        self.students[3].assignment_groups.add(self.group)
+        self.assertEqual(self._stats().member_count, 4)
+
+        submission = Submission.objects.create(
+            post=self.post, group=self.group, student=self.students[0], file="submissions/s.txt"
+        )
+        stats = self._stats()
+        self.assertEqual(stats.submission_count, 1)
+        self.assertEqual(stats.last_submission_at, submission.submitted_at)
+        self.assertEqual(stats.progress, "1/4")
+
+        self.group.members.remove(self.students[0], self.lecturer)
+        self.assertEqual(self._stats().member_count, 3)
+        self.group.members.clear()
+        self.assertEqual(self._stats().member_count, 0)
+
+        submission.delete()
+        stats = self._stats()
+        self.assertEqual(stats.submission_count, 0)
+        self.assertIsNone(stats.last_submission_at)
+
+    def test_group_delete_removes_its_members_from_counts(self):
+        other = Group.objects.create(post=self.post, name="Group 2")
+        other.members.add(*self.students[:2])
+        self.assertEqual(self._stats().group_count, 2)
+
+        other.delete()
+        stats = self._stats()
+        self.assertEqual(stats.group_count, 1)
+        self.assertEqual(stats.member_count, 0)
+
+    def test_post_delete_cascades_cleanly(self):
+        self.group.members.add(self.students[0])
+        Submission.objects.create(post=self.post, group=self.group, student=self.students[0], file="x.txt")
+        self.post.delete()
+        self.assertFalse(PostStats.objects.exists())
+
+    def test_rebuild_command_matches_live_counts(self):
+        self.group.members.add(*self.students)
+        Submission.objects.create(post=self.post, group=self.group, student=self.students[1], file="x.txt")
+        PostStats.objects.filter(post=self.post).update(submission_count=99, member_count=0, group_count=7)
+
+        call_command("rebuild_post_stats", stdout=StringIO())
+
+        stats = self._stats()
+        self.assertEqual(
+            (stats.submission_count, stats.member_count, stats.group_count),
+            (1, 4, 1),
+        )
+
+    def test_api_exposes_counters(self):
+        self.group.members.add(*self.students[:2])
+        self.client.login(username="stats_lect", password="pass1234")
+        response = self.client.get(reverse("assignment_api_detail", kwargs={"pk": self.post.id}))
+        self.assertEqual(response.json()["stats"]["member_count"], 2)
+
+
+class AssignmentReviewGridTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="grid_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.course = Course.objects.create(name="Grid Course", lecturer=self.lecturer)
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Grid",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="individual",
+            course=self.course,
+        )
+        self.group = Group.objects.create(post=self.post, name="solo")
+        self.roster = []
+        for i in range(6):
+            student = User.objects.create(username=f"grid_{i:02d}")
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+            self.roster.append(student)
+        self.course.student.add(*self.roster)
+        outsider = User.objects.create(username="grid_outsider")
+        Profile.objects.update_or_create(user=outsider, defaults={"role": "student"})
+        Submission.objects.create(post=self.post, group=self.group, student=self.roster[1], file="s.txt")
+        self.client.login(username="grid_lect", password="pass1234")
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_review_grid_is_scoped_to_roster_in_constant_queries(self):
+        url = reverse("assignment_review", kwargs={"pk": self.post.id})
+        baseline, response = self._count_queries(url)
+
+        rows = response.context["review_data"]
+        self.assertEqual([row["student"].username for row in rows], [s.username for s in self.roster])
+        self.assertEqual([row["submitted"] for row in rows], [False, True, False, False, False, False])
+
+        extra = [User.objects.create(username=f"grid_extra_{i}") for i in range(20)]
+        for student in extra:
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+        self.course.student.add(*extra)
+        queries, response = self._count_queries(url)
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.context["review_data"]), 26)
+
+    def test_review_grid_json_is_paginated(self):
+        url = reverse("assignment_review_grid", kwargs={"pk": self.post.id})
+        response = self.client.get(url, {"page_size": 4})
+        body = response.json()
+
+        self.assertEqual([row["username"] for row in body["results"]], ["grid_00", "grid_01", "grid_02", "grid_03"])
+        self.assertTrue(body["results"][1]["submitted"])
+        self.assertIsNotNone(body["results"][1]["submission"]["submitted_at"])
+
+        response = self.client.get(url, {"page_size": 4, "cursor": body["next_cursor"]})
+        body = response.json()
+        self.assertEqual([row["username"] for row in body["results"]], ["grid_04", "grid_05"])
+        self.assertIsNone(body["next_cursor"])
+
+    def test_review_grid_json_requires_ownership(self):
+        other = User.objects.create_user(username="grid_other", password="pass1234")
+        Profile.objects.update_or_create(user=other, defaults={"role": "lecturer"})
+        self.client.login(username="grid_other", password="pass1234")
+        response = self.client.get(reverse("assignment_review_grid", kwargs={"pk": self.post.id}))
+        self.assertEqual(response.status_code, 404)
+
+
+class SubmissionArchiveTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.lecturer = User.objects.create_user(username="zip_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Zip",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=3,
+        )
+        self.group = Group.objects.create(post=self.post, name="Team A")
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.group.members.add(self.alice, self.bob)
+
+        self.payload = os.urandom(200 * 1024)
+        self.report = Submission.objects.create(
+            post=self.post,
+            group=self.group,
+            student=self.alice,
+            file=SimpleUploadedFile("report.pdf", self.payload),
+            submission_link="https://example.com/alice",
+        )
+        Submission.objects.create(
+            post=self.post,
+            group=self.group,
+            student=self.bob,
+            submission_link="https://example.com/bob",
+            supporting_link="https://example.com/bob-extra",
+        )
+
+    def _download(self, **params):
+        self.client.login(username="zip_lect", password="pass1234")
+        url = reverse("assignment_submissions_download", kwargs={"pk": self.post.id})
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_archive_contains_files_by_group_and_student(self):
+        archive = self._download()
+        path = f"Team_A/alice/{self.report.id}-report.pdf"
+        self.assertEqual(archive.namelist(), [path])
+        self.assertEqual(archive.read(path), self.payload)
+
+    def test_names_that_clean_to_the_same_path_stay_apart(self):
+        twin = Group.objects.create(post=self.post, name="Team_A")
+        alias = User.objects.create(username="alice@")
+        twin.members.add(alias)
+        other = Submission.objects.create(
+            post=self.post,
+            group=twin,
+            student=alias,
+            file=content_storage.save("submissions/twin/report.pdf", ContentFile(b"second")),
+        )
+
+        archive = self._download()
+        names = archive.namelist()
+        self.assertEqual(len(set(names)), 2)
+        self.assertEqual(archive.read(f"Team_A/alice/{self.report.id}-report.pdf"), self.payload)
+        self.assertEqual(archive.read(f"Team_A/alice/{other.id}-report.pdf"), b"second")
+
+    def test_manifest_lists_links(self):
+        archive = self._download(manifest="1")
+        rows = list(csv.DictReader(io.StringIO(archive.read("manifest.csv").decode())))
+
+        self.assertEqual([row["student"] for row in rows], ["alice", "bob"])
+        self.assertEqual(rows[0]["file"], f"Team_A/alice/{self.report.id}-report.pdf")
+        self.assertEqual(rows[1]["status"], "link only")
+        self.assertEqual(rows[1]["supporting_link"], "https://example.com/bob-extra")
+
+    def test_only_owner_can_download(self):
+        other = User.objects.create_user(username="zip_other", password="pass1234")
+        Profile.objects.update_or_create(user=other, defaults={"role": "lecturer"})
+        self.client.login(username="zip_other", password="pass1234")
+        url = reverse("assignment_submissions_download", kwargs={"pk": self.post.id})
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.upload_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.upload_root, ignore_errors=True)
+        upload_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            UPLOAD_TEMP_DIR=self.upload_root,
+            UPLOAD_CHUNK_SIZE=64 * 1024,
+        )
+        upload_override.enable()
+        self.addCleanup(upload_override.disable)
+
+        self.lecturer = User.objects.create_user(username="up_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.student = User.objects.create_user(username="up_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Upload",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="individual",
+        )
+        self.payload = os.urandom(150 * 1024)
+        self.client.login(username="up_student", password="pass1234")
+
+    def _start(self, payload=None):
+        payload = self.payload if payload is None else payload
+        response = self.client.post(
+            reverse("upload_session_create"),
+            {
+                "post": self.post.id,
+                "filename": "thesis.pdf",
+                "total_size": len(self.payload),
+                "sha256": hashlib.sha256(payload).hexdigest(),
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def _put(self, session, offset, size=None):
+        chunk_size = session["chunk_size"]
+        body = self.payload[offset : offset + (size or chunk_size)]
+        url = reverse("upload_session_chunk", kwargs={"pk": session["id"]})
+        return self.client.put(f"{url}?offset={offset}", body, content_type="application/octet-stream")
+
+    def _upload_all(self, session):
+        for offset in range(0, len(self.payload), session["chunk_size"]):
+            self.assertEqual(self._put(session, offset).status_code, 200)
+
+    def test_chunks_resume_and_complete_into_submission(self):
+        session = self._start()
+        self.assertEqual(self._put(session, 0).status_code, 200)
+        # A retried chunk is accepted without moving the offset.
+        retry = self._put(session, 0)
+        self.assertEqual(retry.json()["received_bytes"], session["chunk_size"])
+
+        status = self.client.get(reverse("upload_session_detail", kwargs={"pk": session["id"]})).json()
+        self.assertEqual(status["received_bytes"], session["chunk_size"])
+        for offset in range(status["received_bytes"], len(self.payload), session["chunk_size"]):
+            self.assertEqual(self._put(session, offset).status_code, 200)
+
+        response = self.client.post(reverse("upload_session_complete", kwargs={"pk": session["id"]}))
+        self.assertEqual(response.status_code, 201, response.content)
+        submission = Submission.objects.get(post=self.post, student=self.student)
+        with submission.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.payload)
+        self.assertEqual(submission.group.name, "up_student-individual")
+        self.assertEqual(UploadSession.objects.get(pk=session["id"]).status, "completed")
+        self.assertEqual(os.listdir(self.upload_root), [])
+
+    def test_out_of_order_and_short_chunks_are_rejected(self):
+        session = self._start()
+        self.assertEqual(self._put(session, session["chunk_size"]).status_code, 409)
+        self.assertEqual(self._put(session, 0, size=10).status_code, 400)
+        self.assertEqual(UploadSession.objects.get(pk=session["id"]).received_bytes, 0)
+
+    def test_incomplete_upload_cannot_complete(self):
+        session = self._start()
+        self._put(session, 0)
+        response = self.client.post(reverse("upload_session_complete", kwargs={"pk": session["id"]}))
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_checksum_mismatch_resets_session(self):
+        session = self._start(payload=b"something else")
+        self._upload_all(session)
+
+        response = self.client.post(reverse("upload_session_complete", kwargs={"pk": session["id"]}))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Submission.objects.exists())
+        self.assertEqual(UploadSession.objects.get(pk=session["id"]).received_bytes, 0)
+
+    def test_rejected_completion_leaves_no_individual_group(self):
+        session = self._start()
+        self._upload_all(session)
+        Post.objects.filter(pk=self.post.pk).update(deadline=timezone.now() - timedelta(minutes=1))
+
+        response = self.client.post(reverse("upload_session_complete", kwargs={"pk": session["id"]}))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Group.objects.filter(post=self.post).exists())
+        self.assertEqual(UploadSession.objects.get(pk=session["id"]).status, "open")
+
+    def test_sessions_are_private_to_the_student(self):
+        session = self._start()
+        other = User.objects.create_user(username="up_other", password="pass1234")
+        Profile.objects.update_or_create(user=other, defaults={"role": "student"})
+        self.client.login(username="up_other", password="pass1234")
+        self.assertEqual(self._put(session, 0).status_code, 404)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.lecturer = User.objects.create_user(username="cas_lect", password="pass1234")
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Dedup",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            attachment=SimpleUploadedFile("brief.pdf", b"shared brief"),
+        )
+        self.group = Group.objects.create(post=self.post, name="Solo")
+        self.payload = os.urandom(100 * 1024)
+
+    def _submit(self, username, payload=None):
+        student = User.objects.create(username=username)
+        return Submission.objects.create(
+            post=self.post,
+            group=self.group,
+            student=student,
+            file=SimpleUploadedFile("report.pdf", payload or self.payload),
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self._submit("cas_a")
+        second = self._submit("cas_b")
+
+        self.assertNotEqual(first.file.name, second.file.name)
+        self.assertTrue(os.path.samefile(first.file.path, second.file.path))
+        blob = StoredBlob.objects.get(size=len(self.payload))
+        self.assertEqual(blob.ref_count, 2)
+        with second.file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.payload)
+        self.assertEqual(first.file.url, f"/media/{first.file.name}")
+
+    def test_blob_is_removed_with_last_reference(self):
+        first = self._submit("cas_a")
+        second = self._submit("cas_b")
+        digest = StoredBlob.objects.get(size=len(self.payload)).digest
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=digest).ref_count, 1)
+        self.assertTrue(os.path.exists(second.file.path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.filter(pk=digest).exists())
+        self.assertFalse(os.path.exists(content_storage.blob_path(digest)))
+
+    def test_deletes_find_the_blob_without_reading_the_file(self):
+        first = self._submit("cas_a")
+        second = self._submit("cas_b")
+        blob = StoredBlob.objects.get(size=len(self.payload))
+        self.assertCountEqual(
+            StoredName.objects.filter(blob=blob).values_list("name", flat=True), [first.file.name, second.file.name]
+        )
+
+        with mock.patch("assignments.storage._hash_file", side_effect=AssertionError("re-hashed")):
+            with self.captureOnCommitCallbacks(execute=True):
+                first.delete()
+        self.assertEqual(StoredBlob.objects.get(pk=blob.pk).ref_count, 1)
+        self.assertFalse(StoredName.objects.filter(pk=first.file.name).exists())
+
+    def test_names_saved_before_they_were_recorded_are_hashed(self):
+        first = self._submit("cas_a")
+        self._submit("cas_b")
+        StoredName.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredBlob.objects.get(size=len(self.payload)).ref_count, 1)
+
+    def test_dedupe_command_adopts_existing_files(self):
+        for name in ("submissions/old-a.pdf", "submissions/old-b.pdf"):
+            os.makedirs(os.path.join(self.media_root, "submissions"), exist_ok=True)
+            with open(os.path.join(self.media_root, name), "wb") as legacy:
+                legacy.write(b"legacy submission")
+            Submission.objects.create(
+                post=self.post,
+                group=self.group,
+                student=User.objects.create(username=name[-8:-4]),
+                file=name,
+            )
+
+        call_command("dedupe_media", stdout=StringIO())
+
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.media_root, "submissions/old-a.pdf"),
+                os.path.join(self.media_root, "submissions/old-b.pdf"),
+            )
+        )
+        blob = StoredBlob.objects.get(size=len(b"legacy submission"))
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.names.count(), 2)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot dashboard, review and join queries and reject full table scans."""
+
+    SCANNED_TABLES = ("myapp_post", "myapp_submission", "myapp_group", "myapp_group_members")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = User.objects.create_user(username="plan_lect", password="pass1234")
+        Profile.objects.update_or_create(user=cls.lecturer, defaults={"role": "lecturer"})
+        other = User.objects.create_user(username="plan_other", password="pass1234")
+        students = User.objects.bulk_create(User(username=f"plan_{i}") for i in range(120))
+        Profile.objects.bulk_create(Profile(user=student, role="student") for student in students)
+        cls.student = students[0]
+
+        now = timezone.now()
+        posts = Post.objects.bulk_create(
+            Post(
+                author=cls.lecturer if i % 4 == 0 else other,
+                title=f"Plan {i}",
+                content="Body",
+                deadline=now + timedelta(days=i - 100),
+                group_type="manual",
+                max_students_per_group=4,
+            )
+            for i in range(200)
+        )
+        cls.post = posts[-4]
+        Membership = Group.members.through
+        for post in posts[-20:]:
+            groups = Group.objects.bulk_create(Group(post=post, name=f"Group {i}") for i in range(30))
+            Membership.objects.bulk_create(
+                Membership(group_id=groups[index // 4].pk, user_id=student.pk) for index, student in enumerate(students)
+            )
+            Submission.objects.bulk_create(
+                Submission(post=post, group=groups[index // 4], student=student, submission_link="https://example.com")
+                for index, student in enumerate(students[:60])
+            )
+        cls.group = Group.objects.filter(post=cls.post).order_by("id").first()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # Seeded tables are small enough that the planner would scan them
+            # anyway; make it prove an index is available.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertNoTableScan(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            words = line.split()
+            if "Seq Scan" in line:
+                self.fail(f"Sequential scan in plan:\n{plan}")
+            if "SCAN" in words:
+                table = words[words.index("SCAN") + 1]
+                if table in self.SCANNED_TABLES and "INDEX" not in words:
+                    self.fail(f"Full scan of {table} in plan:\n{plan}")
+
+    def test_student_dashboard_queries(self):
+        now = timezone.now()
+        posts = Post.objects.select_related("course", "author").with_submission_flag(self.student)
+        self.assertNoTableScan(posts.upcoming(now).order_by("deadline", "id")[:21])
+        self.assertNoTableScan(posts.overdue(now).order_by("-deadline", "-id")[:21])
+        self.assertNoTableScan(Submission.objects.filter(student=self.student).values_list("post_id", flat=True))
+
+    def test_instructor_dashboard_queries(self):
+        self.assertNoTableScan(Post.objects.filter(author=self.lecturer).order_by("deadline"))
+        self.assertNoTableScan(
+            Submission.objects.filter(post__author=self.lecturer, post=self.post).order_by("-submitted_at", "-id")[:26]
+        )
+
+    def test_review_queries(self):
+        self.assertNoTableScan(Submission.objects.filter(post=self.post).select_related("group", "student"))
+        self.assertNoTableScan(Submission.objects.filter(post=self.post, group=self.group))
+        self.assertNoTableScan(Group.objects.filter(post=self.post).annotate(size=Count("members")).order_by("name"))
+
+    def test_join_queries(self):
+        self.assertNoTableScan(Group.objects.filter(post=self.post, members=self.student))
+        self.assertNoTableScan(Group.objects.filter(post=self.post, name="Group 3"))
+        self.assertNoTableScan(Group.members.through.objects.filter(group=self.group))
@@ -0,0 +1,81 @@
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkError(Exception):
+    """Raised when a chunk does not fit the session; carries the HTTP status."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def upload_root():
+    return Path(settings.UPLOAD_TEMP_DIR)
+
+
+def temp_path(session):
+    return upload_root() / f"{session.id}.part"
+
+
+def discard(session):
+    try:
+        os.remove(temp_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Copy ``length`` bytes from ``stream`` into the session's temp file at
+    ``offset`` and return the new received byte count.
+
+    Reads in ``READ_SIZE`` pieces, so memory does not depend on chunk size.
+    Chunks already stored (a client retry) are accepted without rewriting.
+    """
+    if offset % session.chunk_size:
+        raise ChunkError("Offset must be a multiple of the chunk size.")
+    expected_length = min(session.chunk_size, session.total_size - offset)
+    if offset >= session.total_size or length != expected_length:
+        raise ChunkError(f"Expected {expected_length} bytes at offset {offset}.")
+    if offset + length <= session.received_bytes:
+        return session.received_bytes
+    if offset != session.received_bytes:
+        raise ChunkError(f"Expected offset {session.received_bytes}.", status_code=409)
+
+    path = temp_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, "r+b" if path.exists() else "wb") as target:
+        target.seek(offset)
+        while written < length:
+            piece = stream.read(min(READ_SIZE, length - written))
+            if not piece:
+                break
+            target.write(piece)
+            written += len(piece)
+        target.truncate()
+        target.flush()
+        os.fsync(target.fileno())
+    if written != length:
+        raise ChunkError("Chunk body ended early; retry the same offset.")
+    return offset + length
+
+
+def checksum(session):
+    digest = hashlib.sha256()
+    with open(temp_path(session), "rb") as source:
+        for piece in iter(lambda: source.read(READ_SIZE), b""):
+            digest.update(piece)
+    return digest.hexdigest()
+
+
+def open_upload(session):
+    """Return the assembled upload as a ``File`` named after the original file."""
+    return File(open(temp_path(session), "rb"), name=session.filename)
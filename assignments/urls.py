@@ -1,14 +1,20 @@
 from django.urls import path
 
 from assignments.views import (
+    AssignmentReviewGridView,
     PostCreateView,
     PostDetailView,
     SubmissionCreateView,
+    UploadChunkView,
+    UploadCompleteView,
+    UploadSessionCreateView,
+    UploadSessionDetailView,
     assignment_delete_view,
     assignment_detail_view,
     assignment_edit_view,
     group_submission_detail_view,
     assignment_review_view,
+    assignment_submissions_download_view,
     teacher_dashboard
 )
 
@@ -20,8 +26,14 @@ urlpatterns = [
     path("<int:post_id>/edit/", assignment_edit_view, name="assignment_edit"),
     path("<int:post_id>/delete/", assignment_delete_view, name="assignment_delete"),
     path("submit/", SubmissionCreateView.as_view(), name="assignment_submit"),
+    path("uploads/", UploadSessionCreateView.as_view(), name="upload_session_create"),
+    path("uploads/<uuid:pk>/", UploadSessionDetailView.as_view(), name="upload_session_detail"),
+    path("uploads/<uuid:pk>/chunk/", UploadChunkView.as_view(), name="upload_session_chunk"),
+    path("uploads/<uuid:pk>/complete/", UploadCompleteView.as_view(), name="upload_session_complete"),
     path("teacher/dashboard/", teacher_dashboard, name="teacher_dashboard"),
     path("manage/<int:pk>/review/", assignment_review_view, name="assignment_review"),
+    path("manage/<int:pk>/review/grid/", AssignmentReviewGridView.as_view(), name="assignment_review_grid"),
+    path("manage/<int:pk>/download/", assignment_submissions_download_view, name="assignment_submissions_download"),
     path("manage/<int:post_id>/groups/<int:group_id>/", group_submission_detail_view, name="group_submission_detail"),
 
 ]
@@ -1,26 +1,40 @@
-from math import ceil
 
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import HttpResponseForbidden
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch
+from django.http import HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import IsLecturer, IsStudent
+from accounts.roles import get_role
+from assignments.archives import stream_submission_archive
 from assignments.forms import PostForm, SubmissionForm
-from assignments.models import Post, Submission
-from assignments.serializers import AssignmentSerializer, SubmissionSerializer
+from assignments import uploads
+from assignments.models import Post, Submission, UploadSession
+from assignments.serializers import (
+    AssignmentSerializer,
+    ReviewGridRowSerializer,
+    SubmissionSerializer,
+    UploadSessionSerializer,
+    UploadSubmissionSerializer,
+)
+from assignments.tasks import schedule_post_delete
 from config.mongodb import log_event
+from config.pagination import KeysetPagination, paginate_keyset
 from courses.models import Course
 from groups.models import Group
+from groups.tasks import schedule_group_sync
 from accounts.models import Profile
 
-def _is_lecturer(user):
-    if not user.is_authenticated or not hasattr(user, "profile"):
-        return False
-    return (user.profile.role or "").strip().lower() == "lecturer"
+def _is_lecturer(request):
+    return get_role(request) == "lecturer"
 
 
 DEMO_CS_COURSES = [
@@ -39,51 +53,25 @@ def _ensure_demo_cs_courses(lecturer):
     return Course.objects.filter(lecturer=lecturer).order_by("name")
 
 
-def _create_groups_for_post(post):
-    if post.group_type not in ["manual", "automatic"]:
-        return
-    if post.group_type == "manual" and not post.max_students_per_group:
-        Group.objects.get_or_create(post=post, name="Group 1")
-        return
-    if not post.max_students_per_group or post.max_students_per_group <= 0:
-        return
-
-    students = User.objects.filter(profile__role="student", is_active=True).distinct()
-    total_students = students.count()
-    if total_students == 0:
-        return
-
-    number_of_groups = ceil(total_students / post.max_students_per_group)
-    groups = [Group.objects.create(post=post, name=f"Group {i}") for i in range(1, number_of_groups + 1)]
-
-    if post.group_type == "automatic":
-        group_index = 0
-        for student in students:
-            if group_index >= len(groups):
-                break
-            groups[group_index].members.add(student)
-            if groups[group_index].members.count() >= post.max_students_per_group:
-                group_index += 1
-
-
 class PostCreateView(generics.ListCreateAPIView):
     queryset = Post.objects.all()
     serializer_class = AssignmentSerializer
     permission_classes = [IsLecturer]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         if self.request.method in SAFE_METHODS:
-            return Post.objects.all()
+            return Post.objects.select_related("stats")
         return Post.objects.filter(author=self.request.user)
 
     def perform_create(self, serializer):
         post = serializer.save(author=self.request.user)
-        _create_groups_for_post(post)
+        schedule_group_sync(post)
 
 
 @login_required
 def instructor_assignment_create_view(request):
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can create assignments.")
 
     allowed_courses = _ensure_demo_cs_courses(request.user)
@@ -95,7 +83,7 @@ def instructor_assignment_create_view(request):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
-            _create_groups_for_post(post)
+            schedule_group_sync(post)
             return redirect("instructor_dashboard")
     else:
         form = PostForm()
@@ -111,11 +99,16 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         if self.request.method in SAFE_METHODS:
-            return Post.objects.all()
+            return Post.objects.select_related("stats")
         return Post.objects.filter(author=self.request.user)
 
     def perform_update(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        schedule_group_sync(post)
+
+    def perform_destroy(self, instance):
+        # The cascade runs in the job queue, not in the request.
+        schedule_post_delete(instance)
 
 
 class SubmissionCreateView(generics.CreateAPIView):
@@ -136,27 +129,159 @@ class SubmissionCreateView(generics.CreateAPIView):
         )
 
 
+def _submission_group(post, user, user_group=None):
+    if post.group_type == "individual":
+        individual_group, _ = Group.objects.get_or_create(post=post, name=f"{user.username}-individual")
+        if not individual_group.members.filter(id=user.id).exists():
+            individual_group.members.add(user)
+        return individual_group
+    return user_group
+
+
+class UploadSessionCreateView(generics.CreateAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsStudent]
+
+    def perform_create(self, serializer):
+        serializer.save(student=self.request.user, chunk_size=settings.UPLOAD_CHUNK_SIZE)
+
+
+class UploadSessionDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsStudent]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(student=self.request.user)
+
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+        instance.delete()
+
+
+class UploadChunkView(APIView):
+    """
+    ``PUT`` one chunk as the raw request body at ``?offset=``. The body is
+    streamed to the temp file, so a chunk never sits in worker memory.
+    """
+
+    permission_classes = [IsStudent]
+
+    def put(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, student=request.user, status="open")
+        try:
+            offset = int(request.query_params.get("offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response({"detail": "Provide a numeric offset."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            received = uploads.write_chunk(session, offset, request.stream, length)
+        except uploads.ChunkError as exc:
+            return Response(
+                {"detail": str(exc), "received_bytes": session.received_bytes},
+                status=exc.status_code,
+            )
+
+        if received != session.received_bytes:
+            # Only advance from the offset we wrote at; a racing retry of the
+            # same chunk leaves the counter alone.
+            UploadSession.objects.filter(pk=session.pk, received_bytes=offset).update(
+                received_bytes=received,
+                updated_at=timezone.now(),
+            )
+        return Response({"received_bytes": received, "complete": received >= session.total_size})
+
+
+class UploadCompleteView(APIView):
+    permission_classes = [IsStudent]
+
+    def post(self, request, pk):
+        session = get_object_or_404(
+            UploadSession.objects.select_related("post"),
+            pk=pk,
+            student=request.user,
+            status="open",
+        )
+        if not session.is_complete:
+            return Response(
+                {"detail": "Upload is not finished.", "received_bytes": session.received_bytes},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if uploads.checksum(session) != session.sha256:
+            uploads.discard(session)
+            UploadSession.objects.filter(pk=session.pk).update(received_bytes=0, updated_at=timezone.now())
+            return Response(
+                {"detail": "Checksum mismatch; upload the file again.", "received_bytes": 0},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        post = session.post
+        data = {
+            "post": post.id,
+            "student": request.user.id,
+            "submission_link": request.data.get("submission_link") or None,
+            "supporting_link": request.data.get("supporting_link") or None,
+        }
+        if post.group_type != "individual":
+            user_group = Group.objects.filter(post=post, members=request.user).first()
+            if user_group is not None:
+                data["group"] = user_group.id
+        with uploads.open_upload(session) as upload:
+            data["file"] = upload
+            serializer = UploadSubmissionSerializer(data=data, context={"request": request})
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+                if locked.status != "open":
+                    return Response({"detail": "Upload already completed."}, status=status.HTTP_409_CONFLICT)
+                # Created only now, so a rejected or failed completion leaves no group behind.
+                group = _submission_group(post, request.user, serializer.validated_data.get("group"))
+                submission = serializer.save(student=request.user, group=group)
+                locked.status = "completed"
+                locked.submission = submission
+                locked.save(update_fields=["status", "submission", "updated_at"])
+        uploads.discard(session)
+
+        log_event(
+            "submission_created_upload",
+            {
+                "submission_id": submission.id,
+                "post_id": post.id,
+                "student_id": request.user.id,
+                "filename": submission.file.name,
+                "size": session.total_size,
+            },
+        )
+        return Response(SubmissionSerializer(submission).data, status=status.HTTP_201_CREATED)
+
+
 @login_required
 def assignment_detail_view(request, post_id):
     user = request.user
     post = get_object_or_404(Post.objects.select_related("author", "course"), id=post_id)
-    user_role = ((user.profile.role or "").strip().lower() if hasattr(user, "profile") else "")
+    user_role = get_role(request)
 
-    user_group = Group.objects.filter(post=post, members=user).first()
+    # Groups are provisioned when the post is saved (or by provision_groups),
+    # so this page only reads.
+    groups = []
+    if post.group_type == "manual":
+        groups = list(
+            post.groups.annotate(
+                member_count=Count("members", distinct=True),
+                is_member=Exists(Group.members.through.objects.filter(group=OuterRef("pk"), user=user)),
+            ).order_by("id")
+        )
+        user_group = next((group for group in groups if group.is_member), None)
+    else:
+        user_group = Group.objects.filter(post=post, members=user).first()
     submission = Submission.objects.filter(post=post, student=user).first()
     can_submit = user_role == "student"
     submit_error = None
-    groups = Group.objects.none()
 
     if user_role != "student":
         submit_error = "Only students can submit assignments."
 
     if post.group_type == "manual":
-        if not post.groups.exists():
-            _create_groups_for_post(post)
-            if not post.groups.exists():
-                Group.objects.get_or_create(post=post, name="Group 1")
-        groups = post.groups.prefetch_related("members").all()
         if user_role == "student" and user_group is None:
             can_submit = False
             submit_error = "Join a group first before submitting."
@@ -179,13 +304,7 @@ def assignment_detail_view(request, post_id):
                 new_submission.student = user
                 new_submission.submission_link = form.cleaned_data.get("submission_link")
 
-                if post.group_type == "individual":
-                    individual_group, _ = Group.objects.get_or_create(post=post, name=f"{user.username}-individual")
-                    if not individual_group.members.filter(id=user.id).exists():
-                        individual_group.members.add(user)
-                    new_submission.group = individual_group
-                else:
-                    new_submission.group = user_group
+                new_submission.group = _submission_group(post, user, user_group)
 
                 new_submission.save()
                 log_event(
@@ -218,14 +337,14 @@ def assignment_detail_view(request, post_id):
 
 @login_required
 def assignment_edit_view(request, post_id):
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can edit assignments.")
 
     post = get_object_or_404(Post, id=post_id, author=request.user)
     if request.method == "POST":
         form = PostForm(request.POST, request.FILES, instance=post)
         if form.is_valid():
-            form.save()
+            schedule_group_sync(form.save())
             return redirect("assignment_detail", post_id=post.id)
     else:
         form = PostForm(instance=post)
@@ -235,22 +354,46 @@ def assignment_edit_view(request, post_id):
 
 @login_required
 def assignment_delete_view(request, post_id):
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can delete assignments.")
 
     post = get_object_or_404(Post, id=post_id, author=request.user)
     if request.method == "POST":
-        post.delete()
+        schedule_post_delete(post)
         return redirect("dashboard")
 
     return render(request, "myapp/assignment_confirm_delete.html", {"post": post})
 
+REVIEW_ORDERING = ["username", "id"]
+REVIEW_PAGE_SIZE = 100
+
+
+def _review_roster(post):
+    # Students on the post's course roster (every active student when the post
+    # has no course), each with their submission for this post prefetched.
+    students = User.objects.filter(profile__role="student", is_active=True)
+    if post.course_id:
+        students = students.filter(courses=post.course_id)
+    return students.prefetch_related(
+        Prefetch("submission_set", queryset=Submission.objects.filter(post=post), to_attr="post_submissions")
+    )
+
+
+def _review_row(student):
+    submission = student.post_submissions[0] if student.post_submissions else None
+    return {
+        "student": student,
+        "submitted": submission is not None,
+        "submission": submission,
+    }
+
+
 @login_required
 def assignment_review_view(request, pk):
-    post = get_object_or_404(Post, pk=pk)
+    post = get_object_or_404(Post.objects.select_related("course", "stats"), pk=pk)
 
     # Only lecturers
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can access this page.")
 
     # Only the author (owner)
@@ -259,34 +402,28 @@ def assignment_review_view(request, pk):
 
     context = {
         "assignment": post,
+        "stats": getattr(post, "stats", None),
     }
 
     # --------------------------------
     # INDIVIDUAL ASSIGNMENT
     # --------------------------------
     if post.group_type == "individual":
-
-        students = User.objects.filter(
-            profile__role="student",
-            is_active=True
-        )
-
-        review_data = []
-
-        for student in students:
-            submission = Submission.objects.filter(
-                post=post,
-                student=student
-            ).first()
-
-            review_data.append({
-                "student": student,
-                "submitted": submission is not None,
-                "submission": submission,
-            })
+        try:
+            students, next_cursor = paginate_keyset(
+                _review_roster(post),
+                REVIEW_ORDERING,
+                cursor=request.GET.get("cursor"),
+                page_size=REVIEW_PAGE_SIZE,
+            )
+        except ValueError:
+            students, next_cursor = paginate_keyset(
+                _review_roster(post), REVIEW_ORDERING, page_size=REVIEW_PAGE_SIZE
+            )
 
         context["mode"] = "individual"
-        context["review_data"] = review_data
+        context["review_data"] = [_review_row(student) for student in students]
+        context["next_cursor"] = next_cursor
 
     # --------------------------------
     # GROUP ASSIGNMENT (manual/automatic)
@@ -295,15 +432,19 @@ def assignment_review_view(request, pk):
 
         groups = Group.objects.filter(
             post=post
-        ).prefetch_related("members")
+        ).prefetch_related(
+            "members",
+            Prefetch(
+                "submission_set",
+                queryset=Submission.objects.select_related("student").order_by("id"),
+                to_attr="post_submissions",
+            ),
+        )
 
         group_review_data = []
 
         for group in groups:
-            submission = Submission.objects.filter(
-                post=post,
-                group=group
-            ).first()
+            submission = group.post_submissions[0] if group.post_submissions else None
 
             group_review_data.append({
                 "group": group,
@@ -322,9 +463,43 @@ def assignment_review_view(request, pk):
     )
 
 
+class ReviewGridPagination(KeysetPagination):
+    ordering = tuple(REVIEW_ORDERING)
+    page_size = REVIEW_PAGE_SIZE
+    max_page_size = 500
+
+
+class AssignmentReviewGridView(generics.ListAPIView):
+    serializer_class = ReviewGridRowSerializer
+    permission_classes = [IsLecturer]
+    pagination_class = ReviewGridPagination
+
+    def get_queryset(self):
+        post = get_object_or_404(Post, pk=self.kwargs["pk"], author=self.request.user)
+        return _review_roster(post)
+
+
+@login_required
+def assignment_submissions_download_view(request, pk):
+    if not _is_lecturer(request):
+        return HttpResponseForbidden("Only instructors can access this page.")
+
+    post = get_object_or_404(Post, pk=pk)
+    if post.author_id != request.user.id:
+        return HttpResponseForbidden("You do not own this assignment.")
+
+    include_manifest = request.GET.get("manifest", "").lower() in ("1", "true", "yes")
+    response = StreamingHttpResponse(
+        stream_submission_archive(post, include_manifest=include_manifest),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = f'attachment; filename="assignment-{post.id}-submissions.zip"'
+    return response
+
+
 @login_required
 def group_submission_detail_view(request, post_id, group_id):
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can access this page.")
 
     post = get_object_or_404(Post, id=post_id)
@@ -366,7 +541,7 @@ def group_submission_detail_view(request, post_id, group_id):
 
 @login_required
 def teacher_dashboard(request):
-    if not _is_lecturer(request.user):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can access this page.")
 
     assignments = Post.objects.filter(author=request.user)
@@ -0,0 +1,177 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SPOOL_PREFIX = "activity-"
+SPOOL_SUFFIX = ".jsonl"
+# Suffix of the file a process is still appending to; renamed on rotation or exit.
+ACTIVE_SUFFIX = ".jsonl.part"
+CHECKPOINT_NAME = "replay-checkpoint.json"
+
+# Shared by every spool in the process so file names never repeat.
+_sequence = itertools.count(1)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ActivitySpool:
+    """
+    Append-only JSON Lines spool for activity events that cannot go to Mongo.
+
+    ``append`` serializes the documents and writes them to the process's
+    buffered spool file; a background thread flushes and fsyncs that file
+    every ``sync_interval`` seconds, so the request never waits on the disk.
+    Each process writes its own ``activity-<time>-<pid>-<n>.jsonl.part`` and
+    renames it to ``.jsonl`` once it reaches ``max_bytes`` or on ``close``.
+    After ``close`` every ``append`` is written, synced and closed at once, so
+    late events at shutdown still land in a complete file. Every line carries
+    an ``_id`` so replaying it twice is harmless.
+    """
+
+    def __init__(self, directory, max_bytes=16 * 1024 * 1024, sync_interval=1.0):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.sync_interval = sync_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._pid = None
+        self._dirty = False
+        self._thread = None
+        self._wake = threading.Event()
+        self._closed = False
+
+    def append(self, documents):
+        """Spool ``documents``; return True once they are written to the file buffer."""
+        lines = []
+        for document in documents:
+            document = dict(document)
+            document.setdefault("_id", uuid.uuid4().hex)
+            lines.append(json.dumps(document, default=_json_default, separators=(",", ":")) + "\n")
+        data = "".join(lines).encode()
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not share its parent's file.
+                self._file = None
+            if self._file is None:
+                self._open()
+            self._file.write(data)
+            self._dirty = True
+            if self._closed or self._file.tell() >= self.max_bytes:
+                self._rotate()
+        if not self._closed:
+            self._ensure_thread()
+        return True
+
+    def sync(self):
+        """Flush and fsync the current file if anything was appended since the last sync."""
+        with self._lock:
+            if self._file is not None and self._dirty and self._pid == os.getpid():
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def close(self):
+        """Sync and close the current file, leaving it complete for ``replay_activity_log``."""
+        with self._lock:
+            self._closed = True
+            if self._file is not None and self._pid == os.getpid():
+                self._rotate()
+            self._file = None
+        self._wake.set()
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pid = os.getpid()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._path = self.directory / f"{SPOOL_PREFIX}{stamp}-{self._pid}-{next(_sequence)}{ACTIVE_SUFFIX}"
+        self._file = open(self._path, "ab")
+
+    def _rotate(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._path.rename(self._path.with_name(self._path.name[: -len(ACTIVE_SUFFIX)] + SPOOL_SUFFIX))
+        self._file = None
+        self._dirty = False
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._wake.clear()
+            self._thread = threading.Thread(target=self._run, name="activity-spool-sync", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._wake.wait(self.sync_interval):
+            try:
+                self.sync()
+            except OSError:
+                logger.exception("Could not sync the activity spool.")
+
+
+def spool_files(directory):
+    """Spool files in ``directory``, oldest first, as ``(path, complete)`` pairs."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    files = []
+    for path in directory.iterdir():
+        if not path.name.startswith(SPOOL_PREFIX):
+            continue
+        if path.name.endswith(ACTIVE_SUFFIX):
+            files.append((path, False))
+        elif path.name.endswith(SPOOL_SUFFIX):
+            files.append((path, True))
+    return sorted(files, key=lambda item: spool_key(item[0]))
+
+
+def spool_key(path):
+    """The file's name without suffix; it stays the same when the ``.part`` file is renamed."""
+    name = path.name
+    return name[: -len(ACTIVE_SUFFIX)] if name.endswith(ACTIVE_SUFFIX) else name[: -len(SPOOL_SUFFIX)]
+
+
+def read_checkpoint(directory):
+    try:
+        with open(Path(directory) / CHECKPOINT_NAME) as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return {}
+
+
+def write_checkpoint(directory, checkpoint):
+    """Replace the checkpoint file atomically, so a crash leaves the old or the new one."""
+    path = Path(directory) / CHECKPOINT_NAME
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "w") as target:
+        json.dump(checkpoint, target)
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary, path)
+
+
+def read_lines(path, offset):
+    """Yield ``(end_offset, line)`` for each complete line after ``offset``; a half-written last line is left for later."""
+    with open(path, "rb") as source:
+        source.seek(offset)
+        for line in source:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield offset, line
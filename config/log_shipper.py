@@ -0,0 +1,211 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def only_duplicate_key_errors(exc):
+    """True when a bulk insert failed only on documents an earlier attempt already stored."""
+    details = getattr(exc, "details", None) or {}
+    errors = details.get("writeErrors")
+    return bool(errors) and not details.get("writeConcernErrors") and all(
+        error.get("code") == DUPLICATE_KEY for error in errors
+    )
+
+
+class LogShipper:
+    """
+    Ship documents to a Mongo collection from a background thread.
+
+    ``submit`` only appends to a bounded in-memory queue, so a slow or
+    unreachable Mongo never holds up the caller. The thread sends a batch with
+    ``insert_many`` once ``batch_size`` documents are waiting or every
+    ``flush_interval`` seconds. When the queue is full the oldest document is
+    handed to ``overflow`` (dropped without one). After ``breaker_threshold``
+    failed batches in a row the breaker opens: the queue goes to ``overflow``
+    and so do new documents until ``breaker_cooldown`` seconds have passed.
+    ``stop`` flushes pending documents, hands whatever Mongo does not take to
+    ``overflow`` and then calls ``close_overflow`` so nothing stays buffered;
+    the owner registers it with ``atexit``.
+
+    ``get_collection`` is called on every send, so it can be a lazily
+    connecting function or return an in-memory fake in tests.
+    """
+
+    def __init__(
+        self,
+        get_collection,
+        max_queue=10000,
+        batch_size=100,
+        flush_interval=2.0,
+        breaker_threshold=3,
+        breaker_cooldown=30.0,
+        overflow=None,
+        close_overflow=None,
+    ):
+        self.get_collection = get_collection
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.overflow = overflow
+        self.close_overflow = close_overflow
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        # Held while a batch is on its way, so flush() and the thread never send the same documents.
+        self._send_lock = threading.Lock()
+        self._counters = {"queued": 0, "sent": 0, "spilled": 0, "dropped": 0, "failed_batches": 0}
+        self._failures = 0
+        self._open_until = 0.0
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self._stopped = False
+
+    def submit(self, document):
+        """Queue ``document`` for sending; never blocks on Mongo. False if it was dropped."""
+        if self.overflow is not None and (self._stopping or self.breaker_open()):
+            return self._discard([document])
+        oldest = None
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                oldest = self._queue.popleft()
+            self._queue.append(document)
+            self._counters["queued"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        if oldest is not None:
+            self._discard([oldest])
+        self._ensure_thread()
+        return True
+
+    def stats(self):
+        """Counters since start: ``queued``, ``sent``, ``spilled``, ``dropped``, ``failed_batches``, plus ``pending`` and ``breaker``."""
+        with self._cond:
+            stats = dict(self._counters, pending=len(self._queue))
+        stats["breaker"] = "open" if self.breaker_open() else "closed"
+        return stats
+
+    def breaker_open(self):
+        return time.monotonic() < self._open_until
+
+    def flush(self):
+        """Send everything queued now, batch by batch; stops early while the breaker is open."""
+        while self._send_batch():
+            pass
+        with self._cond:
+            return not self._queue
+
+    def stop(self, timeout=5.0):
+        """Stop the thread, flush what is left and spill the rest to ``overflow``."""
+        if self._stopped:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        if not self.flush():
+            self._discard(self._take_all())
+        if self.close_overflow is not None:
+            self.close_overflow()
+        self._stopped = True
+        stats = self.stats()
+        if stats["pending"] or stats["dropped"]:
+            logger.warning("Activity log shipper stopped with %(pending)s pending and %(dropped)s dropped events.", stats)
+
+    def _ensure_thread(self):
+        # A forked worker inherits the queue but not the thread; start its own.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._stopping or (self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()):
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="activity-log-shipper", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and (len(self._queue) < self.batch_size or self.breaker_open()):
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            while self._send_batch() and len(self._queue) >= self.batch_size:
+                pass
+
+    def _send_batch(self):
+        """Send one batch; return True if it went out and more may be waiting."""
+        with self._send_lock:
+            if self.breaker_open():
+                return False
+            with self._cond:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            if not batch:
+                return False
+            try:
+                self.get_collection().insert_many(batch, ordered=False)
+            except Exception as exc:
+                if not only_duplicate_key_errors(exc):
+                    self._requeue(batch)
+                    self._record_failure(exc)
+                    return False
+            with self._cond:
+                self._counters["sent"] += len(batch)
+            self._failures = 0
+            return True
+
+    def _requeue(self, batch):
+        overflowing = []
+        with self._cond:
+            room = max(self.max_queue - len(self._queue), 0)
+            if room < len(batch):
+                # The batch predates everything queued since; its head goes first.
+                overflowing, batch = batch[: len(batch) - room], batch[len(batch) - room :]
+            self._queue.extendleft(reversed(batch))
+        if overflowing:
+            self._discard(overflowing)
+
+    def _take_all(self):
+        with self._cond:
+            documents = list(self._queue)
+            self._queue.clear()
+        return documents
+
+    def _discard(self, documents):
+        """Hand ``documents`` to ``overflow``, counting them as spilled, or as dropped if that fails."""
+        if not documents:
+            return True
+        spilled = False
+        if self.overflow is not None:
+            try:
+                spilled = bool(self.overflow(documents))
+            except Exception:
+                logger.exception("Activity log overflow failed; dropping %s events.", len(documents))
+        with self._cond:
+            self._counters["spilled" if spilled else "dropped"] += len(documents)
+        return spilled
+
+    def _record_failure(self, exc):
+        self._failures += 1
+        with self._cond:
+            self._counters["failed_batches"] += 1
+        if self._failures >= self.breaker_threshold:
+            self._open_until = time.monotonic() + self.breaker_cooldown
+            if self.overflow is not None:
+                self._discard(self._take_all())
+            logger.warning(
+                "Activity log shipping paused for %ss after %s failed batches: %s",
+                self.breaker_cooldown,
+                self._failures,
+                exc,
+            )
@@ -1,6 +1,12 @@
+import atexit
 import os
 from datetime import datetime, timezone
 
+from django.conf import settings
+
+from config.activity_spool import ActivitySpool
+from config.log_shipper import LogShipper
+
 _client = None
 
 
@@ -27,21 +33,57 @@ def get_mongo_db():
     return get_mongo_client()[db_name]
 
 
-def log_event(event_type, payload):
-    uri = os.getenv("MONGODB_URI")
-    if not uri:
-        return False
+def get_activity_collection():
+    return get_mongo_db().activity_logs
+
 
+spool = ActivitySpool(
+    settings.ACTIVITY_SPOOL_DIR,
+    max_bytes=settings.ACTIVITY_SPOOL_MAX_BYTES,
+    sync_interval=settings.ACTIVITY_SPOOL_SYNC_INTERVAL,
+)
+
+shipper = LogShipper(
+    get_activity_collection,
+    max_queue=settings.ACTIVITY_LOG_QUEUE_SIZE,
+    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL,
+    breaker_threshold=settings.ACTIVITY_LOG_BREAKER_THRESHOLD,
+    breaker_cooldown=settings.ACTIVITY_LOG_BREAKER_COOLDOWN,
+    overflow=spool.append,
+    close_overflow=spool.close,
+)
+# Registered up front, before either one starts a thread: at exit the shipper
+# stops first, spills what Mongo did not take and closes the spool; the spool's
+# own close then finds nothing left to do.
+atexit.register(spool.close)
+atexit.register(shipper.stop)
+
+
+def write_event(event_type, payload, created_at):
+    """Job body for events queued through ``jobs`` before ``log_event`` used ``shipper``."""
+    get_activity_collection().insert_one(
+        {
+            "event_type": event_type,
+            "payload": payload,
+            "created_at": datetime.fromisoformat(created_at),
+        }
+    )
+
+
+def log_event(event_type, payload):
+    document = {
+        "event_type": event_type,
+        "payload": payload,
+        "created_at": datetime.now(timezone.utc),
+    }
     try:
-        db = get_mongo_db()
-        db.activity_logs.insert_one(
-            {
-                "event_type": event_type,
-                "payload": payload,
-                "created_at": datetime.now(timezone.utc),
-            }
-        )
-        return True
+        if not os.getenv("MONGODB_URI"):
+            # Kept for replay_activity_log once Mongo is configured.
+            return spool.append([document])
+        # Batched and sent by the shipper's thread, never inside the request;
+        # events Mongo cannot take end up in the spool.
+        return shipper.submit(document)
     except Exception:
         # Mongo logging must never break app requests.
         return False
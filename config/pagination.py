@@ -0,0 +1,152 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, model, fields):
+    """Decode ``token`` into values for ``fields``; raise ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise ValueError("Invalid cursor.")
+
+    decoded = []
+    for field_name, value in zip(fields, values):
+        # encode_cursor only writes strings and numbers; None would make the
+        # keyset filter itself fail.
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError("Invalid cursor.")
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            decoded.append(value)
+            continue
+        try:
+            value = field.to_python(value)
+        except (ValidationError, TypeError, ValueError) as exc:
+            raise ValueError("Invalid cursor.") from exc
+        if value is None:
+            raise ValueError("Invalid cursor.")
+        decoded.append(value)
+    return decoded
+
+
+def keyset_after(fields, values, descending=False):
+    """
+    Build the lexicographic "row comes after (values)" filter for ``fields``,
+    e.g. ``deadline > d OR (deadline = d AND id > i)``.
+    """
+    lookup = "lt" if descending else "gt"
+    condition = Q()
+    for index, field_name in enumerate(fields):
+        step = Q(**{f"{field_name}__{lookup}": values[index]})
+        for previous, value in zip(fields[:index], values[:index]):
+            step &= Q(**{previous: value})
+        condition |= step
+    return condition
+
+
+def paginate_keyset(queryset, fields, cursor=None, page_size=DEFAULT_PAGE_SIZE, descending=False):
+    """
+    Return ``(items, next_cursor)`` for one keyset page of ``queryset``.
+
+    The page is read with a single ``LIMIT page_size + 1`` query, so deep
+    pages cost the same as the first one. ``next_cursor`` is ``None`` on the
+    last page. Raises ValueError for malformed cursors.
+    """
+    ordering = [f"-{field_name}" if descending else field_name for field_name in fields]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, fields)
+        queryset = queryset.filter(keyset_after(fields, values, descending))
+
+    items = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field_name) for field_name in fields])
+    return items, next_cursor
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination over ``ordering`` using the same cursors as the HTML views."""
+
+    ordering = ("deadline", "id")
+    descending = False
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            items, self.next_cursor = paginate_keyset(
+                queryset,
+                list(self.ordering),
+                cursor=cursor,
+                page_size=self.get_page_size(request),
+                descending=self.descending,
+            )
+        except ValueError as exc:
+            raise NotFound("Invalid cursor.") from exc
+        return items
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "first": self.get_first_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "next_cursor": {"type": "string", "nullable": True},
+                "first": {"type": "string", "format": "uri"},
+                "results": schema,
+            },
+        }
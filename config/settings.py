@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -63,6 +65,7 @@ INSTALLED_APPS = [
     'assignments',
     'groups',
     'dashboard',
+    'jobs',
     'rest_framework',
     # django-allauth apps
     'django.contrib.sites',
@@ -89,7 +92,8 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.AuthenticationMiddleware',
+    'accounts.middleware.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -131,10 +135,85 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file rather than the in-memory default, so tests that join
+            # groups from several threads share one real database.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+#
+# Dashboard contexts are cached per user under versioned keys. Set
+# DASHBOARD_CACHE_DIR to share the cache between gunicorn workers through the
+# file backend; otherwise each process keeps its own local-memory cache.
+# The same versions tag the role cached in each session (accounts.roles), so
+# sessions only cache the role once DASHBOARD_CACHE_DIR is set. Every user
+# holds a few version keys, hence the entry limit well above the default 300.
+
+DASHBOARD_CACHE_DIR = os.getenv('DASHBOARD_CACHE_DIR', '')
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '300'))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', '20000'))
+
+# Sessions: SESSION_STORE picks the engine.
+#   cached_db       read from the "sessions" cache, written through to the
+#                   database (default when SESSION_CACHE_DIR is set). Needs
+#                   SESSION_CACHE_DIR so every worker shares that cache; a
+#                   logout in one process must not leave a live copy in
+#                   another's local memory.
+#   signed_cookies  no server-side state; the signed session travels in the
+#                   cookie and a logout cannot revoke copies of it.
+#   db              Django's default, one query per request (default otherwise).
+SESSION_CACHE_DIR = os.getenv('SESSION_CACHE_DIR', '')
+SESSION_STORE = os.getenv('SESSION_STORE', 'cached_db' if SESSION_CACHE_DIR else 'db')
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+if SESSION_STORE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f'SESSION_STORE must be one of {", ".join(SESSION_ENGINES)}.')
+if SESSION_STORE == 'cached_db' and not SESSION_CACHE_DIR:
+    raise ImproperlyConfigured('SESSION_STORE=cached_db needs SESSION_CACHE_DIR, a cache shared by every worker.')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STORE]
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv('SESSION_CACHE_MAX_ENTRIES', '20000'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'assigntrack-default',
+    },
+    'dashboard': (
+        {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': DASHBOARD_CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': DASHBOARD_CACHE_MAX_ENTRIES},
+        }
+        if DASHBOARD_CACHE_DIR
+        else {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'assigntrack-dashboard',
+            'OPTIONS': {'MAX_ENTRIES': DASHBOARD_CACHE_MAX_ENTRIES},
+        }
+    ),
+    'sessions': (
+        {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': SESSION_CACHE_DIR,
+            'OPTIONS': {'MAX_ENTRIES': SESSION_CACHE_MAX_ENTRIES},
+        }
+        if SESSION_CACHE_DIR
+        else {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'assigntrack-sessions',
+            'OPTIONS': {'MAX_ENTRIES': SESSION_CACHE_MAX_ENTRIES},
+        }
+    ),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -176,9 +255,9 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 AUTHENTICATION_BACKENDS = [
     # allow login in admin
-    'django.contrib.auth.backends.ModelBackend',
+    'accounts.backends.ModelBackend',
     # allauth specific authentication
-    'allauth.account.auth_backends.AuthenticationBackend',
+    'accounts.backends.AuthenticationBackend',
 ]
 
 # Django allauth config
@@ -201,10 +280,41 @@ SOCIALACCOUNT_PROVIDERS = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / "media"))
 
+# Chunked submission uploads are assembled here before being moved to MEDIA_ROOT.
+UPLOAD_TEMP_DIR = Path(os.getenv("UPLOAD_TEMP_DIR", BASE_DIR / "tmp_uploads"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", str(512 * 1024 * 1024)))
+
+# Background jobs (python manage.py runworker)
+JOB_RETRY_DELAY = int(os.getenv('JOB_RETRY_DELAY', '10'))
+JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY', '3600'))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '600'))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', str(24 * 3600)))
+
+# Deadline reminders (python manage.py send_deadline_reminders)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'AssignTrack <noreply@assigntrack.local>')
+DEADLINE_REMINDER_EMAIL = os.getenv('DEADLINE_REMINDER_EMAIL', 'False').lower() == 'true'
+
 # MongoDB Atlas (secondary datastore)
 MONGODB_URI = os.getenv('MONGODB_URI', '')
 MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'assigntrack')
 
+# Activity events (config.mongodb.log_event) are queued in memory and sent in
+# batches by a background thread; see config.log_shipper.LogShipper.
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv('ACTIVITY_LOG_QUEUE_SIZE', '10000'))
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv('ACTIVITY_LOG_BATCH_SIZE', '100'))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_LOG_FLUSH_INTERVAL', '2'))
+ACTIVITY_LOG_BREAKER_THRESHOLD = int(os.getenv('ACTIVITY_LOG_BREAKER_THRESHOLD', '3'))
+ACTIVITY_LOG_BREAKER_COOLDOWN = float(os.getenv('ACTIVITY_LOG_BREAKER_COOLDOWN', '30'))
+# Events Mongo cannot take (no MONGODB_URI, outages, a full queue) are kept
+# in JSON Lines files here until `python manage.py replay_activity_log`.
+ACTIVITY_SPOOL_DIR = Path(os.getenv('ACTIVITY_SPOOL_DIR', BASE_DIR / 'activity_spool'))
+ACTIVITY_SPOOL_MAX_BYTES = int(os.getenv('ACTIVITY_SPOOL_MAX_BYTES', str(16 * 1024 * 1024)))
+ACTIVITY_SPOOL_SYNC_INTERVAL = float(os.getenv('ACTIVITY_SPOOL_SYNC_INTERVAL', '1'))
+# Points the spool at a temporary directory while tests run.
+TEST_RUNNER = 'config.test_runner.TestRunner'
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 SESSION_COOKIE_SECURE = not DEBUG
@@ -0,0 +1,33 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Keeps the activity events logged by tests out of the real ``ACTIVITY_SPOOL_DIR``."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        from config import mongodb
+
+        self._spool_dir = tempfile.mkdtemp(prefix="activity_spool-")
+        self._real_spool = mongodb.spool
+        mongodb.spool = mongodb.ActivitySpool(self._spool_dir)
+        mongodb.shipper.overflow = mongodb.spool.append
+        mongodb.shipper.close_overflow = mongodb.spool.close
+        self._settings = override_settings(ACTIVITY_SPOOL_DIR=Path(self._spool_dir))
+        self._settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        from config import mongodb
+
+        mongodb.spool.close()
+        mongodb.spool = self._real_spool
+        mongodb.shipper.overflow = self._real_spool.append
+        mongodb.shipper.close_overflow = self._real_spool.close
+        self._settings.disable()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,353 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from config import mongodb
+from config.activity_spool import CHECKPOINT_NAME, ActivitySpool
+from config.log_shipper import LogShipper
+
+
+class FakeBulkWriteError(Exception):
+    def __init__(self, details):
+        super().__init__("batch op errors occurred")
+        self.details = details
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection: ``insert_many`` with ``_id`` assignment."""
+
+    def __init__(self):
+        self.documents = {}
+        self.down = False
+        self.calls = 0
+        self.fail_after = None
+        self.sent = threading.Event()
+
+    def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if self.down or (self.fail_after is not None and self.calls > self.fail_after):
+            raise ConnectionError("No servers available")
+        errors = []
+        for index, document in enumerate(documents):
+            document.setdefault("_id", id(document))
+            if document["_id"] in self.documents:
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.documents[document["_id"]] = document
+        self.sent.set()
+        if errors:
+            raise FakeBulkWriteError({"writeErrors": errors})
+
+
+class LogShipperTests(SimpleTestCase):
+    def _shipper(self, **options):
+        self.collection = FakeCollection()
+        options = {"batch_size": 100, "flush_interval": 60, **options}
+        shipper = LogShipper(lambda: self.collection, **options)
+        self.addCleanup(shipper.stop, timeout=1)
+        return shipper
+
+    def test_full_batches_go_out_from_the_background_thread(self):
+        shipper = self._shipper(batch_size=5)
+        for i in range(5):
+            shipper.submit({"n": i})
+
+        self.assertTrue(self.collection.sent.wait(5))
+        self.assertEqual(sorted(doc["n"] for doc in self.collection.documents.values()), [0, 1, 2, 3, 4])
+        self.assertEqual(self.collection.calls, 1)
+        self.assertEqual(shipper.stats()["sent"], 5)
+
+    def test_partial_batches_go_out_after_the_interval(self):
+        shipper = self._shipper(flush_interval=0.05)
+        shipper.submit({"n": 1})
+
+        self.assertTrue(self.collection.sent.wait(5))
+        self.assertEqual(len(self.collection.documents), 1)
+
+    def test_overflow_drops_the_oldest_events(self):
+        shipper = self._shipper(max_queue=3)
+        self.collection.down = True
+        for i in range(5):
+            shipper.submit({"n": i})
+
+        self.assertEqual(shipper.stats()["dropped"], 2)
+        self.collection.down = False
+        self.assertTrue(shipper.flush())
+        self.assertEqual(sorted(doc["n"] for doc in self.collection.documents.values()), [2, 3, 4])
+        self.assertEqual(
+            shipper.stats(),
+            {"queued": 5, "sent": 3, "spilled": 0, "dropped": 2, "failed_batches": 0, "pending": 0, "breaker": "closed"},
+        )
+        with self.assertLogs("config.log_shipper", "WARNING"):
+            shipper.stop()
+
+    def test_breaker_stops_sending_while_mongo_is_down(self):
+        shipper = self._shipper(batch_size=2, breaker_threshold=2, breaker_cooldown=60)
+        self.collection.down = True
+        for i in range(6):
+            shipper.submit({"n": i})
+        with self.assertLogs("config.log_shipper", "WARNING") as logs:
+            shipper.flush()
+            shipper.flush()
+        self.assertIn("paused", logs.output[0])
+
+        calls = self.collection.calls
+        self.assertEqual(shipper.stats()["breaker"], "open")
+        self.assertFalse(shipper.flush())
+        self.assertEqual(self.collection.calls, calls)
+        self.assertEqual(shipper.stats()["pending"], 6)
+
+        self.collection.down = False
+        shipper._open_until = 0
+        self.assertTrue(shipper.flush())
+        self.assertEqual(len(self.collection.documents), 6)
+        self.assertEqual(shipper.stats()["breaker"], "closed")
+
+    def test_retrying_a_partly_stored_batch_does_not_duplicate(self):
+        shipper = self._shipper()
+        documents = [{"n": i} for i in range(3)]
+        self.collection.insert_many(documents[:2])
+        for document in documents:
+            shipper.submit(document)
+
+        self.assertTrue(shipper.flush())
+        self.assertEqual(len(self.collection.documents), 3)
+        self.assertEqual(shipper.stats()["sent"], 3)
+
+    def test_stop_flushes_pending_events(self):
+        shipper = self._shipper()
+        shipper.submit({"n": 1})
+        shipper.stop(timeout=1)
+
+        self.assertEqual(len(self.collection.documents), 1)
+        self.assertFalse(shipper._thread.is_alive())
+
+    def test_log_event_only_queues(self):
+        shipper = self._shipper()
+        with mock.patch.dict(os.environ, {"MONGODB_URI": "mongodb://example"}), mock.patch.object(
+            mongodb, "shipper", shipper
+        ):
+            self.assertTrue(mongodb.log_event("signin", {"user_id": 1}))
+
+        self.assertEqual(self.collection.calls, 0)
+        self.assertEqual(shipper.stats()["pending"], 1)
+        shipper.flush()
+        (document,) = self.collection.documents.values()
+        self.assertEqual((document["event_type"], document["payload"]), ("signin", {"user_id": 1}))
+
+
+def _spooled(directory):
+    lines = []
+    for path in sorted(Path(directory).glob("activity-*")):
+        lines += [json.loads(line) for line in path.read_text().splitlines()]
+    return lines
+
+
+class ActivitySpoolTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def _spool(self, **options):
+        spool = ActivitySpool(self.directory, **options)
+        self.addCleanup(spool.close)
+        return spool
+
+    def test_log_event_spools_without_mongo(self):
+        spool = self._spool()
+        with mock.patch.dict(os.environ, {"MONGODB_URI": ""}), mock.patch.object(mongodb, "spool", spool):
+            started = time.perf_counter()
+            for i in range(1000):
+                self.assertTrue(mongodb.log_event("signin", {"user_id": i}))
+            elapsed = time.perf_counter() - started
+
+        # Buffered writes only; the fsync happens on the spool's own thread.
+        self.assertLess(elapsed, 0.5)
+        spool.sync()
+        events = _spooled(self.directory)
+        self.assertEqual([event["payload"]["user_id"] for event in events], list(range(1000)))
+        self.assertEqual(len({event["_id"] for event in events}), 1000)
+        self.assertEqual(events[0]["event_type"], "signin")
+
+    def test_files_rotate_by_size_and_close_on_exit(self):
+        spool = self._spool(max_bytes=300)
+        for i in range(10):
+            spool.append([{"event_type": "signin", "payload": {"user_id": i}}])
+        names = sorted(path.name for path in Path(self.directory).iterdir())
+        self.assertGreater(len(names), 1)
+        self.assertTrue(all(name.endswith(".jsonl") for name in names[:-1]))
+        self.assertTrue(names[-1].endswith(".jsonl.part"))
+
+        spool.close()
+        self.assertTrue(all(path.name.endswith(".jsonl") for path in Path(self.directory).iterdir()))
+        self.assertEqual(len(_spooled(self.directory)), 10)
+
+    def test_shipper_spills_to_the_spool_while_mongo_is_down(self):
+        spool = self._spool()
+        collection = FakeCollection()
+        collection.down = True
+        shipper = LogShipper(
+            lambda: collection, batch_size=100, flush_interval=60, breaker_threshold=1, overflow=spool.append
+        )
+        self.addCleanup(shipper.stop, timeout=1)
+        shipper.submit({"n": 1})
+        with self.assertLogs("config.log_shipper", "WARNING"):
+            shipper.flush()
+        shipper.submit({"n": 2})
+
+        self.assertEqual(shipper.stats()["spilled"], 2)
+        self.assertEqual(shipper.stats()["pending"], 0)
+        spool.sync()
+        self.assertEqual([event["n"] for event in _spooled(self.directory)], [1, 2])
+
+    def test_events_pending_at_exit_are_spooled(self):
+        script = (
+            "import django; django.setup()\n"
+            "from config import mongodb\n"
+            "class Down:\n"
+            "    def insert_many(self, documents, ordered=True):\n"
+            "        raise ConnectionError('No servers available')\n"
+            "mongodb.shipper.get_collection = Down\n"
+            "for i in range(3):\n"
+            "    mongodb.log_event('signin', {'user_id': i})\n"
+        )
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="config.settings",
+            MONGODB_URI="mongodb://unreachable",
+            ACTIVITY_SPOOL_DIR=self.directory,
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=settings.BASE_DIR, env=env, check=True, capture_output=True)
+
+        names = [path.name for path in Path(self.directory).iterdir()]
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].endswith(".jsonl"))
+        self.assertEqual([event["payload"]["user_id"] for event in _spooled(self.directory)], [0, 1, 2])
+
+    def test_stop_spills_what_mongo_did_not_take(self):
+        spool = self._spool()
+        collection = FakeCollection()
+        collection.down = True
+        shipper = LogShipper(lambda: collection, flush_interval=60, overflow=spool.append)
+        shipper.submit({"n": 1, "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)})
+        shipper.stop(timeout=1)
+
+        spool.sync()
+        (event,) = _spooled(self.directory)
+        self.assertEqual((event["n"], event["created_at"]), (1, "2026-01-01T00:00:00+00:00"))
+        self.assertEqual(shipper.stats()["dropped"], 0)
+
+
+class ReplayActivityLogTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(ACTIVITY_SPOOL_DIR=Path(self.directory))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.collection = FakeCollection()
+        patcher = mock.patch.object(mongodb, "get_activity_collection", lambda: self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _log(self, spool, first, count):
+        spool.append(
+            [
+                {"event_type": "signin", "payload": {"user_id": i}, "created_at": datetime.now(timezone.utc)}
+                for i in range(first, first + count)
+            ]
+        )
+
+    def _replay(self, **options):
+        out = StringIO()
+        call_command("replay_activity_log", batch_size=2, stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def _user_ids(self):
+        return sorted(document["payload"]["user_id"] for document in self.collection.documents.values())
+
+    def test_replays_in_batches_and_resumes_from_the_checkpoint(self):
+        closed = ActivitySpool(self.directory)
+        self._log(closed, 0, 3)
+        closed.close()
+        active = ActivitySpool(self.directory)
+        self.addCleanup(active.close)
+        self._log(active, 3, 2)
+        active.sync()
+
+        self.assertIn("Replayed 5 event(s)", self._replay())
+        self.assertEqual(self._user_ids(), [0, 1, 2, 3, 4])
+        self.assertEqual(self.collection.calls, 3)
+        self.assertIsInstance(next(iter(self.collection.documents.values()))["created_at"], datetime)
+        # The closed file is done with; the one still being written stays.
+        self.assertEqual([path.name.endswith(".part") for path in Path(self.directory).glob("activity-*")], [True])
+
+        self._log(active, 5, 1)
+        active.close()
+        self.assertIn("Replayed 1 event(s)", self._replay())
+        self.assertEqual(self._user_ids(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(list(Path(self.directory).glob("activity-*")), [])
+        self.assertEqual(json.loads((Path(self.directory) / CHECKPOINT_NAME).read_text()), {})
+
+    def test_failed_replay_resumes_without_duplicates(self):
+        spool = ActivitySpool(self.directory)
+        self._log(spool, 0, 5)
+        spool.close()
+
+        self.collection.fail_after = 1
+        with self.assertRaises(CommandError):
+            self._replay()
+        self.assertEqual(self._user_ids(), [0, 1])
+
+        self.collection.fail_after = None
+        self._replay()
+        self.assertEqual(self._user_ids(), [0, 1, 2, 3, 4])
+
+    def test_unreadable_lines_are_skipped(self):
+        path = Path(self.directory) / "activity-20260101T000000-1-1.jsonl"
+        path.write_text(
+            '{"_id": "a", "event_type": "signin", "payload": {}, "created_at": "2026-01-01T00:00:00+00:00"}\n'
+            "not json\n"
+        )
+        self.assertIn("Replayed 1 event(s), skipped 1", self._replay())
+
+
+class TestSpoolLocationTests(SimpleTestCase):
+    def test_tests_spool_outside_the_project(self):
+        self.assertEqual(mongodb.spool.directory, settings.ACTIVITY_SPOOL_DIR)
+        self.assertNotEqual(settings.ACTIVITY_SPOOL_DIR, settings.BASE_DIR / "activity_spool")
+        self.assertIs(mongodb.shipper.overflow.__self__, mongodb.spool)
+
+
+class SessionStoreSettingsTests(SimpleTestCase):
+    def _session_engine(self, **overrides):
+        env = {key: value for key, value in os.environ.items() if not key.startswith("SESSION_")}
+        env.update(overrides, DJANGO_SETTINGS_MODULE="config.settings")
+        script = "from django.conf import settings; print(settings.SESSION_ENGINE)"
+        return subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+
+    def test_sessions_use_the_cache_only_when_it_is_shared(self):
+        self.assertEqual(self._session_engine().stdout.strip(), "django.contrib.sessions.backends.db")
+        shared = self._session_engine(SESSION_CACHE_DIR=tempfile.gettempdir())
+        self.assertEqual(shared.stdout.strip(), "django.contrib.sessions.backends.cached_db")
+
+    def test_cached_db_without_a_shared_cache_fails_at_startup(self):
+        result = self._session_engine(SESSION_STORE="cached_db")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("SESSION_CACHE_DIR", result.stderr)
@@ -0,0 +1,218 @@
+import codecs
+import csv
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from assignments.models import PostStats
+from assignments.stats import rebuild_post_stats
+from courses.models import Course
+from dashboard.cache import bump_post, bump_user
+from groups.models import Group
+from groups.tasks import schedule_course_group_syncs
+
+IMPORT_BATCH_SIZE = 1000
+STUDENT_COLUMNS = ("student", "username", "email")
+
+
+class RosterImportError(Exception):
+    """Raised when the file or the target cannot be imported at all."""
+
+
+def _rows(file):
+    """Yield ``(line, student, group)`` from a CSV, reading it line by line."""
+    reader = csv.reader(codecs.iterdecode(file, "utf-8-sig"))
+    try:
+        header = [column.strip().lower() for column in next(reader, [])]
+    except UnicodeDecodeError as exc:
+        raise RosterImportError("The file must be UTF-8 encoded CSV.") from exc
+    student_column = next((header.index(name) for name in STUDENT_COLUMNS if name in header), None)
+    if student_column is None:
+        raise RosterImportError("The CSV needs a 'student' column with usernames or emails.")
+    group_column = header.index("group") if "group" in header else None
+
+    try:
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            student = row[student_column].strip() if student_column < len(row) else ""
+            group = row[group_column].strip() if group_column is not None and group_column < len(row) else ""
+            yield reader.line_num, student, group
+    except UnicodeDecodeError as exc:
+        raise RosterImportError("The file must be UTF-8 encoded CSV.") from exc
+
+
+def _batches(rows, size=IMPORT_BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def resolve_users(identifiers):
+    """
+    Map usernames or emails to ``(user_id, role)`` with one ``IN`` query.
+    A username match wins over an email match; an email shared by several
+    accounts maps to ``None``. Unknown identifiers are left out.
+    """
+    by_username = {}
+    by_email = defaultdict(list)
+    rows = User.objects.filter(Q(username__in=identifiers) | Q(email__in=identifiers)).values_list(
+        "id", "username", "email", "profile__role"
+    )
+    for user_id, username, email, role in rows:
+        role = (role or "").strip().lower()
+        by_username[username] = (user_id, role)
+        if email:
+            by_email[email].append((user_id, role))
+
+    resolved = {}
+    for identifier in identifiers:
+        if identifier in by_username:
+            resolved[identifier] = by_username[identifier]
+        elif identifier in by_email:
+            matches = by_email[identifier]
+            resolved[identifier] = matches[0] if len(matches) == 1 else None
+    return resolved
+
+
+class _PostGroups:
+    """Group names, sizes and memberships of one post, kept current during an import."""
+
+    def __init__(self, post):
+        self.post = post
+        size = post.max_students_per_group
+        self.capacity = size if size and size > 0 else None
+        self.ids = {}
+        self.sizes = {}
+        groups = Group.objects.filter(post=post).annotate(size=Count("members")).order_by("id")
+        for group_id, name, size in groups.values_list("id", "name", "size"):
+            if name not in self.ids:
+                self.ids[name] = group_id
+                self.sizes[name] = size
+        self.member_of = dict(
+            Group.members.through.objects.filter(group__post=post).values_list("user_id", "group__name")
+        )
+        self.created = 0
+
+    def place(self, user_id, name):
+        """Reserve a seat in group ``name``; return an error message or None."""
+        current = self.member_of.get(user_id)
+        if current == name:
+            return None
+        if current is not None:
+            return f"Already in {current}."
+        if self.capacity is not None and self.sizes.get(name, 0) >= self.capacity:
+            return f"{name} is full ({self.capacity} students)."
+        self.sizes[name] = self.sizes.get(name, 0) + 1
+        self.member_of[user_id] = name
+        return None
+
+    def group_ids(self, names):
+        missing = [name for name in dict.fromkeys(names) if name not in self.ids]
+        if missing:
+            for group in Group.objects.bulk_create([Group(post=self.post, name=name) for name in missing]):
+                self.ids[group.name] = group.pk
+            self.created += len(missing)
+        return self.ids
+
+
+def import_roster(course, file, post=None):
+    """
+    Enroll the students listed in a CSV ``file`` in ``course`` and return a
+    report with counts and per-row ``errors``.
+
+    The ``student`` column holds usernames or emails. When ``post`` (a manual
+    assignment of the course) is given, a ``group`` column places students in
+    that post's groups, creating missing ones, without exceeding
+    ``max_students_per_group`` or moving anyone who is already in a group.
+    The file is read in batches of ``IMPORT_BATCH_SIZE`` rows; each batch costs
+    a few queries however long the file is. Either the whole import is saved
+    or, if the file turns out to be unreadable, none of it is.
+    """
+    if post is not None and (post.course_id != course.pk or post.group_type != "manual"):
+        raise RosterImportError("Groups can only be imported for manual assignments of this course.")
+
+    Enrollment = Course.student.through
+    Membership = Group.members.through
+    report = {"rows": 0, "enrolled": 0, "already_enrolled": 0, "group_members": 0, "groups_created": 0, "errors": []}
+    seen = {}
+    changed_users = set()
+
+    with transaction.atomic():
+        groups = None
+        if post is not None:
+            if connection.features.has_select_for_update:
+                # The same row join_group locks, so live joins wait for the import.
+                list(PostStats.objects.select_for_update().filter(post=post).values_list("pk"))
+            groups = _PostGroups(post)
+
+        for batch in _batches(_rows(file)):
+            report["rows"] += len(batch)
+            users = resolve_users({student for _, student, _ in batch if student})
+            student_ids = []
+            placements = []
+            for line, student, group_name in batch:
+                error = None
+                new_member = False
+                user = users.get(student)
+                if not student:
+                    error = "Missing student."
+                elif student not in users:
+                    error = f"No user matches '{student}'."
+                elif user is None:
+                    error = f"Several users have the email '{student}'."
+                elif user[1] != "student":
+                    error = f"'{student}' is not a student."
+                elif user[0] in seen:
+                    error = f"Duplicate of line {seen[user[0]]}."
+                elif group_name and groups is not None:
+                    new_member = groups.member_of.get(user[0]) != group_name
+                    error = groups.place(user[0], group_name)
+                if error:
+                    report["errors"].append({"line": line, "student": student, "error": error})
+                    continue
+                seen[user[0]] = line
+                student_ids.append(user[0])
+                if new_member:
+                    placements.append((user[0], group_name))
+
+            enrolled = set(
+                Enrollment.objects.filter(course_id=course.pk, user_id__in=student_ids).values_list("user_id", flat=True)
+            )
+            new_students = [user_id for user_id in student_ids if user_id not in enrolled]
+            Enrollment.objects.bulk_create(
+                [Enrollment(course_id=course.pk, user_id=user_id) for user_id in new_students],
+                ignore_conflicts=True,
+            )
+            report["enrolled"] += len(new_students)
+            report["already_enrolled"] += len(enrolled)
+            changed_users.update(new_students)
+
+            if placements:
+                group_ids = groups.group_ids(name for _, name in placements)
+                Membership.objects.bulk_create(
+                    [Membership(group_id=group_ids[name], user_id=user_id) for user_id, name in placements],
+                    ignore_conflicts=True,
+                )
+                report["group_members"] += len(placements)
+                changed_users.update(user_id for user_id, _ in placements)
+
+        if groups is not None:
+            report["groups_created"] = groups.created
+            if groups.created or report["group_members"]:
+                rebuild_post_stats([post.pk])
+                bump_post(post.pk)
+        if report["enrolled"]:
+            # Bulk inserts skip m2m_changed, so queue the roster rebalance here.
+            schedule_course_group_syncs([course.pk])
+
+    for user_id in changed_users:
+        bump_user(user_id)
+    return report
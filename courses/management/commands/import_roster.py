@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assignments.models import Post
+from courses.imports import RosterImportError, import_roster
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Enroll students from a CSV (student[,group]) in a course, optionally placing them in a post's groups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id", type=int)
+        parser.add_argument("csv_path")
+        parser.add_argument("--post", type=int, help="Manual assignment whose groups the 'group' column fills.")
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(pk=options["course_id"]).first()
+        if course is None:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+        post = None
+        if options["post"]:
+            post = Post.objects.filter(pk=options["post"]).first()
+            if post is None:
+                raise CommandError(f"Assignment {options['post']} does not exist.")
+
+        try:
+            with open(options["csv_path"], "rb") as source:
+                report = import_roster(course, source, post=post)
+        except (OSError, RosterImportError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {report['rows']} row(s): enrolled {report['enrolled']} "
+                f"({report['already_enrolled']} already enrolled), added {report['group_members']} group member(s) "
+                f"and {report['groups_created']} group(s); {len(report['errors'])} error(s)."
+            )
+        )
@@ -0,0 +1,172 @@
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from assignments.models import Post, PostStats
+from courses.imports import RosterImportError, import_roster
+from courses.models import Course
+from groups.models import Group
+
+
+def _csv(*lines):
+    return io.BytesIO(("\n".join(lines) + "\n").encode())
+
+
+class RosterImportTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="roster_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.students = []
+        for i in range(5):
+            student = User.objects.create_user(
+                username=f"roster_{i}", email=f"roster_{i}@example.com", password="pass1234"
+            )
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+            self.students.append(student)
+        self.course = Course.objects.create(name="Databases", lecturer=self.lecturer)
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Team project",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=7),
+            group_type="manual",
+            max_students_per_group=2,
+            course=self.course,
+        )
+
+    def test_enrolls_by_username_or_email_and_reports_bad_rows(self):
+        self.course.student.add(self.students[4])
+        report = import_roster(
+            self.course,
+            _csv(
+                "student",
+                "roster_0",
+                "roster_1@example.com",
+                "roster_4",
+                "nobody",
+                "roster_lect",
+                "roster_0@example.com",
+                "",
+            ),
+        )
+
+        self.assertEqual((report["rows"], report["enrolled"], report["already_enrolled"]), (6, 2, 1))
+        self.assertEqual(
+            [(error["line"], error["error"]) for error in report["errors"]],
+            [
+                (5, "No user matches 'nobody'."),
+                (6, "'roster_lect' is not a student."),
+                (7, "Duplicate of line 2."),
+            ],
+        )
+        self.assertCountEqual(
+            self.course.student.values_list("username", flat=True), ["roster_0", "roster_1", "roster_4"]
+        )
+
+    def test_group_column_fills_groups_up_to_capacity(self):
+        Group.objects.create(post=self.post, name="Red").members.add(self.students[0])
+        report = import_roster(
+            self.course,
+            _csv(
+                "student,group",
+                "roster_0,Red",
+                "roster_1,Red",
+                "roster_2,Red",
+                "roster_3,Blue",
+                "roster_4,",
+            ),
+            post=self.post,
+        )
+
+        self.assertEqual(report["errors"], [{"line": 4, "student": "roster_2", "error": "Red is full (2 students)."}])
+        self.assertEqual((report["enrolled"], report["group_members"], report["groups_created"]), (4, 2, 1))
+        self.assertCountEqual(
+            Group.objects.get(post=self.post, name="Red").members.values_list("username", flat=True),
+            ["roster_0", "roster_1"],
+        )
+        self.assertTrue(Group.objects.get(post=self.post, name="Blue").members.filter(username="roster_3").exists())
+        stats = PostStats.objects.get(post=self.post)
+        self.assertEqual((stats.group_count, stats.member_count), (2, 3))
+
+    def test_students_already_in_a_group_are_not_moved(self):
+        Group.objects.create(post=self.post, name="Red").members.add(self.students[0])
+        report = import_roster(self.course, _csv("student,group", "roster_0,Blue"), post=self.post)
+
+        self.assertEqual(report["errors"][0]["error"], "Already in Red.")
+        self.assertFalse(Group.objects.filter(post=self.post, name="Blue").exists())
+
+    def test_rejects_files_without_student_column_and_foreign_posts(self):
+        with self.assertRaises(RosterImportError):
+            import_roster(self.course, _csv("name", "roster_0"))
+        other = Course.objects.create(name="Other", lecturer=self.lecturer)
+        with self.assertRaises(RosterImportError):
+            import_roster(other, _csv("student", "roster_0"), post=self.post)
+
+    def test_import_endpoint(self):
+        url = reverse("course_roster_import", kwargs={"pk": self.course.pk})
+        upload = SimpleUploadedFile("roster.csv", b"student,group\r\nroster_0,Red\r\nroster_1,Red\r\n")
+
+        self.client.force_login(self.students[0])
+        self.assertEqual(self.client.post(url, {"file": upload}).status_code, 403)
+
+        self.client.force_login(self.lecturer)
+        upload.seek(0)
+        response = self.client.post(url, {"file": upload, "post": self.post.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["group_members"], 2)
+        self.assertEqual(self.client.post(url, {}).status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as source:
+            source.write(b"email\nroster_2@example.com\n")
+        self.addCleanup(os.remove, source.name)
+        out = StringIO()
+        call_command("import_roster", str(self.course.pk), source.name, stdout=out, stderr=StringIO())
+
+        self.assertIn("enrolled 1", out.getvalue())
+        self.assertTrue(self.course.student.filter(pk=self.students[2].pk).exists())
+
+
+class RosterImportBenchmarkTests(TestCase):
+    def test_ten_thousand_rows_in_batched_queries(self):
+        lecturer = User.objects.create_user(username="bench_lect", password="pass1234")
+        users = User.objects.bulk_create(User(username=f"bench_{i}") for i in range(10000))
+        Profile.objects.bulk_create(Profile(user=user, role="student") for user in users)
+        course = Course.objects.create(name="Huge", lecturer=lecturer)
+        post = Post.objects.create(
+            author=lecturer,
+            title="Huge",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=7),
+            group_type="manual",
+            max_students_per_group=4,
+            course=course,
+        )
+        lines = ["student,group"] + [f"bench_{i},Group {i // 4 + 1}" for i in range(10000)]
+
+        started = time.monotonic()
+        with CaptureQueriesContext(connection) as queries:
+            report = import_roster(course, _csv(*lines), post=post)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(report["errors"], [])
+        self.assertEqual((report["enrolled"], report["group_members"], report["groups_created"]), (10000, 10000, 2500))
+        # A handful of statements per 1,000-row batch, plus SQLite's extra
+        # INSERT batches; one query per row would be ~40,000.
+        self.assertLessEqual(len(queries), 150)
+        self.assertLess(elapsed, 20)
+        self.assertEqual(course.student.count(), 10000)
+        self.assertEqual(PostStats.objects.get(post=post).member_count, 10000)
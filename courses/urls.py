@@ -1,9 +1,10 @@
 from django.urls import path
 
-from courses.views import CourseDetailView, CourseListCreateView
+from courses.views import CourseDetailView, CourseListCreateView, CourseRosterImportView
 
 urlpatterns = [
     path("", CourseListCreateView.as_view(), name="course_list_create"),
     path("<int:pk>/", CourseDetailView.as_view(), name="course_detail"),
+    path("<int:pk>/roster/import/", CourseRosterImportView.as_view(), name="course_roster_import"),
 ]
 
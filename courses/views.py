@@ -1,7 +1,13 @@
-from rest_framework import generics
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from accounts.permissions import IsLecturer
+from assignments.models import Post
+from courses.imports import RosterImportError, import_roster
 from courses.models import Course
 from courses.serializers import CourseSerializer
 
@@ -24,3 +30,25 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method in ("PUT", "PATCH", "DELETE"):
             return [IsLecturer()]
         return [IsAuthenticated()]
+
+
+class CourseRosterImportView(APIView):
+    """Upload a CSV (``file``) of students to enroll; ``post`` also imports its groups."""
+
+    permission_classes = [IsLecturer]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, pk):
+        course = get_object_or_404(Course, pk=pk, lecturer=request.user)
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Attach the CSV as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        post = None
+        post_id = request.data.get("post")
+        if post_id:
+            post = get_object_or_404(Post, pk=post_id, author=request.user)
+        try:
+            report = import_roster(course, upload, post=post)
+        except RosterImportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
@@ -5,3 +5,6 @@ class DashboardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboard"
 
+    def ready(self):
+        import dashboard.signals  # noqa: F401
+
@@ -0,0 +1,129 @@
+from math import ceil
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+CACHE_ALIAS = "dashboard"
+CATALOGUE = "all"
+STATS_KEYS = {
+    "hits": "dashboard:stats:hits",
+    "misses": "dashboard:stats:misses",
+}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _timeout():
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+
+
+def is_shared():
+    """True when every worker reads the same cache; local memory is per process."""
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _version_key(scope, pk):
+    return f"dashboard:version:{scope}:{pk}"
+
+
+def get_versions(scopes):
+    # Versions are opaque tokens rather than counters so an evicted version key
+    # can never line up with an older cached context again.
+    cache = _cache()
+    keys = [_version_key(scope, pk) for scope, pk in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, uuid4().hex, timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump_version(scope, pk):
+    _cache().set(_version_key(scope, pk), uuid4().hex, timeout=None)
+
+
+def bump_user(user_id):
+    bump_version("user", user_id)
+
+
+def bump_post(post_id):
+    bump_version("post", post_id)
+
+
+def bump_catalogue():
+    bump_version("posts", CATALOGUE)
+
+
+def _record(outcome):
+    cache = _cache()
+    key = STATS_KEYS[outcome]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    found = _cache().get_many(list(STATS_KEYS.values()))
+    hits = found.get(STATS_KEYS["hits"], 0)
+    misses = found.get(STATS_KEYS["misses"], 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_stats():
+    _cache().delete_many(list(STATS_KEYS.values()))
+
+
+def cached_dashboard_context(kind, user, builder, include_catalogue=False):
+    """
+    Return the dashboard context for ``user``, rebuilding it with ``builder``
+    only when the user's version, the catalogue version or the version of a
+    post shown on the dashboard has changed.
+
+    ``builder(user)`` must return ``(context, post_ids, expires_at)`` with
+    every queryset in the context already evaluated so the result can be
+    pickled. ``expires_at`` caps the entry's lifetime (for example at the next
+    deadline) and may be ``None``.
+    """
+    cache = _cache()
+    scopes = [("user", user.id)]
+    if include_catalogue:
+        scopes.append(("posts", CATALOGUE))
+    key = f"dashboard:{kind}:{user.id}:" + ":".join(get_versions(scopes))
+
+    entry = cache.get(key)
+    if entry is not None:
+        post_scopes = [("post", post_id) for post_id in entry["post_ids"]]
+        if get_versions(post_scopes) == entry["post_versions"]:
+            _record("hits")
+            return entry["context"]
+
+    _record("misses")
+    context, post_ids, expires_at = builder(user)
+    post_ids = list(post_ids)
+    entry = {
+        "context": context,
+        "post_ids": post_ids,
+        "post_versions": get_versions([("post", post_id) for post_id in post_ids]),
+    }
+    timeout = _timeout()
+    if expires_at is not None:
+        timeout = max(0, min(timeout, ceil((expires_at - timezone.now()).total_seconds())))
+    if timeout:
+        cache.set(key, entry, timeout=timeout)
+    return context
@@ -0,0 +1,44 @@
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.utils import timezone
+
+from assignments.models import Post
+from courses.models import Course
+
+
+class SubmissionFeedFilterForm(forms.Form):
+    course = forms.ModelChoiceField(queryset=Course.objects.none(), required=False, empty_label="All courses")
+    post = forms.ModelChoiceField(
+        queryset=Post.objects.none(),
+        required=False,
+        empty_label="All assignments",
+        label="Assignment",
+    )
+    since = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    until = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    def __init__(self, *args, lecturer, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["course"].queryset = Course.objects.filter(lecturer=lecturer).order_by("name")
+        self.fields["post"].queryset = Post.objects.filter(author=lecturer).order_by("-deadline")
+
+    def filter_queryset(self, queryset):
+        # Invalid fields are dropped from cleaned_data, so only valid filters apply.
+        if not self.is_bound:
+            return queryset
+        self.is_valid()
+        data = self.cleaned_data
+        if data.get("course"):
+            queryset = queryset.filter(post__course=data["course"])
+        if data.get("post"):
+            queryset = queryset.filter(post=data["post"])
+        if data.get("since"):
+            queryset = queryset.filter(submitted_at__gte=_start_of_day(data["since"]))
+        if data.get("until"):
+            queryset = queryset.filter(submitted_at__lt=_start_of_day(data["until"] + timedelta(days=1)))
+        return queryset
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
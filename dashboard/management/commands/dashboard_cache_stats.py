@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = "Report dashboard cache hit/miss statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counters after reporting.")
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.2%}"
+        )
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write("Counters reset.")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.reminders import REMINDER_WINDOWS, send_deadline_reminders
+
+
+class Command(BaseCommand):
+    help = "Record (and optionally email) reminders for students who have not submitted before a deadline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", action="store_true", default=None, help="Also send reminder emails.")
+
+    def handle(self, *args, **options):
+        sent = send_deadline_reminders(send_email=options["email"])
+        for kind, _ in REMINDER_WINDOWS:
+            self.stdout.write(f"{kind}: {sent[kind]} reminder(s)")
+        self.stdout.write(self.style.SUCCESS(f"Sent {sum(sent.values())} reminder(s)."))
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('assignments', '0007_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('deadline_24h', 'Deadline in 24 hours'), ('deadline_1h', 'Deadline in 1 hour')], max_length=20)),
+                ('message', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='assignments.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'myapp_notification',
+                'indexes': [models.Index(fields=['user', 'created_at'], name='myapp_notification_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'post', 'kind'), name='myapp_notification_once')],
+            },
+        ),
+    ]
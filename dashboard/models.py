@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class Notification(models.Model):
+    KIND_CHOICES = (
+        ("deadline_24h", "Deadline in 24 hours"),
+        ("deadline_1h", "Deadline in 1 hour"),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    post = models.ForeignKey("assignments.Post", on_delete=models.CASCADE, related_name="notifications")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    message = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "myapp_notification"
+        constraints = [
+            # Leads with user so the "not yet reminded" anti-join is an index probe.
+            models.UniqueConstraint(fields=["user", "post", "kind"], name="myapp_notification_once"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="myapp_notification_user_idx"),
+        ]
+
+    def __str__(self):
+        return self.message
@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from assignments.models import Post, Submission
+from dashboard.models import Notification
+from groups.allocation import roster_students
+
+# Tightest window first: a post inside the 1h window only gets the 1h reminder.
+REMINDER_WINDOWS = [
+    ("deadline_1h", timedelta(hours=1)),
+    ("deadline_24h", timedelta(hours=24)),
+]
+BATCH_SIZE = 500
+
+
+def due_posts(now):
+    """Yield ``(kind, post)`` for posts due inside each reminder window, via the deadline index."""
+    lower = now
+    for kind, span in REMINDER_WINDOWS:
+        upper = now + span
+        posts = Post.objects.filter(deadline__gt=lower, deadline__lte=upper).order_by("deadline", "id")
+        for post in posts.iterator(chunk_size=BATCH_SIZE):
+            yield kind, post
+        lower = upper
+
+
+def pending_recipients(post, kind):
+    """Roster students with no submission and no ``kind`` reminder yet, as one anti-join."""
+    return (
+        roster_students(post)
+        .filter(
+            ~Exists(Submission.objects.filter(post=post, student=OuterRef("pk"))),
+            ~Exists(Notification.objects.filter(user=OuterRef("pk"), post=post, kind=kind)),
+        )
+        .order_by("id")
+        .values_list("id", "email")
+    )
+
+
+def _message(post, kind):
+    label = dict(Notification.KIND_CHOICES)[kind].lower()
+    return f"Assignment '{post.title}' is due on {post.deadline:%Y-%m-%d %H:%M} ({label})."
+
+
+def send_deadline_reminders(now=None, send_email=None):
+    """
+    Record a reminder for every student who has not submitted a post due
+    within a reminder window, and optionally email them. Safe to re-run: the
+    anti-join skips students already reminded. Returns counts per kind.
+    """
+    now = now or timezone.now()
+    if send_email is None:
+        send_email = settings.DEADLINE_REMINDER_EMAIL
+    connection = get_connection() if send_email else None
+    sent = Counter()
+
+    for kind, post in due_posts(now):
+        # Read the whole anti-join before writing to the table it filters on.
+        recipients = list(pending_recipients(post, kind))
+        if not recipients:
+            continue
+        message = _message(post, kind)
+        Notification.objects.bulk_create(
+            [Notification(user_id=user_id, post=post, kind=kind, message=message) for user_id, _ in recipients],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        if send_email:
+            connection.send_messages(
+                [EmailMessage(f"Reminder: {post.title}", message, to=[email]) for _, email in recipients if email]
+            )
+        sent[kind] += len(recipients)
+    return sent
+
+
+def recent_notifications(user, limit=5):
+    return list(Notification.objects.filter(user=user).order_by("-created_at", "-id")[:limit])
@@ -0,0 +1,70 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from assignments.models import Post, Submission
+from dashboard.cache import bump_catalogue, bump_post, bump_user
+from groups.models import Group
+
+
+def _after_commit(bump, *args):
+    # Bumping before the commit would let another request cache the old rows
+    # under the new version.
+    transaction.on_commit(partial(bump, *args))
+
+
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+def invalidate_on_submission_change(sender, instance, **kwargs):
+    _after_commit(bump_user, instance.student_id)
+    _after_commit(bump_post, instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_on_post_save(sender, instance, created, **kwargs):
+    _after_commit(bump_post, instance.pk)
+    _after_commit(bump_user, instance.author_id)
+    if created or instance.deleted_at:
+        _after_commit(bump_catalogue)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_on_post_delete(sender, instance, **kwargs):
+    _after_commit(bump_post, instance.pk)
+    _after_commit(bump_user, instance.author_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_on_group_change(sender, instance, **kwargs):
+    _after_commit(bump_post, instance.post_id)
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def invalidate_on_group_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # The cleared ids are gone by post_clear, so capture them first.
+        if reverse:
+            instance._dashboard_cleared_pks = list(instance.assignment_groups.values_list("post_id", flat=True))
+        else:
+            instance._dashboard_cleared_pks = list(instance.members.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        # ``instance`` is a User and ``pk_set`` holds Group ids.
+        _after_commit(bump_user, instance.pk)
+        if action == "post_clear":
+            post_ids = getattr(instance, "_dashboard_cleared_pks", [])
+        else:
+            post_ids = Group.objects.filter(id__in=pk_set).values_list("post_id", flat=True)
+        for post_id in set(post_ids):
+            _after_commit(bump_post, post_id)
+    else:
+        _after_commit(bump_post, instance.post_id)
+        user_ids = getattr(instance, "_dashboard_cleared_pks", []) if action == "post_clear" else pk_set
+        for user_id in user_ids or ():
+            _after_commit(bump_user, user_id)
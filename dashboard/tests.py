@@ -0,0 +1,523 @@
+import base64
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from assignments.models import Post, Submission
+from courses.models import Course
+from dashboard.cache import get_stats, get_versions
+from dashboard.models import Notification
+from dashboard.reminders import send_deadline_reminders
+from dashboard.serializers import DashboardAssignmentSerializer
+from dashboard.views import _build_assignment_cards_for_user, student_assignment_pages
+from groups.models import Group
+
+
+def _crafted_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+# A non-scalar in the datetime slot, and nulls that decode but break the keyset filter.
+CRAFTED_CURSORS = [_crafted_cursor([["2026-01-01"], 1]), _crafted_cursor([{"a": 1}, 1]), _crafted_cursor([None, None])]
+
+
+class AssignmentCardQueryTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username="card_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.other_student = User.objects.create_user(username="card_other", password="pass1234")
+        Profile.objects.update_or_create(user=self.other_student, defaults={"role": "student"})
+        self.lecturer = User.objects.create_user(username="card_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+
+    def _create_post(self, title, days, groups=2):
+        post = Post.objects.create(
+            author=self.lecturer,
+            title=title,
+            content="Body",
+            deadline=timezone.now() + timedelta(days=days),
+            group_type="manual",
+            max_students_per_group=5,
+        )
+        for i in range(1, groups + 1):
+            group = Group.objects.create(post=post, name=f"Group {i}")
+            group.members.add(self.other_student)
+        return post
+
+    def test_cards_report_status_group_and_progress(self):
+        submitted_post = self._create_post("Submitted", days=2)
+        overdue_post = self._create_post("Overdue", days=-1)
+        pending_post = self._create_post("Pending", days=1, groups=0)
+
+        group = submitted_post.groups.get(name="Group 1")
+        group.members.add(self.student)
+        Submission.objects.create(
+            post=submitted_post,
+            group=group,
+            student=self.student,
+            file="submissions/card.txt",
+        )
+
+        cards = {post.id: post for post in _build_assignment_cards_for_user(self.student, "student")}
+
+        self.assertEqual(cards[submitted_post.id].user_status, "Submitted")
+        self.assertEqual(cards[submitted_post.id].user_group, "Group 1")
+        self.assertEqual(cards[submitted_post.id].progress, "1/3")
+        self.assertEqual(cards[overdue_post.id].user_status, "Overdue")
+        self.assertIsNone(cards[overdue_post.id].user_group)
+        self.assertEqual(cards[overdue_post.id].progress, "0/2")
+        self.assertEqual(cards[pending_post.id].user_status, "Pending")
+        self.assertEqual(cards[pending_post.id].progress, "0/0")
+
+    def test_query_count_does_not_grow_with_posts_or_groups(self):
+        self._create_post("First", days=1)
+        student = User.objects.get(pk=self.student.pk)
+        with self.assertNumQueries(2):
+            _build_assignment_cards_for_user(student, "student")
+
+        for i in range(5):
+            self._create_post(f"Extra {i}", days=i - 2, groups=4)
+        student = User.objects.get(pk=self.student.pk)
+        with self.assertNumQueries(2):
+            cards = _build_assignment_cards_for_user(student, "student")
+        self.assertEqual(len(cards), 6)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        caches["dashboard"].clear()
+        self.student = User.objects.create_user(username="cache_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.lecturer = User.objects.create_user(username="cache_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Cached",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=3,
+        )
+        self.group = Group.objects.create(post=self.post, name="Group 1")
+
+    def _student_card(self):
+        response = self.client.get(reverse("dashboard"))
+        return response.context["posts"][0]
+
+    def test_second_request_is_served_from_cache(self):
+        self.client.login(username="cache_student", password="pass1234")
+        self.client.get(reverse("dashboard"))
+        self.client.get(reverse("dashboard"))
+
+        stats = get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_group_membership_and_submission_invalidate_student_dashboard(self):
+        self.client.login(username="cache_student", password="pass1234")
+        self.assertIsNone(self._student_card().user_group)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.members.add(self.student)
+        self.assertEqual(self._student_card().user_group, "Group 1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Submission.objects.create(
+                post=self.post,
+                group=self.group,
+                student=self.student,
+                file="submissions/cache.txt",
+            )
+        self.assertEqual(self._student_card().user_status, "Submitted")
+
+    def test_post_changes_invalidate_dashboards(self):
+        self.client.login(username="cache_student", password="pass1234")
+        self.assertEqual(self._student_card().title, "Cached")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = "Renamed"
+            self.post.save()
+        self.assertEqual(self._student_card().title, "Renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.context["posts"], [])
+
+    def test_group_changes_invalidate_instructor_dashboard(self):
+        self.client.login(username="cache_lecturer", password="pass1234")
+        response = self.client.get(reverse("instructor_dashboard"))
+        self.assertEqual(response.context["assignments"][0].group_total, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Group.objects.create(post=self.post, name="Group 2")
+        response = self.client.get(reverse("instructor_dashboard"))
+        self.assertEqual(response.context["assignments"][0].group_total, 2)
+
+    def test_versions_change_only_once_the_write_commits(self):
+        (before,) = get_versions([("post", self.post.pk)])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.post.title = "Renamed"
+            self.post.save()
+            self.assertEqual(get_versions([("post", self.post.pk)]), [before])
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_versions([("post", self.post.pk)]), [before])
+
+
+class StudentAssignmentPaginationTests(TestCase):
+    def setUp(self):
+        caches["dashboard"].clear()
+        self.student = User.objects.create_user(username="page_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.lecturer = User.objects.create_user(username="page_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        now = timezone.now()
+        deadline = now + timedelta(days=3)
+        # Shared deadlines make sure the id tiebreaker is exercised.
+        for i in range(25):
+            Post.objects.create(
+                author=self.lecturer,
+                title=f"Upcoming {i}",
+                content="Body",
+                deadline=deadline + timedelta(hours=i // 2),
+            )
+        for i in range(3):
+            Post.objects.create(
+                author=self.lecturer,
+                title=f"Overdue {i}",
+                content="Body",
+                deadline=now - timedelta(days=i + 1),
+            )
+
+    def test_upcoming_pages_cover_every_post_once(self):
+        first = student_assignment_pages(self.student, page_size=10)
+        self.assertEqual(len(first["upcoming_assignments"]), 10)
+
+        seen = [post.id for post in first["upcoming_assignments"]]
+        cursor = first["upcoming_next_cursor"]
+        while cursor:
+            page = student_assignment_pages(self.student, upcoming_cursor=cursor, page_size=10)
+            seen.extend(post.id for post in page["upcoming_assignments"])
+            cursor = page["upcoming_next_cursor"]
+
+        expected = list(
+            Post.objects.filter(title__startswith="Upcoming").order_by("deadline", "id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_overdue_lists_most_recent_first(self):
+        pages = student_assignment_pages(self.student)
+        titles = [post.title for post in pages["overdue_assignments"]]
+        self.assertEqual(titles, ["Overdue 0", "Overdue 1", "Overdue 2"])
+        self.assertIsNone(pages["overdue_next_cursor"])
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        first = student_assignment_pages(self.student, page_size=5)
+        with self.assertNumQueries(2):
+            student_assignment_pages(self.student, page_size=5)
+        # A later page adds only the next-deadline lookup.
+        with self.assertNumQueries(3):
+            student_assignment_pages(self.student, upcoming_cursor=first["upcoming_next_cursor"], page_size=5)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        self.client.login(username="page_student", password="pass1234")
+        response = self.client.get(reverse("dashboard"), {"upcoming_cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["upcoming_assignments"][0].title, "Upcoming 0")
+
+    def test_crafted_cursors_fall_back_to_first_page(self):
+        self.client.login(username="page_student", password="pass1234")
+        for cursor in CRAFTED_CURSORS:
+            for name in ("upcoming_cursor", "overdue_cursor"):
+                for url in (reverse("dashboard"), reverse("profile")):
+                    response = self.client.get(url, {name: cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.context["upcoming_assignments"][0].title, "Upcoming 0")
+
+    def test_crafted_cursors_are_rejected_by_the_api(self):
+        self.client.login(username="page_lecturer", password="pass1234")
+        for cursor in CRAFTED_CURSORS:
+            response = self.client.get(reverse("assignment_create"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_profile_page_links_to_next_upcoming_page(self):
+        self.client.login(username="page_student", password="pass1234")
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(len(response.context["upcoming_assignments"]), 20)
+        self.assertContains(response, "upcoming_cursor=" + response.context["upcoming_next_cursor"])
+
+
+class DashboardAssignmentSerializerTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username="ser_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.lecturer = User.objects.create_user(username="ser_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        deadline = timezone.now() + timedelta(days=1)
+        Post.objects.bulk_create(
+            Post(author=self.lecturer, title=f"Bulk {i}", content="Body", deadline=deadline)
+            for i in range(1000)
+        )
+        self.submitted_post = Post.objects.order_by("id").first()
+        group = Group.objects.create(post=self.submitted_post, name="Solo")
+        Submission.objects.create(
+            post=self.submitted_post,
+            group=group,
+            student=self.student,
+            file="submissions/bulk.txt",
+        )
+
+    def test_serializing_many_assignments_takes_two_queries(self):
+        with self.assertNumQueries(2):
+            data = DashboardAssignmentSerializer(
+                Post.objects.order_by("id"),
+                many=True,
+                context={"user": self.student},
+            ).data
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(data[0]["status"], "Submitted")
+        self.assertEqual({row["status"] for row in data[1:]}, {"Pending"})
+
+    def test_json_endpoint_returns_statuses(self):
+        self.client.login(username="ser_student", password="pass1234")
+        response = self.client.get(reverse("dashboard_assignments_api"), {"page_size": 3})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(len(body["results"]), 3)
+        self.assertEqual(body["results"][0]["id"], self.submitted_post.id)
+        self.assertEqual(body["results"][0]["status"], "Submitted")
+        self.assertIsNotNone(body["next_cursor"])
+
+
+class InstructorSubmissionFeedTests(TestCase):
+    def setUp(self):
+        caches["dashboard"].clear()
+        self.lecturer = User.objects.create_user(username="feed_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.other_lecturer = User.objects.create_user(username="feed_other", password="pass1234")
+        Profile.objects.update_or_create(user=self.other_lecturer, defaults={"role": "lecturer"})
+        self.course = Course.objects.create(name="Feed Course", lecturer=self.lecturer)
+
+        deadline = timezone.now() + timedelta(days=1)
+        self.post = Post.objects.create(
+            author=self.lecturer, title="In course", content="Body", deadline=deadline, course=self.course
+        )
+        self.loose_post = Post.objects.create(
+            author=self.lecturer, title="No course", content="Body", deadline=deadline
+        )
+        foreign_post = Post.objects.create(
+            author=self.other_lecturer, title="Foreign", content="Body", deadline=deadline
+        )
+        for post, count in ((self.post, 30), (self.loose_post, 5), (foreign_post, 3)):
+            group = Group.objects.create(post=post, name="Group 1")
+            for i in range(count):
+                student = User.objects.create(username=f"feed_{post.id}_{i}")
+                Submission.objects.create(post=post, group=group, student=student, file="submissions/feed.txt")
+
+    def test_dashboard_shows_first_page_with_load_more(self):
+        self.client.login(username="feed_lecturer", password="pass1234")
+        response = self.client.get(reverse("instructor_dashboard"))
+
+        self.assertEqual(len(response.context["submissions"]), 25)
+        self.assertIsNotNone(response.context["next_feed_url"])
+        self.assertContains(response, "js-feed-more")
+
+        profile = self.client.get(reverse("profile"))
+        self.assertEqual(len(profile.context["submissions"]), 25)
+
+    def test_feed_pages_cover_own_submissions_once(self):
+        self.client.login(username="feed_lecturer", password="pass1234")
+        seen = []
+        url = reverse("instructor_submission_feed")
+        while url:
+            response = self.client.get(url, HTTP_HX_REQUEST="true")
+            self.assertEqual(response.status_code, 200)
+            seen.extend(submission.id for submission in response.context["submissions"])
+            url = response.context["next_feed_url"]
+
+        expected = Submission.objects.filter(post__author=self.lecturer).order_by("-submitted_at", "-id")
+        self.assertEqual(seen, list(expected.values_list("id", flat=True)))
+
+    def test_crafted_cursors_fall_back_to_first_page(self):
+        self.client.login(username="feed_lecturer", password="pass1234")
+        for cursor in CRAFTED_CURSORS:
+            for url in (reverse("instructor_submission_feed"), reverse("profile")):
+                response = self.client.get(url, {"cursor": cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNone(response.context["feed_cursor"])
+                self.assertEqual(len(response.context["submissions"]), 25)
+
+    def test_feed_filters_by_course_and_post(self):
+        self.client.login(username="feed_lecturer", password="pass1234")
+        url = reverse("instructor_submission_feed")
+
+        by_course = self.client.get(url, {"course": self.course.id})
+        self.assertEqual({s.post_id for s in by_course.context["submissions"]}, {self.post.id})
+
+        by_post = self.client.get(url, {"post": self.loose_post.id})
+        self.assertEqual(len(by_post.context["submissions"]), 5)
+        self.assertIsNone(by_post.context["next_feed_url"])
+
+        tomorrow = (timezone.now() + timedelta(days=1)).date().isoformat()
+        future = self.client.get(url, {"since": tomorrow})
+        self.assertEqual(future.context["submissions"], [])
+
+    def test_json_export_streams_every_matching_submission(self):
+        self.client.login(username="feed_lecturer", password="pass1234")
+        response = self.client.get(reverse("instructor_submission_export"), {"post": self.post.id})
+
+        self.assertTrue(response.streaming)
+        body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(body["submissions"]), 30)
+        self.assertEqual({row["post_id"] for row in body["submissions"]}, {self.post.id})
+
+    def test_deleted_posts_leave_the_feed_before_the_worker_runs(self):
+        Post.objects.filter(pk=self.loose_post.pk).update(deleted_at=timezone.now())
+        self.client.login(username="feed_lecturer", password="pass1234")
+
+        # The loose post's submissions are the newest, so they would lead the first page.
+        feed = self.client.get(reverse("instructor_submission_feed"))
+        self.assertEqual({s.post_id for s in feed.context["submissions"]}, {self.post.id})
+        export = self.client.get(reverse("instructor_submission_export"))
+        body = json.loads(b"".join(export.streaming_content))
+        self.assertEqual(len(body["submissions"]), 30)
+        self.assertNotIn(self.loose_post.id, {row["post_id"] for row in body["submissions"]})
+
+    def test_students_cannot_read_feed(self):
+        student = User.objects.create_user(username="feed_student", password="pass1234")
+        Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+        self.client.login(username="feed_student", password="pass1234")
+
+        self.assertEqual(self.client.get(reverse("instructor_submission_feed")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("instructor_submission_export")).status_code, 403)
+
+
+class GroupOverviewTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="overview_lecturer", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Overview",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=3,
+        )
+        self.client.login(username="overview_lecturer", password="pass1234")
+
+    def _add_groups(self, count):
+        start = Group.objects.filter(post=self.post).count()
+        for i in range(start, start + count):
+            group = Group.objects.create(post=self.post, name=f"Group {i:03d}")
+            members = [User.objects.create(username=f"overview_{i}_{j}") for j in range(2)]
+            group.members.add(*members)
+            if i % 2 == 0:
+                Submission.objects.create(post=self.post, group=group, student=members[0], file="submissions/o.txt")
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_overview_query_count_is_constant(self):
+        url = reverse("assignment_groups_overview", kwargs={"post_id": self.post.id})
+        self._add_groups(2)
+        baseline = self._count_queries(url)
+        self._add_groups(200)
+        self.assertEqual(self._count_queries(url), baseline)
+
+    def test_overview_reports_members_and_submission_status(self):
+        self._add_groups(3)
+        response = self.client.get(reverse("assignment_groups_overview_json", kwargs={"post_id": self.post.id}))
+
+        self.assertEqual(response.status_code, 200)
+        groups = response.json()["groups"]
+        self.assertEqual([g["name"] for g in groups], ["Group 000", "Group 001", "Group 002"])
+        self.assertEqual({g["member_count"] for g in groups}, {2})
+        self.assertEqual([g["status"] for g in groups], ["Submitted", "Pending", "Submitted"])
+
+    def test_other_lecturers_cannot_read_overview(self):
+        other = User.objects.create_user(username="overview_other", password="pass1234")
+        Profile.objects.update_or_create(user=other, defaults={"role": "lecturer"})
+        self.client.login(username="overview_other", password="pass1234")
+
+        url = reverse("assignment_groups_overview_json", kwargs={"post_id": self.post.id})
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class DeadlineReminderTests(TestCase):
+    def setUp(self):
+        caches["dashboard"].clear()
+        self.lecturer = User.objects.create_user(username="remind_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.students = []
+        for i in range(4):
+            student = User.objects.create_user(
+                username=f"remind_{i}", email=f"remind_{i}@example.com", password="pass1234"
+            )
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+            self.students.append(student)
+        course = Course.objects.create(name="Compilers", lecturer=self.lecturer)
+        course.student.add(*self.students[:3])
+
+        now = timezone.now()
+        self.soon = Post.objects.create(
+            author=self.lecturer, title="Soon", content="Body", deadline=now + timedelta(minutes=30), course=course
+        )
+        self.today = Post.objects.create(
+            author=self.lecturer, title="Today", content="Body", deadline=now + timedelta(hours=10)
+        )
+        Post.objects.create(author=self.lecturer, title="Later", content="Body", deadline=now + timedelta(days=3))
+        group = Group.objects.create(post=self.soon, name="Solo")
+        Submission.objects.create(
+            post=self.soon, group=group, student=self.students[0], submission_link="https://example.com"
+        )
+
+    def _reminded(self, post):
+        return set(Notification.objects.filter(post=post).values_list("user__username", "kind"))
+
+    def test_reminds_unsubmitted_roster_students_once(self):
+        # Two window scans, then one anti-join and one insert per due post.
+        with self.assertNumQueries(6):
+            sent = send_deadline_reminders(send_email=True)
+
+        self.assertEqual(sent["deadline_1h"], 2)
+        self.assertEqual(sent["deadline_24h"], 4)
+        self.assertEqual(self._reminded(self.soon), {("remind_1", "deadline_1h"), ("remind_2", "deadline_1h")})
+        self.assertEqual(len(self._reminded(self.today)), 4)
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(mail.outbox[0].to, ["remind_1@example.com"])
+
+        self.assertEqual(sum(send_deadline_reminders(send_email=True).values()), 0)
+        self.assertEqual(len(mail.outbox), 6)
+
+    def test_query_count_does_not_grow_with_roster(self):
+        for i in range(4, 40):
+            student = User.objects.create_user(username=f"remind_{i}", password="pass1234")
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+        with self.assertNumQueries(6):
+            send_deadline_reminders(send_email=False)
+        self.assertEqual(Notification.objects.filter(post=self.today).count(), 40)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_dashboard_lists_stored_reminders(self):
+        call_command("send_deadline_reminders", stdout=StringIO())
+        self.client.login(username="remind_1", password="pass1234")
+        response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Assignment &#x27;Soon&#x27; is due on")
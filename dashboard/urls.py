@@ -1,11 +1,31 @@
 from django.urls import path
 
 from assignments.views import instructor_assignment_create_view
-from dashboard.views import assignment_groups_overview_view, dashboard_view, instructor_dashboard_view
+from dashboard.views import (
+    DashboardAssignmentListView,
+    assignment_groups_overview_json_view,
+    assignment_groups_overview_view,
+    dashboard_view,
+    instructor_dashboard_view,
+    instructor_submission_export_view,
+    instructor_submission_feed_view,
+)
 
 urlpatterns = [
     path("", dashboard_view, name="dashboard"),
+    path("api/assignments/", DashboardAssignmentListView.as_view(), name="dashboard_assignments_api"),
     path("instructor/", instructor_dashboard_view, name="instructor_dashboard"),
+    path("instructor/submissions/", instructor_submission_feed_view, name="instructor_submission_feed"),
+    path(
+        "instructor/submissions/export/",
+        instructor_submission_export_view,
+        name="instructor_submission_export",
+    ),
     path("instructor/assignments/create/", instructor_assignment_create_view, name="instructor_assignment_create"),
     path("instructor/groups/<int:post_id>/", assignment_groups_overview_view, name="assignment_groups_overview"),
+    path(
+        "instructor/groups/<int:post_id>/status/",
+        assignment_groups_overview_json_view,
+        name="assignment_groups_overview_json",
+    ),
 ]
@@ -1,149 +1,360 @@
+import json
+from collections import defaultdict
+from functools import partial
+
 from django.contrib.auth.decorators import login_required
-from django.db.models import Case, Count, IntegerField, Value, When
-from django.http import HttpResponseForbidden
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, Count, Exists, IntegerField, OuterRef, Value, When
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.utils import timezone
+from rest_framework import generics
 
+from accounts.roles import get_role
 from assignments.models import Post, Submission
+from config.pagination import KeysetPagination, decode_cursor, paginate_keyset
 from courses.models import Course
+from dashboard.cache import cached_dashboard_context
+from dashboard.forms import SubmissionFeedFilterForm
+from dashboard.reminders import recent_notifications
+from dashboard.serializers import DashboardAssignmentSerializer
 from groups.models import Group
 
+ASSIGNMENT_ORDERING = ["deadline", "id"]
+DASHBOARD_PAGE_SIZE = 20
+FEED_ORDERING = ["submitted_at", "id"]
+FEED_PAGE_SIZE = 25
+EXPORT_CHUNK_SIZE = 500
+
 
-def _role(user):
-    if not hasattr(user, "profile"):
-        return ""
-    return (user.profile.role or "").strip().lower()
+def _status_for(has_submitted, is_overdue):
+    if has_submitted:
+        return "Submitted"
+    if is_overdue:
+        return "Overdue"
+    return "Pending"
 
 
-def _build_assignment_cards_for_user(user):
+def _build_assignment_cards_for_user(user, role, post_ids=None):
     now = timezone.now()
-    posts = Post.objects.select_related("author", "course").annotate(
-        is_overdue_case=Case(
-            When(deadline__lt=now, then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField(),
+    posts = Post.objects.select_related("author", "course", "stats")
+    user_groups = Group.objects.alive().filter(members=user)
+    if post_ids is not None:
+        posts = posts.filter(id__in=post_ids)
+        user_groups = user_groups.filter(post_id__in=post_ids)
+    posts = list(
+        posts.with_submission_flag(user)
+        .annotate(
+            is_overdue_case=Case(
+                When(deadline__lt=now, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
         )
-    ).order_by("is_overdue_case", "deadline")
-    user_role = _role(user)
+        .order_by("is_overdue_case", "deadline")
+    )
+
+    group_names_by_post = defaultdict(list)
+    for post_id, name in user_groups.order_by("id").values_list("post_id", "name"):
+        group_names_by_post[post_id].append(name)
 
     for post in posts:
-        post.user_status = post.get_status_for_user(user)
+        post.user_status = _status_for(post.has_submitted, post.is_overdue_case)
         post.status_class = post.user_status.lower()
-        post.can_manage = user_role == "lecturer" and post.author_id == user.id
-        user_group_names = list(
-            Group.objects.filter(post=post, members=user)
-            .order_by("id")
-            .values_list("name", flat=True)
-        )
+        post.can_manage = role == "lecturer" and post.author_id == user.id
+        user_group_names = group_names_by_post.get(post.id)
         post.user_group = ", ".join(user_group_names) if user_group_names else None
-        groups = Group.objects.filter(post=post)
-        total_submissions = Submission.objects.filter(post=post).count()
-        total_students = sum(group.members.count() for group in groups)
-        post.progress = f"{total_submissions}/{total_students}" if total_students else "0/0"
+        stats = getattr(post, "stats", None)
+        post.progress = stats.progress if stats else "0/0"
     return posts
 
 
-def _is_lecturer(user):
-    return _role(user) == "lecturer"
+def _is_lecturer(request):
+    return get_role(request) == "lecturer"
 
 
 def home_view(request):
-    role = _role(request.user) if request.user.is_authenticated else ""
+    role = get_role(request)
     context = {
         "role": role,
     }
     return render(request, "home.html", context)
 
 
-@login_required
-def dashboard_view(request):
-    if _role(request.user) != "student":
-        return render(request, "dashboard/student_dashboard.html", {"forbidden": True})
+def _clean_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        decode_cursor(cursor, Post, ASSIGNMENT_ORDERING)
+    except ValueError:
+        return None
+    return cursor
 
-    assignments = Post.objects.select_related("course", "author").order_by("deadline")
-    submissions = Submission.objects.filter(student=request.user).select_related("post")
-    joined_groups = Group.objects.filter(members=request.user).select_related("post")
-    posts = _build_assignment_cards_for_user(request.user)
 
-    submitted_post_ids = {submission.post_id for submission in submissions}
-    for assignment in assignments:
-        assignment.has_submitted = assignment.id in submitted_post_ids
+def student_assignment_pages(user, upcoming_cursor=None, overdue_cursor=None, page_size=DASHBOARD_PAGE_SIZE):
+    """
+    Keyset-paginate the student's upcoming (soonest first) and overdue (most
+    recent first) assignments on ``(deadline, id)``. Invalid cursors fall back
+    to the first page.
+    """
+    now = timezone.now()
+    posts = Post.objects.select_related("course", "author").with_submission_flag(user)
+    upcoming_cursor = _clean_cursor(upcoming_cursor)
+    overdue_cursor = _clean_cursor(overdue_cursor)
 
-    upcoming_assignments = [assignment for assignment in assignments if not assignment.is_overdue]
-    overdue_assignments = [assignment for assignment in assignments if assignment.is_overdue]
-    notifications = [
-        f"Assignment '{assignment.title}' is due on {assignment.deadline:%Y-%m-%d %H:%M}"
-        for assignment in upcoming_assignments[:5]
-    ]
+    upcoming_assignments, upcoming_next_cursor = paginate_keyset(
+        posts.upcoming(now),
+        ASSIGNMENT_ORDERING,
+        cursor=upcoming_cursor,
+        page_size=page_size,
+    )
+    overdue_assignments, overdue_next_cursor = paginate_keyset(
+        posts.overdue(now),
+        ASSIGNMENT_ORDERING,
+        cursor=overdue_cursor,
+        page_size=page_size,
+        descending=True,
+    )
+    if upcoming_cursor:
+        next_due = list(posts.upcoming(now).order_by(*ASSIGNMENT_ORDERING)[:1])
+    else:
+        next_due = upcoming_assignments[:1]
 
-    context = {
-        "posts": posts,
-        "joined_groups": joined_groups,
+    return {
         "upcoming_assignments": upcoming_assignments,
+        "upcoming_cursor": upcoming_cursor,
+        "upcoming_next_cursor": upcoming_next_cursor,
         "overdue_assignments": overdue_assignments,
-        "notifications": notifications,
+        "overdue_cursor": overdue_cursor,
+        "overdue_next_cursor": overdue_next_cursor,
+        "next_deadline": next_due[0].deadline if next_due else None,
     }
-    return render(request, "dashboard/student_dashboard.html", context)
 
 
-@login_required
-def instructor_dashboard_view(request):
-    if not _is_lecturer(request.user):
-        return render(request, "dashboard/instructor_dashboard.html", {"forbidden": True})
+def _build_student_dashboard_context(user, role, upcoming_cursor=None, overdue_cursor=None):
+    context = student_assignment_pages(user, upcoming_cursor, overdue_cursor)
+    page_post_ids = [
+        assignment.id
+        for assignment in context["upcoming_assignments"] + context["overdue_assignments"]
+    ]
+    context["posts"] = _build_assignment_cards_for_user(user, role, post_ids=page_post_ids)
+    context["joined_groups"] = list(Group.objects.alive().filter(members=user).select_related("post"))
+    # Cards move from upcoming to overdue when a deadline passes, so the cached
+    # context must not outlive the next deadline.
+    return context, page_post_ids, context["next_deadline"]
+
 
-    my_assignments = (
-        Post.objects.filter(author=request.user)
+def _build_instructor_dashboard_context(user):
+    my_assignments = list(
+        Post.objects.filter(author=user)
         .select_related("course")
-        .annotate(group_total=Count("groups", distinct=True))
+        .annotate(group_total=Coalesce("stats__group_count", 0))
     )
-    my_courses = Course.objects.filter(
-        lecturer=request.user,
-        posts__author=request.user,
-    ).distinct().order_by("name")
-    submissions = Submission.objects.filter(post__author=request.user).select_related("post", "student")
-    groups = Group.objects.filter(post__author=request.user).select_related("post")
+    my_courses = list(
+        Course.objects.filter(
+            lecturer=user,
+            posts__author=user,
+        ).distinct().order_by("name")
+    )
+    groups = list(Group.objects.alive().filter(post__author=user).select_related("post"))
 
     context = {
         "courses": my_courses,
         "assignments": my_assignments,
-        "group_assignments": my_assignments.order_by("deadline"),
-        "submissions": submissions,
+        "group_assignments": sorted(my_assignments, key=lambda assignment: assignment.deadline),
         "groups": groups,
     }
+    upcoming = [assignment.deadline for assignment in my_assignments if not assignment.is_overdue]
+    return context, [assignment.id for assignment in my_assignments], min(upcoming, default=None)
+
+
+def instructor_submission_feed(request, page_size=FEED_PAGE_SIZE):
+    """
+    Return one keyset page of the lecturer's submissions, newest first,
+    filtered by the course/post/date parameters on ``request.GET``.
+    """
+    form = SubmissionFeedFilterForm(request.GET or None, lecturer=request.user)
+    queryset = form.filter_queryset(
+        Submission.objects.alive().filter(post__author=request.user).select_related("post", "student")
+    )
+    cursor = request.GET.get("cursor")
+    try:
+        submissions, next_cursor = paginate_keyset(
+            queryset, FEED_ORDERING, cursor=cursor, page_size=page_size, descending=True
+        )
+    except (ValueError, TypeError):
+        cursor = None
+        submissions, next_cursor = paginate_keyset(
+            queryset, FEED_ORDERING, page_size=page_size, descending=True
+        )
+
+    next_feed_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_feed_url = f"{reverse('instructor_submission_feed')}?{params.urlencode()}"
+
+    return {
+        "feed_form": form,
+        "feed_cursor": cursor,
+        "submissions": submissions,
+        "next_feed_url": next_feed_url,
+    }
+
+
+@login_required
+def dashboard_view(request):
+    if get_role(request) != "student":
+        return render(request, "dashboard/student_dashboard.html", {"forbidden": True})
+
+    upcoming_cursor = _clean_cursor(request.GET.get("upcoming_cursor"))
+    overdue_cursor = _clean_cursor(request.GET.get("overdue_cursor"))
+    context = cached_dashboard_context(
+        f"student:{upcoming_cursor or ''}:{overdue_cursor or ''}",
+        request.user,
+        partial(
+            _build_student_dashboard_context,
+            role=request.role,
+            upcoming_cursor=upcoming_cursor,
+            overdue_cursor=overdue_cursor,
+        ),
+        include_catalogue=True,
+    )
+    # Reminders are written by send_deadline_reminders, so read them fresh.
+    context = {**context, "notifications": recent_notifications(request.user)}
+    return render(request, "dashboard/student_dashboard.html", context)
+
+
+@login_required
+def instructor_dashboard_view(request):
+    if not _is_lecturer(request):
+        return render(request, "dashboard/instructor_dashboard.html", {"forbidden": True})
+
+    context = cached_dashboard_context(
+        "instructor",
+        request.user,
+        _build_instructor_dashboard_context,
+    )
+    # The submission feed is filtered per request, so it stays out of the cache.
+    context = {**context, **instructor_submission_feed(request)}
     return render(request, "dashboard/instructor_dashboard.html", context)
 
 
 @login_required
-def assignment_groups_overview_view(request, post_id):
-    if not _is_lecturer(request.user):
+def instructor_submission_feed_view(request):
+    if not _is_lecturer(request):
         return HttpResponseForbidden("Only instructors can access this page.")
 
-    assignment = get_object_or_404(
-        Post.objects.select_related("course", "author"),
-        id=post_id,
+    return render(request, "dashboard/submission_feed_rows.html", instructor_submission_feed(request))
+
+
+@login_required
+def instructor_submission_export_view(request):
+    if not _is_lecturer(request):
+        return HttpResponseForbidden("Only instructors can access this page.")
+
+    form = SubmissionFeedFilterForm(request.GET or None, lecturer=request.user)
+    rows = (
+        form.filter_queryset(Submission.objects.alive().filter(post__author=request.user))
+        .order_by("-submitted_at", "-id")
+        .values(
+            "id",
+            "post_id",
+            "post__title",
+            "student_id",
+            "student__username",
+            "file",
+            "submission_link",
+            "supporting_link",
+            "submitted_at",
+        )
     )
-    if assignment.author_id != request.user.id:
-        return HttpResponseForbidden("You do not own this assignment.")
 
+    def stream():
+        yield '{"submissions": ['
+        separator = ""
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+            separator = ","
+        yield "]}"
+
+    return StreamingHttpResponse(stream(), content_type="application/json")
+
+
+class DashboardAssignmentListView(generics.ListAPIView):
+    serializer_class = DashboardAssignmentSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return Post.objects.all()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["user"] = self.request.user
+        return context
+
+
+def _group_overview_cards(assignment):
     groups = (
         Group.objects.filter(post=assignment)
-        .prefetch_related("members")
+        .annotate(
+            member_count=Count("members"),
+            has_submission=Exists(Submission.objects.filter(post=assignment, group=OuterRef("pk"))),
+        )
         .order_by("name")
     )
-    group_cards = []
-    for group in groups:
-        has_submission = Submission.objects.filter(post=assignment, group=group).exists()
-        group_cards.append(
-            {
-                "group": group,
-                "member_count": group.members.count(),
-                "status": "Submitted" if has_submission else "Pending",
-                "status_class": "submitted" if has_submission else "overdue",
-            }
-        )
+    return [
+        {
+            "group": group,
+            "member_count": group.member_count,
+            "status": "Submitted" if group.has_submission else "Pending",
+            "status_class": "submitted" if group.has_submission else "overdue",
+        }
+        for group in groups
+    ]
+
+
+def _owned_assignment_or_error(request, post_id):
+    if not _is_lecturer(request):
+        return None, HttpResponseForbidden("Only instructors can access this page.")
+
+    assignment = get_object_or_404(
+        Post.objects.select_related("course", "author"),
+        id=post_id,
+    )
+    if assignment.author_id != request.user.id:
+        return None, HttpResponseForbidden("You do not own this assignment.")
+    return assignment, None
+
+
+@login_required
+def assignment_groups_overview_view(request, post_id):
+    assignment, error = _owned_assignment_or_error(request, post_id)
+    if error:
+        return error
 
     context = {
         "assignment": assignment,
-        "group_cards": group_cards,
+        "group_cards": _group_overview_cards(assignment),
     }
     return render(request, "dashboard/group_management_groups.html", context)
+
+
+@login_required
+def assignment_groups_overview_json_view(request, post_id):
+    assignment, error = _owned_assignment_or_error(request, post_id)
+    if error:
+        return error
+
+    groups = [
+        {
+            "id": card["group"].id,
+            "name": card["group"].name,
+            "member_count": card["member_count"],
+            "status": card["status"],
+        }
+        for card in _group_overview_cards(assignment)
+    ]
+    return JsonResponse({"assignment": assignment.id, "groups": groups})
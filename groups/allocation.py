@@ -0,0 +1,191 @@
+import random
+from collections import defaultdict
+from math import ceil
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from assignments.models import Submission
+from assignments.stats import rebuild_post_stats
+from dashboard.cache import bump_post
+from groups.models import Group
+
+GROUP_BATCH_SIZE = 1000
+
+
+def group_count(total, max_size):
+    return ceil(total / max_size) if total else 0
+
+
+def group_sizes(total, count):
+    """``count`` sizes summing to ``total`` that differ by at most one, largest first."""
+    if not count:
+        return []
+    base, extra = divmod(total, count)
+    return [base + 1] * extra + [base] * (count - extra)
+
+
+def _order(groups, largest_first=False):
+    # Ties break on the key so the plan does not depend on dict order.
+    sign = -1 if largest_first else 1
+    return sorted(groups, key=lambda key: (sign * len(groups[key]), str(key)))
+
+
+def rebalance(current, roster_ids, max_size, seed=0, pinned=(), kept=()):
+    """
+    Plan balanced groups for ``roster_ids`` starting from ``current``
+    (``{group_key: [student_id, ...]}``) and return the new mapping.
+
+    Students who left the roster are dropped, newcomers fill the smallest
+    groups, and only as many members move as needed to bring every group
+    within one of the others. Groups are added or dissolved (smallest first)
+    so there are ``ceil(len(roster) / max_size)`` of them; new groups are
+    keyed ``("new", n)``. ``pinned`` students never move, stay even after
+    leaving the roster, and their groups are never dissolved; neither are the
+    ``kept`` groups. The same inputs and ``seed`` always give the same plan.
+    """
+    roster = set(roster_ids)
+    pinned = set(pinned)
+    kept = set(kept)
+    groups = {}
+    placed = set()
+    for key in sorted(current, key=str):
+        groups[key] = []
+        for student_id in current[key]:
+            if (student_id in roster or student_id in pinned) and student_id not in placed:
+                groups[key].append(student_id)
+                placed.add(student_id)
+
+    unplaced = sorted(roster - placed)
+    random.Random(seed).shuffle(unplaced)
+
+    total = len(roster | placed)
+    wanted = group_count(total, max_size)
+    for key in _order(groups):
+        if len(groups) <= wanted:
+            break
+        if key not in kept and not pinned.intersection(groups[key]):
+            unplaced.extend(groups.pop(key))
+    for number in range(1, wanted - len(groups) + 1):
+        groups[("new", number)] = []
+
+    targets = dict(zip(_order(groups, largest_first=True), group_sizes(total, len(groups))))
+    for key in _order(groups, largest_first=True):
+        movable = [student_id for student_id in groups[key] if student_id not in pinned]
+        while len(groups[key]) > targets[key] and movable:
+            student_id = movable.pop()
+            groups[key].remove(student_id)
+            unplaced.append(student_id)
+
+    for key in _order(groups):
+        while len(groups[key]) < targets[key] and unplaced:
+            groups[key].append(unplaced.pop(0))
+    return groups
+
+
+def allocate(student_ids, max_size, seed=0):
+    """Split ``student_ids`` into balanced groups of at most ``max_size``."""
+    return list(rebalance({}, student_ids, max_size, seed=seed).values())
+
+
+def roster_students(post):
+    # The post's course roster; every active student when it has no course.
+    students = User.objects.filter(profile__role="student", is_active=True)
+    if post.course_id:
+        students = students.filter(courses=post.course_id)
+    return students
+
+
+def roster_student_ids(post):
+    return list(roster_students(post).order_by("id").values_list("id", flat=True).distinct())
+
+
+def _new_names(existing, count):
+    taken = set(existing)
+    names = []
+    number = 1
+    while len(names) < count:
+        name = f"Group {number}"
+        if name not in taken:
+            names.append(name)
+        number += 1
+    return names
+
+
+def sync_groups(post, seed=None):
+    """
+    Create or rebalance ``post``'s groups from its course roster.
+
+    Automatic posts get their members allocated and rebalanced with bulk
+    writes; manual posts get enough empty groups for the roster, and members
+    pick their own. Students who already submitted stay in their group.
+    """
+    if post.group_type not in ["manual", "automatic"]:
+        return
+    if post.group_type == "manual" and not post.max_students_per_group:
+        Group.objects.get_or_create(post=post, name="Group 1")
+        return
+    if not post.max_students_per_group or post.max_students_per_group <= 0:
+        return
+
+    roster = roster_student_ids(post)
+    Membership = Group.members.through
+    with transaction.atomic():
+        existing = {
+            group_id: name
+            for group_id, name in Group.objects.select_for_update().filter(post=post).values_list("id", "name")
+        }
+        if post.group_type == "manual":
+            # Always leave at least one group to join, even for an empty roster.
+            missing = max(group_count(len(roster), post.max_students_per_group), 1) - len(existing)
+            if missing > 0:
+                Group.objects.bulk_create(
+                    [Group(post=post, name=name) for name in _new_names(existing.values(), missing)],
+                    batch_size=GROUP_BATCH_SIZE,
+                )
+                rebuild_post_stats([post.pk])
+                bump_post(post.pk)
+            return
+
+        current = {group_id: [] for group_id in existing}
+        rows = Membership.objects.filter(group__post=post).order_by("id").values_list("group_id", "user_id")
+        for group_id, user_id in rows:
+            current[group_id].append(user_id)
+        submissions = list(Submission.objects.filter(post=post).values_list("student_id", "group_id"))
+        submitted_groups = {group_id for _, group_id in submissions}
+        plan = rebalance(
+            current,
+            roster,
+            post.max_students_per_group,
+            seed=post.pk if seed is None else seed,
+            pinned={student_id for student_id, _ in submissions},
+            kept=submitted_groups,
+        )
+
+        new_keys = [key for key in plan if key not in current]
+        created = Group.objects.bulk_create(
+            [Group(post=post, name=name) for name in _new_names(existing.values(), len(new_keys))],
+            batch_size=GROUP_BATCH_SIZE,
+        )
+        group_ids = {key: key for key in plan if key in current}
+        group_ids.update({key: group.pk for key, group in zip(new_keys, created)})
+
+        wanted = {(group_ids[key], user_id) for key, members in plan.items() for user_id in members}
+        held = {(group_id, user_id) for group_id, members in current.items() for user_id in members}
+        stale = defaultdict(list)
+        for group_id, user_id in held - wanted:
+            stale[group_id].append(user_id)
+        for group_id, user_ids in stale.items():
+            Membership.objects.filter(group_id=group_id, user_id__in=user_ids).delete()
+        Membership.objects.bulk_create(
+            [Membership(group_id=group_id, user_id=user_id) for group_id, user_id in sorted(wanted - held)],
+            batch_size=GROUP_BATCH_SIZE,
+        )
+        # Deleting a group cascades to its submissions, so those groups always stay.
+        dissolved = [group_id for group_id in current if group_id not in plan and group_id not in submitted_groups]
+        if dissolved:
+            Group.objects.filter(pk__in=dissolved).delete()
+
+        if created or dissolved or wanted != held:
+            rebuild_post_stats([post.pk])
+            bump_post(post.pk)
@@ -5,22 +5,19 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from accounts.roles import get_role
+from groups.membership import ALREADY_MEMBER, FULL, IN_OTHER_GROUP, join_group
 from groups.models import Group
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def join_group_api(request, group_id):
-    group = get_object_or_404(Group, id=group_id)
+    group = get_object_or_404(Group.objects.alive().select_related("post"), id=group_id)
     post = group.post
     user = request.user
 
-    role = (
-        (user.profile.role or "").strip().lower()
-        if hasattr(user, "profile")
-        else ""
-    )
-    if role != "student":
+    if get_role(request) != "student":
         return Response(
             {"error": "Only students can join groups."},
             status=status.HTTP_403_FORBIDDEN,
@@ -38,28 +35,20 @@ def join_group_api(request, group_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    existing_group = Group.objects.filter(post=post, members=user).first()
-    if existing_group:
-        if existing_group.id == group.id:
-            return Response(
-                {
-                    "success": "You are already in this group.",
-                    "member_count": group.members.count(),
-                },
-                status=status.HTTP_200_OK,
-            )
+    outcome, member_count = join_group(group, user)
+    if outcome == ALREADY_MEMBER:
+        return Response(
+            {"success": "You are already in this group.", "member_count": member_count},
+            status=status.HTTP_200_OK,
+        )
+    if outcome == IN_OTHER_GROUP:
         return Response(
             {"error": "You are already in a group."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-
-    if post.max_students_per_group and group.members.count() >= post.max_students_per_group:
+    if outcome == FULL:
         return Response(
             {"error": "Group is full."},
             status=status.HTTP_400_BAD_REQUEST,
         )
-
-    group.members.add(user)
-    return Response(
-        {"success": "Successfully joined group.", "member_count": group.members.count()}
-    )
+    return Response({"success": "Successfully joined group.", "member_count": member_count})
@@ -5,3 +5,6 @@ class GroupsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "groups"
 
+
+    def ready(self):
+        import groups.signals  # noqa: F401
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assignments.models import Post
+from groups.allocation import sync_groups
+
+
+class Command(BaseCommand):
+    help = "Create or rebalance groups for open group assignments. Safe to run repeatedly."
+
+    def add_arguments(self, parser):
+        parser.add_argument("post_ids", nargs="*", type=int, help="Only provision these posts.")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.filter(group_type__in=["manual", "automatic"])
+        if options["post_ids"]:
+            posts = posts.filter(pk__in=options["post_ids"])
+        else:
+            posts = posts.filter(deadline__gt=timezone.now())
+
+        provisioned = 0
+        for post in posts.order_by("id").iterator():
+            sync_groups(post)
+            provisioned += 1
+        self.stdout.write(self.style.SUCCESS(f"Provisioned groups for {provisioned} assignment(s)."))
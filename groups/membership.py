@@ -0,0 +1,83 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q
+
+from assignments.models import Post, PostStats
+from assignments.stats import rebuild_post_stats, record_members_changed
+from dashboard.cache import bump_post, bump_user
+from groups.models import Group
+
+JOINED = "joined"
+ALREADY_MEMBER = "already_member"
+IN_OTHER_GROUP = "in_other_group"
+FULL = "full"
+
+Membership = Group.members.through
+
+
+def _insert_member(group, user, capacity):
+    """Insert the membership row only if both checks hold when it is written."""
+    members = connection.ops.quote_name(Membership._meta.db_table)
+    groups = connection.ops.quote_name(Group._meta.db_table)
+    sql = (
+        f"INSERT INTO {members} (group_id, user_id) SELECT %s, %s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {members} m INNER JOIN {groups} g ON g.id = m.group_id "
+        f"WHERE g.post_id = %s AND m.user_id = %s)"
+    )
+    params = [group.pk, user.pk, group.post_id, user.pk]
+    if capacity:
+        sql += f" AND (SELECT COUNT(*) FROM {members} WHERE group_id = %s) < %s"
+        params += [group.pk, capacity]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount == 1
+
+
+def _membership_state(group, user):
+    return Membership.objects.filter(
+        Q(group_id=group.pk) | Q(user_id=user.pk, group__post_id=group.post_id)
+    ).aggregate(
+        member_count=Count("pk", filter=Q(group_id=group.pk)),
+        current_group=Max("group_id", filter=Q(user_id=user.pk)),
+    )
+
+
+def join_group(group, user):
+    """
+    Add ``user`` to ``group`` and return ``(outcome, member_count)``.
+
+    Capacity (``post.max_students_per_group``, unlimited when unset) and
+    one-group-per-post are checked by the INSERT itself, so concurrent joins
+    can neither overfill a group nor place a student twice. Where the database
+    has row locks the post's stats row is bumped first: the counter has to be
+    updated anyway, and its lock makes joins to one post take turns. SQLite
+    runs the single statement under its database write lock instead.
+    ``group.post`` should already be loaded; the join then takes three queries.
+    """
+    capacity = group.post.max_students_per_group
+    if connection.features.has_select_for_update:
+        with transaction.atomic():
+            counted = PostStats.objects.filter(post_id=group.post_id).update(member_count=F("member_count") + 1)
+            if not counted:
+                list(Post.objects.select_for_update().filter(pk=group.post_id).values_list("pk"))
+            joined = _insert_member(group, user, capacity)
+            if not joined:
+                transaction.set_rollback(True)
+            elif not counted:
+                rebuild_post_stats([group.post_id])
+    else:
+        joined = _insert_member(group, user, capacity)
+        if joined:
+            record_members_changed(group.post_id, 1)
+
+    state = _membership_state(group, user)
+    if joined:
+        bump_post(group.post_id)
+        bump_user(user.pk)
+        outcome = JOINED
+    elif state["current_group"] == group.pk:
+        outcome = ALREADY_MEMBER
+    elif state["current_group"] is not None:
+        outcome = IN_OTHER_GROUP
+    else:
+        outcome = FULL
+    return outcome, state["member_count"]
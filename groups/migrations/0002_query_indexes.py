@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['post', 'name'], name='myapp_group_post_name_idx'),
+        ),
+    ]
@@ -1,6 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class GroupQuerySet(models.QuerySet):
+    def alive(self):
+        """Groups whose post is not waiting for the ``delete_post`` job."""
+        return self.filter(post__deleted_at__isnull=True)
+
+
 class Group(models.Model): 
     post = models.ForeignKey("assignments.Post",on_delete=models.CASCADE,related_name="groups")
     name = models.CharField(max_length=100)
@@ -11,8 +17,13 @@ class Group(models.Model):
         db_table="myapp_group_members",
     )
 
+    objects = GroupQuerySet.as_manager()
+
     class Meta:
         db_table = "myapp_group"
+        indexes = [
+            models.Index(fields=["post", "name"], name="myapp_group_post_name_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.post.title}"
@@ -9,5 +9,26 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class GroupChoiceSerializer(serializers.ModelSerializer):
+    assignment = serializers.CharField(source="post.title", read_only=True)
+    member_count = serializers.IntegerField(read_only=True)
+    capacity = serializers.SerializerMethodField()
+    remaining = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Group
+        fields = ["id", "name", "post", "assignment", "member_count", "capacity", "remaining"]
+
+    def get_capacity(self, group):
+        size = group.post.max_students_per_group
+        return size if size and size > 0 else None
+
+    def get_remaining(self, group):
+        capacity = self.get_capacity(group)
+        if capacity is None:
+            return None
+        return max(capacity - group.member_count, 0)
+
+
 class JoinGroupChoiceSerializer(serializers.Serializer):
-    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all())
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.alive().select_related("post"))
@@ -0,0 +1,21 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from courses.models import Course
+from groups.tasks import schedule_course_group_syncs
+
+
+@receiver(m2m_changed, sender=Course.student.through)
+def rebalance_on_roster_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._roster_cleared_courses = list(instance.courses.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        schedule_course_group_syncs([instance.pk])
+    elif action == "post_clear":
+        schedule_course_group_syncs(getattr(instance, "_roster_cleared_courses", []))
+    else:
+        schedule_course_group_syncs(pk_set)
@@ -0,0 +1,29 @@
+from django.utils import timezone
+
+from assignments.models import Post
+from groups.allocation import sync_groups
+from jobs.queue import PRIORITY_HIGH, enqueue
+
+
+def sync_post_groups(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        sync_groups(post)
+
+
+def schedule_group_sync(post):
+    """Queue ``sync_groups`` for ``post``; repeated calls share one pending job."""
+    if post.group_type not in ["manual", "automatic"]:
+        return None
+    return enqueue(sync_post_groups, priority=PRIORITY_HIGH, key=f"groups.sync:{post.pk}", post_id=post.pk)
+
+
+def schedule_course_group_syncs(course_ids):
+    """Queue a group sync for every open group post in ``course_ids``."""
+    posts = Post.objects.filter(
+        course_id__in=course_ids,
+        group_type__in=["manual", "automatic"],
+        deadline__gt=timezone.now(),
+    )
+    for post in posts:
+        schedule_group_sync(post)
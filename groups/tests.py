@@ -0,0 +1,397 @@
+import random
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import Profile
+from assignments.models import Post, PostStats, Submission
+from courses.models import Course
+from groups.allocation import allocate, group_count, rebalance, sync_groups
+from groups.membership import ALREADY_MEMBER, FULL, IN_OTHER_GROUP, JOINED, join_group
+from groups.models import Group
+from groups.views import JoinGroupView
+
+
+class AllocationPropertyTests(SimpleTestCase):
+    CASES = 300
+
+    def _cases(self):
+        for seed in range(self.CASES):
+            rng = random.Random(seed)
+            roster = rng.sample(range(1, 500), rng.randint(0, 120))
+            yield seed, roster, rng.randint(1, 8), rng
+
+    def assertBalanced(self, groups, roster, max_size):
+        members = [student_id for group in groups for student_id in group]
+        self.assertCountEqual(members, roster)
+        self.assertEqual(len(groups), group_count(len(roster), max_size))
+        sizes = [len(group) for group in groups]
+        if sizes:
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+            self.assertLessEqual(max(sizes), max_size)
+
+    def test_allocation_covers_roster_in_balanced_groups(self):
+        for seed, roster, max_size, _ in self._cases():
+            with self.subTest(seed=seed):
+                self.assertBalanced(allocate(roster, max_size, seed=seed), roster, max_size)
+
+    def test_allocation_is_deterministic_per_seed(self):
+        roster = list(range(1, 60))
+        self.assertEqual(allocate(roster, 4, seed=7), allocate(list(reversed(roster)), 4, seed=7))
+        self.assertNotEqual(allocate(roster, 4, seed=7), allocate(roster, 4, seed=8))
+
+    def test_rebalance_stays_balanced_after_roster_changes(self):
+        for seed, roster, max_size, rng in self._cases():
+            current = dict(enumerate(allocate(roster, max_size, seed=seed)))
+            leaving = set(rng.sample(roster, rng.randint(0, len(roster))))
+            joining = rng.sample(range(500, 700), rng.randint(0, 40))
+            new_roster = [student_id for student_id in roster if student_id not in leaving] + joining
+            with self.subTest(seed=seed):
+                plan = rebalance(current, new_roster, max_size, seed=seed)
+                self.assertBalanced(list(plan.values()), new_roster, max_size)
+
+    def test_joining_within_capacity_moves_nobody(self):
+        for seed, roster, max_size, rng in self._cases():
+            current = dict(enumerate(allocate(roster, max_size, seed=seed)))
+            spare = len(current) * max_size - len(roster)
+            joining = list(range(1000, 1000 + rng.randint(0, spare)))
+            with self.subTest(seed=seed):
+                plan = rebalance(current, roster + joining, max_size, seed=seed)
+                for key, members in current.items():
+                    self.assertEqual(plan[key][: len(members)], members)
+
+    def test_single_departure_moves_at_most_one_member(self):
+        for seed, roster, max_size, rng in self._cases():
+            if not roster:
+                continue
+            current = dict(enumerate(allocate(roster, max_size, seed=seed)))
+            leaving = rng.choice(roster)
+            remaining = [student_id for student_id in roster if student_id != leaving]
+            if group_count(len(remaining), max_size) != len(current):
+                continue
+            with self.subTest(seed=seed):
+                plan = rebalance(current, remaining, max_size, seed=seed)
+                moved = [
+                    student_id
+                    for key, members in current.items()
+                    for student_id in members
+                    if student_id != leaving and student_id not in plan[key]
+                ]
+                self.assertLessEqual(len(moved), 1)
+
+    def test_pinned_students_stay_put(self):
+        current = {1: [1, 2, 3], 2: [4, 5, 6], 3: [7]}
+        plan = rebalance(current, [1, 2, 3, 4, 5, 6, 7], 3, pinned={3, 6})
+        self.assertIn(3, plan[1])
+        self.assertIn(6, plan[2])
+        self.assertEqual(sorted(len(members) for members in plan.values()), [2, 2, 3])
+
+    def test_pinned_students_stay_after_leaving_the_roster(self):
+        plan = rebalance({1: [1], 2: [2, 3], 3: [4, 5]}, [2, 3, 4, 5], 2, pinned={1})
+        self.assertEqual(plan[1], [1])
+        plan = rebalance({1: [], 2: [2, 3]}, [2, 3], 2, kept={1})
+        self.assertIn(1, plan)
+
+
+class RosterGroupSyncTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="alloc_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.course = Course.objects.create(name="Algorithms", lecturer=self.lecturer)
+        self.students = []
+        for i in range(10):
+            student = User.objects.create_user(username=f"alloc_{i}", password="pass1234")
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+            self.students.append(student)
+        self.course.student.add(*self.students[:7])
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Teams",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="automatic",
+            max_students_per_group=3,
+            course=self.course,
+        )
+
+    def _run_jobs(self):
+        call_command("runworker", "--burst", stdout=StringIO())
+
+    def _memberships(self):
+        return {
+            user_id: group_id
+            for group_id, user_id in Group.members.through.objects.filter(group__post=self.post).values_list(
+                "group_id", "user_id"
+            )
+        }
+
+    def test_groups_come_from_course_roster_only(self):
+        sync_groups(self.post)
+
+        memberships = self._memberships()
+        self.assertCountEqual(memberships, [student.id for student in self.students[:7]])
+        sizes = sorted(group.members.count() for group in self.post.groups.all())
+        self.assertEqual(sizes, [2, 2, 3])
+        stats = PostStats.objects.get(post=self.post)
+        self.assertEqual((stats.group_count, stats.member_count), (3, 7))
+
+    def test_roster_changes_rebalance_incrementally(self):
+        sync_groups(self.post)
+        before = self._memberships()
+
+        self.course.student.add(self.students[7])
+        self._run_jobs()
+        after = self._memberships()
+        self.assertEqual({user_id: after[user_id] for user_id in before}, before)
+        self.assertEqual(self.post.groups.count(), 3)
+
+        self.course.student.add(*self.students[8:])
+        self._run_jobs()
+        self.assertEqual(self.post.groups.count(), 4)
+        sizes = sorted(group.members.count() for group in self.post.groups.all())
+        self.assertEqual(sizes, [2, 2, 3, 3])
+
+        self.course.student.remove(self.students[0])
+        self._run_jobs()
+        self.assertNotIn(self.students[0].id, self._memberships())
+        self.assertEqual(PostStats.objects.get(post=self.post).member_count, 9)
+
+    def test_submitted_students_are_not_moved(self):
+        sync_groups(self.post)
+        student = self.students[0]
+        group = Group.objects.get(post=self.post, members=student)
+        Submission.objects.create(post=self.post, group=group, student=student, submission_link="https://example.com")
+
+        teammates = group.members.exclude(id=student.id)
+        self.course.student.remove(*teammates)
+        self.course.student.add(*self.students[7:])
+        self._run_jobs()
+
+        self.assertTrue(group.members.filter(id=student.id).exists())
+        self.assertTrue(Submission.objects.filter(group=group).exists())
+
+    def test_submitters_removed_from_the_course_keep_their_group_and_submission(self):
+        sync_groups(self.post)
+        student = self.students[0]
+        group = Group.objects.get(post=self.post, members=student)
+        Submission.objects.create(post=self.post, group=group, student=student, submission_link="https://example.com")
+
+        self.course.student.remove(*group.members.all())
+        sync_groups(self.post)
+
+        self.assertTrue(Group.objects.filter(pk=group.pk, members=student).exists())
+        self.assertEqual(Submission.objects.filter(post=self.post).count(), 1)
+
+
+class JoinGroupTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="join_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.students = []
+        for i in range(3):
+            student = User.objects.create_user(username=f"join_{i}", password="pass1234")
+            Profile.objects.update_or_create(user=student, defaults={"role": "student"})
+            self.students.append(student)
+        self.post = Post.objects.create(
+            author=self.lecturer,
+            title="Pairs",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=2,
+        )
+        self.group = Group.objects.create(post=self.post, name="Group 1")
+        self.other_group = Group.objects.create(post=self.post, name="Group 2")
+
+    def _join(self, group, student):
+        return join_group(Group.objects.select_related("post").get(pk=group.pk), student)
+
+    def test_join_takes_three_queries(self):
+        group = Group.objects.select_related("post").get(pk=self.group.pk)
+        with self.assertNumQueries(3):
+            self.assertEqual(join_group(group, self.students[0]), (JOINED, 1))
+        self.assertEqual(PostStats.objects.get(post=self.post).member_count, 1)
+
+    def test_outcomes(self):
+        self._join(self.group, self.students[0])
+        self.assertEqual(self._join(self.group, self.students[0]), (ALREADY_MEMBER, 1))
+        self.assertEqual(self._join(self.other_group, self.students[0]), (IN_OTHER_GROUP, 0))
+        self.assertEqual(self._join(self.group, self.students[1]), (JOINED, 2))
+        self.assertEqual(self._join(self.group, self.students[2]), (FULL, 2))
+        self.assertEqual(PostStats.objects.get(post=self.post).member_count, 2)
+
+
+class GroupChoiceListTests(TestCase):
+    def setUp(self):
+        self.lecturer = User.objects.create_user(username="choice_lect", password="pass1234")
+        Profile.objects.update_or_create(user=self.lecturer, defaults={"role": "lecturer"})
+        self.student = User.objects.create_user(username="choice_student", password="pass1234")
+        Profile.objects.update_or_create(user=self.student, defaults={"role": "student"})
+        self.classmate = User.objects.create_user(username="choice_mate", password="pass1234")
+        Profile.objects.update_or_create(user=self.classmate, defaults={"role": "student"})
+
+        enrolled = Course.objects.create(name="Enrolled", lecturer=self.lecturer)
+        enrolled.student.add(self.student)
+        other = Course.objects.create(name="Other", lecturer=self.lecturer)
+        deadline = timezone.now() + timedelta(days=1)
+
+        def post(title, course, **extra):
+            fields = {"group_type": "manual", "max_students_per_group": 1, "deadline": deadline, **extra}
+            return Post.objects.create(author=self.lecturer, title=title, content="Body", course=course, **fields)
+
+        self.post = post("Enrolled post", enrolled)
+        self.open_post = post("Open post", None, max_students_per_group=None)
+        self.closed_post = post("Closed post", enrolled, deadline=timezone.now() - timedelta(days=1))
+        self.hidden_post = post("Other course post", other)
+        self.full_group = Group.objects.create(post=self.post, name="Group 1")
+        self.full_group.members.add(self.classmate)
+        self.free_group = Group.objects.create(post=self.post, name="Group 2")
+        self.open_group = Group.objects.create(post=self.open_post, name="Group 1")
+        self.closed_group = Group.objects.create(post=self.closed_post, name="Group 1")
+        Group.objects.create(post=self.hidden_post, name="Group 1")
+        self.url = reverse("group_join_choice")
+
+    def _ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_students_see_groups_of_their_courses(self):
+        self.client.force_login(self.student)
+        response = self.client.get(self.url)
+
+        self.assertCountEqual(
+            self._ids(response), [self.full_group.id, self.free_group.id, self.open_group.id, self.closed_group.id]
+        )
+        rows = {row["id"]: row for row in response.json()["results"]}
+        self.assertEqual(rows[self.full_group.id]["member_count"], 1)
+        self.assertEqual(rows[self.full_group.id]["remaining"], 0)
+        self.assertEqual(rows[self.free_group.id]["remaining"], 1)
+        self.assertIsNone(rows[self.open_group.id]["capacity"])
+        self.assertIsNone(rows[self.open_group.id]["remaining"])
+
+    def test_post_and_joinable_filters(self):
+        self.client.force_login(self.student)
+        self.assertEqual(
+            self._ids(self.client.get(self.url, {"post": self.post.id})), [self.full_group.id, self.free_group.id]
+        )
+        self.assertCountEqual(
+            self._ids(self.client.get(self.url, {"joinable": "1"})), [self.free_group.id, self.open_group.id]
+        )
+        self.assertEqual(self._ids(self.client.get(self.url, {"post": self.hidden_post.id})), [])
+        self.assertEqual(self.client.get(self.url, {"post": "x"}).status_code, 400)
+
+    def test_lecturers_see_their_own_posts(self):
+        self.client.force_login(self.lecturer)
+        self.assertEqual(len(self._ids(self.client.get(self.url))), 5)
+
+    def test_groups_of_deleted_posts_cannot_be_listed_or_joined(self):
+        Post.objects.filter(pk=self.post.pk).update(deleted_at=timezone.now())
+        self.client.force_login(self.student)
+
+        self.assertCountEqual(self._ids(self.client.get(self.url)), [self.open_group.id, self.closed_group.id])
+        self.assertEqual(self._ids(self.client.get(self.url, {"post": self.post.id})), [])
+        chosen = self.client.post(self.url, {"group": self.free_group.id})
+        self.assertEqual(chosen.status_code, 400)
+        joined = self.client.post(reverse("join_group_api", kwargs={"group_id": self.free_group.id}))
+        self.assertEqual(joined.status_code, 404)
+        request = APIRequestFactory().post("/")
+        force_authenticate(request, user=self.student)
+        self.assertEqual(JoinGroupView.as_view()(request, group_id=self.free_group.id).status_code, 404)
+        self.assertFalse(self.free_group.members.exists())
+
+    def test_cursor_pagination(self):
+        self.client.force_login(self.student)
+        seen = []
+        params = {"page_size": 1}
+        while True:
+            response = self.client.get(self.url, params)
+            seen += self._ids(response)
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+        self.assertEqual(len(seen), 4)
+        self.assertEqual(len(set(seen)), 4)
+
+
+class ConcurrentJoinTests(TransactionTestCase):
+    """Fire joins from many threads, each with its own database connection."""
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Threads need a file-backed SQLite test database.")
+        lecturer = User.objects.create_user(username="race_lect", password="pass1234")
+        self.students = User.objects.bulk_create(User(username=f"race_{i}") for i in range(24))
+        Profile.objects.bulk_create(Profile(user=student, role="student") for student in self.students)
+        self.post = Post.objects.create(
+            author=lecturer,
+            title="Race",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+            group_type="manual",
+            max_students_per_group=3,
+        )
+        self.groups = Group.objects.bulk_create(Group(post=self.post, name=f"Group {i}") for i in range(4))
+
+    def _run(self, attempts):
+        """Run each ``(student, groups)`` attempt in its own thread; return the outcomes."""
+        barrier = threading.Barrier(len(attempts))
+        outcomes = []
+        errors = []
+
+        def attempt(student, group_ids):
+            try:
+                groups = list(Group.objects.select_related("post").filter(pk__in=group_ids))
+                groups.sort(key=lambda group: group_ids.index(group.pk))
+                barrier.wait()
+                for group in groups:
+                    outcome, _ = join_group(group, student)
+                    outcomes.append(outcome)
+                    if outcome != FULL:
+                        break
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt, args=args) for args in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        return outcomes
+
+    def _memberships(self):
+        return list(Group.members.through.objects.filter(group__post=self.post).values_list("group_id", "user_id"))
+
+    def test_concurrent_joins_never_overfill_groups(self):
+        group_ids = [group.pk for group in self.groups]
+        outcomes = self._run(
+            [(student, group_ids[i % 4 :] + group_ids[: i % 4]) for i, student in enumerate(self.students)]
+        )
+
+        memberships = self._memberships()
+        self.assertEqual(outcomes.count(JOINED), 12)
+        self.assertEqual(len(memberships), 12)
+        self.assertEqual(len({user_id for _, user_id in memberships}), 12)
+        for group in self.groups:
+            self.assertEqual(group.members.count(), 3)
+        self.assertEqual(PostStats.objects.get(post=self.post).member_count, 12)
+
+    def test_student_racing_into_several_groups_gets_one(self):
+        student = self.students[0]
+        outcomes = self._run([(student, [group.pk]) for group in self.groups])
+
+        self.assertEqual(outcomes.count(JOINED), 1)
+        self.assertEqual(outcomes.count(IN_OTHER_GROUP), 3)
+        self.assertEqual(len(self._memberships()), 1)
+        self.assertEqual(PostStats.objects.get(post=self.post).member_count, 1)
@@ -1,9 +1,14 @@
+from django.db.models import Count, F, Q
 from django.utils import timezone
-from rest_framework import permissions, status
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from groups.serializers import JoinGroupChoiceSerializer
+from accounts.roles import get_role
+from config.pagination import KeysetPagination
+from groups.membership import FULL, IN_OTHER_GROUP, join_group
+from groups.serializers import GroupChoiceSerializer, JoinGroupChoiceSerializer
 from groups.models import Group
 
 
@@ -11,12 +16,7 @@ class JoinGroupView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def _join_group(self, request, group):
-        role = (
-            (request.user.profile.role or "").strip().lower()
-            if hasattr(request.user, "profile")
-            else ""
-        )
-        if role != "student":
+        if get_role(request) != "student":
             return Response({"error": "Only students can join groups"}, status=status.HTTP_403_FORBIDDEN)
 
         post = group.post
@@ -26,32 +26,62 @@ class JoinGroupView(APIView):
             return Response({"error": "Automatic assignment enabled"}, status=status.HTTP_400_BAD_REQUEST)
         if not post.max_students_per_group or post.max_students_per_group <= 0:
             return Response({"error": "Group size not configured"}, status=status.HTTP_400_BAD_REQUEST)
-        if group.members.count() >= post.max_students_per_group:
+        outcome, _ = join_group(group, request.user)
+        if outcome == FULL:
             return Response({"error": "Group is full"}, status=status.HTTP_400_BAD_REQUEST)
-        if Group.objects.filter(post=post, members=request.user).exclude(id=group.id).exists():
+        if outcome == IN_OTHER_GROUP:
             return Response(
                 {"error": "You already joined another group for this assignment"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        group.members.add(request.user)
         return Response({"message": "Joined successfully"}, status=status.HTTP_200_OK)
 
     def post(self, request, group_id):
         try:
-            group = Group.objects.select_related("post").get(id=group_id)
+            group = Group.objects.alive().select_related("post").get(id=group_id)
         except Group.DoesNotExist:
             return Response({"error": "Group not found"}, status=status.HTTP_404_NOT_FOUND)
         return self._join_group(request, group)
 
 
-class JoinGroupChoiceView(APIView):
+class GroupChoicePagination(KeysetPagination):
+    ordering = ("post_id", "name", "id")
+
+
+class JoinGroupChoiceView(generics.ListAPIView):
+    """
+    Groups the user may pick from, paginated by cursor. Students see groups of
+    posts in their enrolled courses (and of posts without a course), lecturers
+    their own posts' groups. ``?post=<id>`` narrows to one post and
+    ``?joinable=1`` to open manual posts with room left.
+    """
+
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GroupChoiceSerializer
+    pagination_class = GroupChoicePagination
 
-    def get(self, request):
-        groups = Group.objects.select_related("post").all()
-        data = [{"id": group.id, "name": group.name, "assignment": group.post.title} for group in groups]
-        return Response({"groups": data}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        user = self.request.user
+        groups = Group.objects.alive().select_related("post").annotate(member_count=Count("members"))
+        if get_role(self.request) == "lecturer":
+            groups = groups.filter(post__author=user)
+        else:
+            groups = groups.filter(
+                Q(post__course__isnull=True) | Q(post__course__in=user.courses.values("pk"))
+            )
+
+        post_id = self.request.query_params.get("post")
+        if post_id:
+            if not post_id.isdigit():
+                raise ValidationError({"post": "Must be a post id."})
+            groups = groups.filter(post_id=post_id)
+        if self.request.query_params.get("joinable", "").lower() in ("1", "true", "yes"):
+            groups = groups.filter(post__group_type="manual", post__deadline__gt=timezone.now()).filter(
+                Q(post__max_students_per_group__isnull=True)
+                | Q(post__max_students_per_group__lte=0)
+                | Q(member_count__lt=F("post__max_students_per_group"))
+            )
+        return groups
 
     def post(self, request):
         serializer = JoinGroupChoiceSerializer(data=request.data)
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "priority", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "key")
+    readonly_fields = ("locked_at", "locked_by", "last_error", "created_at", "finished_at")
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config import mongodb
+from config.activity_spool import read_checkpoint, read_lines, spool_files, spool_key, write_checkpoint
+from config.log_shipper import only_duplicate_key_errors
+
+try:
+    from bson import ObjectId
+except ImportError:
+    ObjectId = None
+
+
+def _document(line):
+    document = json.loads(line)
+    document["created_at"] = datetime.fromisoformat(document["created_at"])
+    if ObjectId is not None and ObjectId.is_valid(document["_id"]):
+        # Spilled by the shipper after pymongo had assigned it an ObjectId.
+        document["_id"] = ObjectId(document["_id"])
+    return document
+
+
+class Command(BaseCommand):
+    help = (
+        "Send spooled activity events (ACTIVITY_SPOOL_DIR) to MongoDB in batches, "
+        "resuming from the last checkpoint. Events Mongo already has are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--keep", action="store_true", help="Keep replayed files instead of deleting them.")
+
+    def handle(self, *args, **options):
+        directory = settings.ACTIVITY_SPOOL_DIR
+        try:
+            collection = mongodb.get_activity_collection()
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        checkpoint = read_checkpoint(directory)
+        sent = skipped = removed = 0
+        for path, complete in spool_files(directory):
+            key = spool_key(path)
+            offset = checkpoint.get(key, 0)
+            batch = []
+            try:
+                for end, line in read_lines(path, offset):
+                    try:
+                        batch.append(_document(line))
+                    except (ValueError, KeyError, TypeError):
+                        self.stderr.write(f"{path.name}: skipping unreadable line at byte {offset}")
+                        skipped += 1
+                    offset = end
+                    if len(batch) >= options["batch_size"]:
+                        sent += self._send(collection, batch, sent)
+                        batch = []
+                        checkpoint[key] = offset
+                        write_checkpoint(directory, checkpoint)
+            except FileNotFoundError:
+                # Renamed to .jsonl by its writer; the next run picks it up under the same key.
+                pass
+            if batch:
+                sent += self._send(collection, batch, sent)
+            checkpoint[key] = offset
+            if complete and not options["keep"]:
+                path.unlink()
+                checkpoint.pop(key)
+                removed += 1
+            write_checkpoint(directory, checkpoint)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Replayed {sent} event(s), skipped {skipped} unreadable line(s), removed {removed} file(s).")
+        )
+
+    def _send(self, collection, batch, sent):
+        try:
+            collection.insert_many(batch, ordered=False)
+        except Exception as exc:
+            if not only_duplicate_key_errors(exc):
+                raise CommandError(f"Stopped after {sent} event(s); run again to resume: {exc}") from exc
+        return len(batch)
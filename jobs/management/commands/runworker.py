@@ -0,0 +1,50 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import purge_finished, run_next
+
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Exit after this many jobs (0 = no limit).")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        previous = {signum: signal.signal(signum, self._stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+        processed = 0
+        last_purge = 0.0
+        try:
+            while not self.stopping:
+                status = run_next(worker)
+                if status is not None:
+                    processed += 1
+                    if options["max_jobs"] and processed >= options["max_jobs"]:
+                        break
+                    continue
+                if options["burst"]:
+                    break
+                if time.monotonic() - last_purge > PURGE_INTERVAL:
+                    purge_finished()
+                    last_purge = time.monotonic()
+                time.sleep(options["sleep"])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker} processed {processed} job(s)."))
+
+    def _stop(self, signum, frame):
+        # Finish the current job, then exit.
+        self.stopping = True
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18
+
+from django.db import migrations, models
+
+
+def drop_duplicate_queued_jobs(apps, schema_editor):
+    # Keep the oldest queued job per key; the others would repeat its work.
+    Job = apps.get_model("jobs", "Job")
+    kept = set()
+    duplicates = []
+    for pk, key in Job.objects.filter(status="queued").exclude(key="").order_by("id").values_list("pk", "key"):
+        if key in kept:
+            duplicates.append(pk)
+        else:
+            kept.add(key)
+    Job.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_queued_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'queued'), models.Q(('key', ''), _negated=True)), fields=('key',), name='myapp_job_queued_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    name = models.CharField(max_length=200, help_text="Dotted path of the function to run")
+    payload = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=200, blank=True, default="")
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "myapp_job"
+        indexes = [
+            models.Index(fields=["status", "priority", "run_at"], name="myapp_job_claim_idx"),
+            models.Index(fields=["key", "status"], name="myapp_job_key_idx"),
+        ]
+        constraints = [
+            # One pending job per key; enqueue() returns it instead of adding another.
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status="queued") & ~models.Q(key=""),
+                name="myapp_job_queued_key_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
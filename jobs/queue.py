@@ -0,0 +1,137 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 10
+PRIORITY_DEFAULT = 0
+PRIORITY_LOW = -10
+CLAIM_CANDIDATES = 10
+
+
+def _job_name(func):
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, priority=PRIORITY_DEFAULT, delay=None, key="", max_attempts=5, **kwargs):
+    """
+    Queue ``func(**kwargs)`` for ``runworker`` and return the ``Job``.
+
+    ``func`` is a module-level function or its dotted path; ``kwargs`` must be
+    JSON-serializable. When ``key`` is given and a job with that key is still
+    queued, that job is returned instead of adding a duplicate; a unique
+    constraint keeps concurrent callers to one queued job per key as well.
+    """
+    while True:
+        if key:
+            pending = Job.objects.filter(key=key, status="queued").first()
+            if pending is not None:
+                return pending
+        try:
+            with transaction.atomic():
+                return Job.objects.create(
+                    name=_job_name(func),
+                    payload=kwargs,
+                    key=key,
+                    priority=priority,
+                    max_attempts=max_attempts,
+                    run_at=timezone.now() + (delay or timedelta(0)),
+                )
+        except IntegrityError:
+            if not key:
+                raise
+            # Another caller queued the same key since the check; return theirs.
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts``: doubling, capped."""
+    delay = settings.JOB_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.JOB_RETRY_MAX_DELAY)
+
+
+def _ready(now):
+    # Running jobs whose lease ran out belong to a worker that died.
+    expired = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    return Job.objects.filter(
+        Q(status="queued", run_at__lte=now) | Q(status="running", locked_at__lt=expired)
+    ).order_by("-priority", "run_at", "id")
+
+
+def claim_next(worker, now=None):
+    """
+    Claim the highest-priority runnable job for ``worker``, or return None.
+
+    Uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it,
+    so concurrent workers never wait on each other. SQLite has no row locks;
+    there a conditional UPDATE, serialized by SQLite's database write lock,
+    lets exactly one worker take each row.
+    """
+    now = now or timezone.now()
+    claim = {"status": "running", "locked_at": now, "locked_by": worker, "attempts": F("attempts") + 1}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _ready(now).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(**claim)
+    else:
+        for job in _ready(now)[:CLAIM_CANDIDATES]:
+            if Job.objects.filter(pk=job.pk, status=job.status, locked_at=job.locked_at).update(**claim):
+                break
+        else:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job):
+    """Run a claimed job and record success, a scheduled retry, or failure."""
+    now = timezone.now
+    try:
+        import_string(job.name)(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.name, job.attempts)
+        if job.attempts >= job.max_attempts:
+            outcome = {"status": "failed", "finished_at": now()}
+        else:
+            outcome = {"status": "queued", "run_at": now() + timedelta(seconds=backoff(job.attempts))}
+        outcome["last_error"] = traceback.format_exc()[-4000:]
+    else:
+        outcome = {"status": "done", "finished_at": now(), "last_error": ""}
+
+    # A worker that overran its lease may have lost the job to another one.
+    finished = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    try:
+        with transaction.atomic():
+            finished.update(locked_at=None, **outcome)
+    except IntegrityError:
+        # A job with the same key was queued while this one ran and will redo
+        # the work, so this one gives up instead of queueing a second copy.
+        outcome.update(status="failed", finished_at=now())
+        finished.update(locked_at=None, **outcome)
+    return outcome["status"]
+
+
+def run_next(worker):
+    job = claim_next(worker)
+    if job is None:
+        return None
+    return run_job(job)
+
+
+def purge_finished(older_than=None):
+    cutoff = timezone.now() - (older_than or timedelta(seconds=settings.JOB_RETENTION_SECONDS))
+    deleted, _ = Job.objects.filter(status="done", finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from assignments.models import Post
+from jobs.models import Job
+from jobs.queue import PRIORITY_HIGH, PRIORITY_LOW, backoff, claim_next, enqueue, run_job, run_next
+
+CALLS = []
+
+
+def record(value):
+    CALLS.append(value)
+
+
+def explode(value):
+    raise RuntimeError(f"boom {value}")
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_RETRY_MAX_DELAY=60, JOB_LEASE_SECONDS=600)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_jobs_run_by_priority_then_age(self):
+        enqueue(record, priority=PRIORITY_LOW, value="low")
+        enqueue(record, value="first")
+        enqueue(record, value="second")
+        enqueue(record, priority=PRIORITY_HIGH, value="high")
+
+        while run_next("test"):
+            pass
+
+        self.assertEqual(CALLS, ["high", "first", "second", "low"])
+        self.assertEqual(Job.objects.filter(status="done").count(), 4)
+
+    def test_delayed_jobs_wait_until_due(self):
+        enqueue(record, delay=timedelta(minutes=5), value="later")
+        self.assertIsNone(claim_next("test"))
+        self.assertIsNotNone(claim_next("test", now=timezone.now() + timedelta(minutes=6)))
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        job = enqueue(explode, max_attempts=3, value=1)
+        later = timezone.now() + timedelta(minutes=5)
+
+        with self.assertLogs("jobs.queue", level="ERROR"):
+            self.assertEqual(run_job(claim_next("test")), "queued")
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, 1)
+            self.assertIn("boom 1", job.last_error)
+            self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=8))
+            self.assertIsNone(claim_next("test"))
+
+            run_job(claim_next("test", now=later))
+            self.assertEqual(run_job(claim_next("test", now=later + timedelta(minutes=5))), "failed")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 3))
+        self.assertEqual([backoff(n) for n in (1, 2, 3, 4, 5)], [10, 20, 40, 60, 60])
+
+    def test_claimed_job_is_not_handed_out_twice(self):
+        enqueue(record, value="once")
+        self.assertIsNotNone(claim_next("worker-a"))
+        self.assertIsNone(claim_next("worker-b"))
+
+    def test_expired_lease_is_reclaimed(self):
+        enqueue(record, value="stuck")
+        claim_next("dead-worker")
+        job = claim_next("live-worker", now=timezone.now() + timedelta(seconds=601))
+        self.assertEqual((job.locked_by, job.attempts), ("live-worker", 2))
+
+    def test_keyed_jobs_are_deduplicated_while_queued(self):
+        first = enqueue(record, key="sync:1", value="a")
+        self.assertEqual(enqueue(record, key="sync:1", value="b").pk, first.pk)
+        run_next("test")
+        self.assertNotEqual(enqueue(record, key="sync:1", value="c").pk, first.pk)
+
+    def test_only_one_job_per_key_can_be_queued(self):
+        enqueue(record, key="sync:1", value="a")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(name="jobs.tests.record", key="sync:1")
+        Job.objects.create(name="jobs.tests.record")
+        Job.objects.create(name="jobs.tests.record")
+
+    def test_racing_enqueue_returns_the_job_queued_first(self):
+        first = enqueue(record, key="sync:1", value="a")
+        real_filter = Job.objects.filter
+        checks = []
+
+        def filter_missing_the_first_check(*args, **kwargs):
+            checks.append(kwargs)
+            queryset = real_filter(*args, **kwargs)
+            return queryset.none() if len(checks) == 1 else queryset
+
+        # The other caller's insert lands between this caller's check and insert.
+        with mock.patch.object(Job.objects, "filter", side_effect=filter_missing_the_first_check):
+            self.assertEqual(enqueue(record, key="sync:1", value="b").pk, first.pk)
+        self.assertEqual(Job.objects.filter(key="sync:1").count(), 1)
+
+    def test_retry_gives_way_to_a_job_queued_meanwhile(self):
+        enqueue(explode, key="sync:1", value=1)
+        job = claim_next("test")
+        newer = enqueue(explode, key="sync:1", value=2)
+
+        with self.assertLogs("jobs.queue", level="ERROR"):
+            self.assertEqual(run_job(job), "failed")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(Job.objects.get(key="sync:1", status="queued").pk, newer.pk)
+
+    def test_runworker_burst_drains_queue(self):
+        for value in range(3):
+            enqueue(record, value=value)
+        out = StringIO()
+        call_command("runworker", "--burst", stdout=out)
+        self.assertEqual(CALLS, [0, 1, 2])
+        self.assertIn("processed 3 job(s)", out.getvalue())
+
+
+class QueuedAssignmentDeleteTests(TestCase):
+    def test_delete_view_returns_before_cascade(self):
+        lecturer = User.objects.create_user(username="job_lect", password="pass1234")
+        Profile.objects.update_or_create(user=lecturer, defaults={"role": "lecturer"})
+        post = Post.objects.create(
+            author=lecturer,
+            title="Doomed",
+            content="Body",
+            deadline=timezone.now() + timedelta(days=1),
+        )
+        self.client.login(username="job_lect", password="pass1234")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("assignment_delete", kwargs={"post_id": post.id}))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertTrue(Job.objects.filter(key=f"assignments.delete:{post.id}").exists())
+
+        call_command("runworker", "--burst", stdout=StringIO())
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())